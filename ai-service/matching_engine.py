@@ -1,3 +1,61 @@
+from collections import defaultdict
+
+
+class KeywordIndex:
+    """Inverted keyword -> seller posting lists for the MVP matcher"""
+    def __init__(self, sellers=()):
+        self.sellers = []
+        self.seller_tokens = []
+        self.postings = defaultdict(list)
+        for seller in sellers:
+            self.add(seller)
+
+    def add(self, seller):
+        """Tokenize a seller's capabilities once and post it under each keyword"""
+        position = len(self.sellers)
+        tokens = set(seller['capabilities'].lower().split())
+        self.sellers.append(seller)
+        self.seller_tokens.append(tokens)
+        for token in tokens:
+            self.postings[token].append(position)
+
+    def match(self, buyer, threshold=0.2):
+        """Matches for one buyer, visiting only sellers that share a keyword"""
+        buyer_needs = set(buyer['needs'].lower().split())
+        n = max(len(buyer_needs), 1)
+
+        # score = common / n must exceed the threshold, so a seller needs at
+        # least this many shared keywords. threshold * n can round across an
+        # integer, so the estimate is settled with the same comparison as below
+        min_common = max(int(threshold * n), 0)
+        while min_common > 0 and (min_common - 1) / n > threshold:
+            min_common -= 1
+        while min_common <= len(buyer_needs) and not min_common / n > threshold:
+            min_common += 1
+        if min_common > len(buyer_needs):
+            return []
+
+        # Prefix filter: a seller sharing min_common keywords must appear in at
+        # least one of the (len - min_common + 1) shortest posting lists
+        tokens = sorted(buyer_needs, key=lambda t: len(self.postings.get(t, ())))
+        candidates = set()
+        for token in tokens[:len(tokens) - min_common + 1]:
+            candidates.update(self.postings.get(token, ()))
+
+        matches = []
+        for position in sorted(candidates):
+            common = buyer_needs.intersection(self.seller_tokens[position])
+            score = len(common) / n
+            if score > threshold:
+                matches.append({
+                    'buyer_id': buyer['id'],
+                    'seller_id': self.sellers[position]['id'],
+                    'score': round(score, 2),
+                    'matched_keywords': list(common)
+                })
+        return matches
+
+
 def match_buyers_sellers(buyers, sellers):
     """
     Simple matching algorithm for MVP
@@ -7,22 +65,12 @@ def match_buyers_sellers(buyers, sellers):
     Returns:
         List of matches (buyer_id, seller_id, match_score)
     """
+    # Sellers are tokenized once; each buyer only visits keyword overlaps
+    index = KeywordIndex(sellers)
     matches = []
     for buyer in buyers:
-        for seller in sellers:
-            # Simple scoring based on keyword overlap
-            buyer_needs = set(buyer['needs'].lower().split())
-            seller_caps = set(seller['capabilities'].lower().split())
-            common = buyer_needs.intersection(seller_caps)
-            score = len(common) / max(len(buyer_needs), 1)
-            
-            if score > 0.2:  # Minimum threshold
-                matches.append({
-                    'buyer_id': buyer['id'],
-                    'seller_id': seller['id'],
-                    'score': round(score, 2),
-                    'matched_keywords': list(common)
-                })
+        # Simple scoring based on keyword overlap
+        matches.extend(index.match(buyer))
     
     # Sort by best matches first
     return sorted(matches, key=lambda x: x['score'], reverse=True)
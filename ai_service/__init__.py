@@ -1 +1 @@
-from .matching_engine import match_buyers_sellers
+from .matching_engine import match_buyers_sellers, KeywordIndex
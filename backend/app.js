@@ -12,41 +12,130 @@ app.get('/api', (req, res) => {
   res.json({ message: 'Industrial AI Marketplace API' });
 });
 
+// Persistent AI worker pool: each worker loads the model once and then
+// answers newline-delimited JSON requests over stdin/stdout. Requests in
+// flight on one worker are micro-batched into a single encode (tuned with
+// AI_BATCH_SIZE, AI_BATCH_WAIT_MS and AI_QUEUE_LIMIT in the environment).
+// Repeated pairs are answered from a result cache (RESULT_CACHE_SIZE,
+// RESULT_CACHE_TTL; RESULT_CACHE_PATH shares a sqlite file between workers)
+const AI_WORKERS = parseInt(process.env.AI_WORKERS || '2', 10);
+const AI_TIMEOUT_MS = parseInt(process.env.AI_TIMEOUT_MS || '30000', 10);
+const workers = [];
+const pending = new Map();
+let nextRequestId = 0;
+
+// Worker stdout is one JSON reply per line; anything else (a stray print, a
+// library warning) is logged instead of throwing inside the stream handler
+function parseWorkerLine(line) {
+  try {
+    return JSON.parse(line);
+  } catch (err) {
+    return { unparsed: line };
+  }
+}
+
+function startWorker(slot) {
+  const shell = new PythonShell('revolutionary_ai_matching.py', {
+    mode: 'json',
+    parser: parseWorkerLine,
+    pythonOptions: ['-u'], // unbuffered output
+    args: ['--serve']
+  });
+  const worker = { shell, slot, inFlight: 0, alive: true };
+
+  shell.on('message', message => {
+    if (message.unparsed !== undefined) {
+      console.error(`[ai-worker ${slot}] ignoring non-JSON output: ${message.unparsed}`);
+      return;
+    }
+    const request = pending.get(message.id);
+    if (!request) return;
+    pending.delete(message.id);
+    clearTimeout(request.timer);
+    worker.inFlight--;
+    if (message.error) {
+      request.reject(new Error(message.error));
+    } else {
+      request.resolve(message.result);
+    }
+  });
+
+  // A failed spawn emits 'error' without 'close', so both retire the worker
+  shell.on('error', err => {
+    console.error(`[ai-worker ${slot}] ${err.message}`);
+    retireWorker(worker, 'AI worker failed');
+  });
+  shell.on('close', () => retireWorker(worker, 'AI worker exited'));
+
+  shell.on('stderr', line => console.error(`[ai-worker ${slot}] ${line}`));
+
+  return worker;
+}
+
+function retireWorker(worker, reason) {
+  // Fail whatever this worker still owed and start a replacement (once)
+  if (!worker.alive) return;
+  worker.alive = false;
+  for (const [id, request] of pending) {
+    if (request.worker === worker) {
+      pending.delete(id);
+      clearTimeout(request.timer);
+      request.reject(new Error(reason));
+    }
+  }
+  setTimeout(() => { workers[worker.slot] = startWorker(worker.slot); }, 1000);
+}
+
+function runMatch(buyer, seller) {
+  // Dispatch to the least busy live worker
+  const live = workers.filter(w => w.alive);
+  if (live.length === 0) {
+    return Promise.reject(new Error('No AI workers available'));
+  }
+  const worker = live.reduce((best, w) => (w.inFlight < best.inFlight ? w : best));
+  const id = ++nextRequestId;
+  return new Promise((resolve, reject) => {
+    const timer = setTimeout(() => {
+      // A worker that misses the deadline is presumed hung: replace it
+      // rather than keep routing requests to it
+      pending.delete(id);
+      reject(new Error('AI worker timed out'));
+      retireWorker(worker, 'AI worker restarted after a timeout');
+      worker.shell.kill();
+    }, AI_TIMEOUT_MS);
+    pending.set(id, { resolve, reject, timer, worker });
+    worker.inFlight++;
+    worker.shell.send({ id, buyer, seller });
+  });
+}
+
+for (let i = 0; i < AI_WORKERS; i++) {
+  workers.push(startWorker(i));
+}
+
 // AI matching endpoint
 app.post('/api/match', (req, res) => {
   const { buyer, seller } = req.body;
-  
-  // Run revolutionary AI matching
-  const options = {
-    mode: 'text',
-    pythonOptions: ['-u'], // unbuffered output
-    args: [JSON.stringify({ buyer, seller })]
-  };
-
-  PythonShell.run('revolutionary_ai_matching.py', options)
-    .then(result => {
-      try {
-        const matchResult = JSON.parse(result[0]);
-        
-        // Simulate blockchain logging
-        const transactionData = {
-          buyerId: buyer.id,
-          sellerId: seller.id,
-          timestamp: new Date().toISOString(),
-          score: matchResult.revolutionary_score
-        };
-        const txHash = crypto.createHash('sha256')
-          .update(JSON.stringify(transactionData))
-          .digest('hex');
-        
-        res.json({
-          ...matchResult,
-          transactionHash: txHash,
-          blockchainStatus: "preparing full blockchain ledger"
-        });
-      } catch (e) {
-        res.status(500).json({ error: 'Failed to parse AI result' });
-      }
+
+  // Run revolutionary AI matching on a warm worker
+  runMatch(buyer, seller)
+    .then(matchResult => {
+      // Simulate blockchain logging
+      const transactionData = {
+        buyerId: buyer.id,
+        sellerId: seller.id,
+        timestamp: new Date().toISOString(),
+        score: matchResult.revolutionary_score
+      };
+      const txHash = crypto.createHash('sha256')
+        .update(JSON.stringify(transactionData))
+        .digest('hex');
+
+      res.json({
+        ...matchResult,
+        transactionHash: txHash,
+        blockchainStatus: "preparing full blockchain ledger"
+      });
     })
     .catch(err => {
       res.status(500).json({ error: 'AI matching failed', details: err.message });
@@ -1,22 +1,89 @@
 import numpy as np
-from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
 from datetime import datetime
+import asyncio
 import json
+import os
 import sys
 
+# Share the embedding cache module with the top-level matchers
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from embedding_cache import get_default_cache
+from encoders import make_encoder
+from scoring_service import ScoringService
+from geospatial import pair_distance_km
+from material_taxonomy import get_default_taxonomy
+from result_cache import ResultCache
+
 class RevolutionaryAIMatching:
     """Integrated Industrial Symbiosis Matching AI"""
-    def __init__(self):
-        self.model = SentenceTransformer('all-mpnet-base-v2')
+    def __init__(self, embedding_cache=None, encoder=None, materials=None, result_cache=None):
+        # The encoder loads its model on first use (see warmup())
+        self.model = encoder or make_encoder('all-mpnet-base-v2')
+        self.model_name = self.model.name
+        self.embedding_cache = embedding_cache or get_default_cache()
+        # Emission factors are looked up by canonical material, so synonyms share one
+        self.materials = materials if materials is not None else get_default_taxonomy()
+        # Repeated /api/match views of an unchanged pair are a hash lookup
+        # (RESULT_CACHE_SIZE / RESULT_CACHE_TTL / RESULT_CACHE_PATH)
+        self.result_cache = result_cache if result_cache is not None else ResultCache.from_env()
+        # Cached scores are only valid for this encoder and taxonomy
+        self._result_scope = ResultCache.make_key(self.model_name, self.materials.fingerprint())
+    
+    def warmup(self):
+        """Load the encoder now instead of on the first request"""
+        self.model.warmup()
+        self.embedding_cache.encode(self.model, self.model_name, ["warmup"])
+        return self
         
     def predict_compatibility(self, buyer, seller):
         """Predict compatibility with sustainability scoring"""
+        key, result = self._cached_result(buyer, seller)
+        if result is not None:
+            return result
+        
         # Semantic matching
         buyer_text = self._prepare_buyer_text(buyer)
         seller_text = self._prepare_seller_text(seller)
         semantic_score = self._calculate_semantic_similarity(buyer_text, seller_text)
+        return self._store_result(key, self._compatibility_result(buyer, seller, semantic_score))
+    
+    def predict_compatibility_batch(self, pairs):
+        """predict_compatibility for many (buyer, seller) pairs with one batched encode"""
+        if not pairs:
+            return []
+        keys, results = zip(*(self._cached_result(buyer, seller) for buyer, seller in pairs))
+        results = list(results)
+        missing = [i for i, result in enumerate(results) if result is None]
+        if not missing:
+            return results
         
+        # Only the pairs without a cached result are encoded
+        texts = ([self._prepare_buyer_text(pairs[i][0]) for i in missing] +
+                 [self._prepare_seller_text(pairs[i][1]) for i in missing])
+        embeddings = self.embedding_cache.encode(self.model, self.model_name, texts)
+        embeddings = embeddings / np.maximum(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12)
+        semantic_scores = np.einsum('ij,ij->i', embeddings[:len(missing)], embeddings[len(missing):])
+        for i, score in zip(missing, semantic_scores):
+            buyer, seller = pairs[i]
+            results[i] = self._store_result(keys[i], self._compatibility_result(buyer, seller, float(score)))
+        return results
+    
+    def _cached_result(self, buyer, seller):
+        """(cache key, cached result or None) for one pair"""
+        if self.result_cache is None:
+            return None, None
+        # No trust or trained-model state here: beyond the scope (encoder and
+        # taxonomy) the result depends on the profiles alone
+        key = ResultCache.make_key(self._result_scope, buyer, seller)
+        return key, self.result_cache.get(key)
+    
+    def _store_result(self, key, result):
+        if key is not None:
+            self.result_cache.put(key, result)
+        return result
+    
+    def _compatibility_result(self, buyer, seller, semantic_score):
+        """Combine a pair's semantic score with its sustainability impact"""
         # Sustainability impact
         sustainability_score = self._calculate_sustainability_impact(buyer, seller)
         
@@ -32,16 +99,13 @@ class RevolutionaryAIMatching:
     
     def _calculate_sustainability_impact(self, buyer, seller):
         """Calculate CO₂ reduction impact"""
-        # Emission factors (kgCO₂/kg)
-        EMISSION_FACTORS = {
-            'cement': 0.95, 'steel': 1.85, 'plastic': 3.5,
-            'textiles': 2.1, 'chemicals': 1.7, 'metals': 1.9
-        }
-        
-        # Calculate saved emissions
+        # Emission factor (kgCO₂/kg) of the canonical waste material
         waste_type = buyer.get('waste_type', 'generic')
-        factor = EMISSION_FACTORS.get(waste_type, 1.0)
-        distance_km = buyer.get('distance_to_seller', 50)
+        factor = self.materials.emission_factor(waste_type)
+        # Real distance when both sides carry coordinates
+        distance_km = pair_distance_km(buyer, seller)
+        if distance_km is None:
+            distance_km = buyer.get('distance_to_seller', 50)
         quantity = buyer.get('quantity', 1000)
         
         return factor * distance_km * (quantity / 1000)
@@ -67,14 +131,60 @@ class RevolutionaryAIMatching:
         )
     
     def _calculate_semantic_similarity(self, text1, text2):
-        embeddings = self.model.encode([text1, text2])
-        # Convert to numpy arrays with proper shape
-        emb1 = np.array([embeddings[0]])
-        emb2 = np.array([embeddings[1]])
-        return cosine_similarity(emb1, emb2)[0][0]
+        embeddings = self.embedding_cache.encode(self.model, self.model_name, [text1, text2])
+        # Cosine similarity of the two embeddings
+        norms = np.maximum(np.linalg.norm(embeddings, axis=1), 1e-12)
+        return float(embeddings[0] @ embeddings[1] / (norms[0] * norms[1]))
+
+def serve(ai, stdin=sys.stdin, stdout=sys.stdout, max_batch_size=32, max_wait_ms=5.0, max_queue=1024):
+    """Persistent worker loop: one JSON request per line in, one JSON response per line out
+
+    Requests are scored concurrently through a micro-batching ScoringService,
+    so responses may come back out of order; callers match them by id.
+    """
+    # The model is loaded once by the caller and reused for every request
+    service = ScoringService(ai, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms, max_queue=max_queue)
+    asyncio.run(_serve(service, stdin, stdout))
+
+async def _serve(service, stdin, stdout):
+    loop = asyncio.get_running_loop()
+    tasks = set()
+    async with service:
+        while True:
+            line = await loop.run_in_executor(None, stdin.readline)
+            if not line:
+                break
+            line = line.strip()
+            if not line:
+                continue
+            task = loop.create_task(_answer(service, line, stdout))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        if tasks:
+            await asyncio.gather(*tasks)
+
+async def _answer(service, line, stdout):
+    request_id = None
+    try:
+        request = json.loads(line)
+        request_id = request.get('id')
+        result = await service.score(request['buyer'], request['seller'])
+        response = {"id": request_id, "result": result}
+    except Exception as e:
+        response = {"id": request_id, "error": str(e)}
+    # NumPy scalars are not JSON serializable, so fall back to float()
+    stdout.write(json.dumps(response, default=float) + "\n")
+    stdout.flush()
 
 if __name__ == "__main__":
     ai = RevolutionaryAIMatching()
-    input_data = json.loads(sys.argv[1])
-    result = ai.predict_compatibility(input_data['buyer'], input_data['seller'])
-    print(json.dumps(result))
+    if len(sys.argv) > 1 and sys.argv[1] == '--serve':
+        # Long-lived worker: pay the model load before the first request
+        serve(ai.warmup(),
+              max_batch_size=int(os.environ.get('AI_BATCH_SIZE', '32')),
+              max_wait_ms=float(os.environ.get('AI_BATCH_WAIT_MS', '5')),
+              max_queue=int(os.environ.get('AI_QUEUE_LIMIT', '1024')))
+    else:
+        input_data = json.loads(sys.argv[1])
+        result = ai.predict_compatibility(input_data['buyer'], input_data['seller'])
+        print(json.dumps(result, default=float))
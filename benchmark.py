@@ -0,0 +1,193 @@
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+import synthetic_catalog as synthetic
+from embedding_cache import EmbeddingCache
+from encoders import HashingEncoder
+from industrial_ai_matching import IndustrialAIMatchingService
+from retraining import RetrainPolicy
+from revolutionary_ai_matching import RevolutionaryAIMatching
+
+BENCHMARKS = ('mvp_match', 'industrial_match', 'predict_compatibility',
+              'detect_symbiosis_network', 'detect_symbiosis_network_nearby', 'detect_symbiosis_network_material',
+              'record_transaction_outcome')
+
+
+def load_mvp_matcher():
+    """match_buyers_sellers from ai-service/ (the hyphenated directory is not importable by name)"""
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'ai-service', 'matching_engine.py')
+    spec = importlib.util.spec_from_file_location('matching_engine', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.match_buyers_sellers
+
+
+def measure(name: str, size: int, calls: List[Callable[[], object]], unit: str, items_per_call: int = 1,
+            trace_memory: bool = True) -> Dict:
+    """Time each call, then rerun the first under tracemalloc for its peak memory"""
+    latencies = np.empty(len(calls))
+    started = time.perf_counter()
+    for i, call in enumerate(calls):
+        t0 = time.perf_counter()
+        call()
+        latencies[i] = time.perf_counter() - t0
+    seconds = time.perf_counter() - started
+
+    result = {
+        "benchmark": name,
+        "size": size,
+        "calls": len(calls),
+        "seconds": round(seconds, 6),
+        "throughput": round(len(calls) * items_per_call / seconds, 3) if seconds else None,
+        "throughput_unit": f"{unit}/s",
+        "latency_ms": {
+            "p50": round(float(np.percentile(latencies, 50)) * 1000, 4),
+            "p95": round(float(np.percentile(latencies, 95)) * 1000, 4),
+            "p99": round(float(np.percentile(latencies, 99)) * 1000, 4),
+            "max": round(float(latencies.max()) * 1000, 4),
+        },
+        "peak_memory_bytes": None,
+    }
+    if trace_memory:
+        # Traced separately: tracemalloc slows the calls it observes
+        tracemalloc.start()
+        try:
+            calls[0]()
+            result["peak_memory_bytes"] = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return result
+
+
+def run_benchmarks(sizes: List[int], only: Optional[List[str]] = None, requests: int = 1000,
+                   queries: int = 20, max_network: int = 20000, seed: int = 0,
+                   trace_memory: bool = True, encoder=None) -> Dict:
+    """Run the selected benchmarks at every catalog size and collect the results"""
+    encoder = encoder or HashingEncoder()
+    selected = only or list(BENCHMARKS)
+    unknown = set(selected) - set(BENCHMARKS)
+    if unknown:
+        raise ValueError(f"Unknown benchmark(s) {sorted(unknown)}; expected some of {BENCHMARKS}")
+    results = []
+    for size in sizes:
+        for name in selected:
+            results.append(_run_one(name, size, requests, queries, max_network, seed, trace_memory, encoder))
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "encoder": encoder.name,
+        "seed": seed,
+        "results": results,
+    }
+
+
+def _run_one(name, size, requests, queries, max_network, seed, trace_memory, encoder) -> Dict:
+    # A private cache per benchmark so runs never share warm embeddings
+    cache = EmbeddingCache(max_entries=max(50000, 2 * size))
+
+    if name == 'mvp_match':
+        match_buyers_sellers = load_mvp_matcher()
+        buyers = synthetic.generate_mvp_buyers(queries, seed)
+        sellers = synthetic.generate_mvp_sellers(size, seed)
+        return measure(name, size, [lambda b=b: match_buyers_sellers([b], sellers) for b in buyers],
+                       "queries", trace_memory=trace_memory)
+
+    if name == 'industrial_match':
+        service = IndustrialAIMatchingService(embedding_cache=cache, encoder=encoder)
+        buyers = synthetic.generate_industrial_buyers(queries, seed)
+        sellers = synthetic.generate_industrial_sellers(size, seed)
+        service.match_buyers_sellers(buyers[0], sellers)  # seller embeddings are cached after the first call
+        result = measure(name, size, [lambda b=b: service.match_buyers_sellers(b, sellers) for b in buyers],
+                         "queries", trace_memory=trace_memory)
+        result["embedding_cache"] = cache.stats()
+        return result
+
+    matcher = RevolutionaryAIMatching(embedding_cache=cache, encoder=encoder,
+                                      retrain_policy=RetrainPolicy(every_rows=None))
+    try:
+        if name == 'predict_compatibility':
+            buyers = synthetic.generate_buyers(size, seed)
+            sellers = synthetic.generate_sellers(size, seed)
+            rng = np.random.default_rng(seed)
+            pairs = zip(rng.integers(size, size=requests).tolist(), rng.integers(size, size=requests).tolist())
+            calls = [lambda b=buyers[i], s=sellers[j]: matcher.predict_compatibility(b, s) for i, j in pairs]
+            result = measure(name, size, calls, "pairs", trace_memory=trace_memory)
+            result["embedding_cache"] = cache.stats()
+            if matcher.result_cache is not None:
+                # Repeated pairs are served from the result cache
+                result["result_cache"] = matcher.result_cache.stats()
+            return result
+
+        if name == 'detect_symbiosis_network':
+            if size > max_network:
+                return {"benchmark": name, "size": size,
+                        "skipped": f"more than --max-network={max_network} participants (pair scoring is N^2)"}
+            participants = synthetic.generate_participants(size, seed)
+            return measure(name, size, [lambda: matcher.detect_symbiosis_network(participants)],
+                           "participants", items_per_call=size, trace_memory=trace_memory)
+        
+        if name == 'detect_symbiosis_network_nearby':
+            # Only pairs within 500km are scored (k-d tree pruning)
+            participants = synthetic.generate_participants(size, seed)
+            return measure(name, size, [lambda: matcher.detect_symbiosis_network(participants, max_distance_km=500)],
+                           "participants", items_per_call=size, trace_memory=trace_memory)
+        
+        if name == 'detect_symbiosis_network_material':
+            # Only pairs with compatible materials are scored (seller buckets)
+            if size > max_network:
+                return {"benchmark": name, "size": size,
+                        "skipped": f"more than --max-network={max_network} participants (candidate pairs grow as N^2)"}
+            participants = synthetic.generate_participants(size, seed)
+            return measure(name, size,
+                           [lambda: matcher.detect_symbiosis_network(participants, require_material_match=True)],
+                           "participants", items_per_call=size, trace_memory=trace_memory)
+
+        # record_transaction_outcome; retraining is disabled because it runs
+        # off the request path and is not what is timed here
+        transactions = synthetic.generate_transactions(size, seed)
+        calls = [lambda t=t: matcher.record_transaction_outcome(t) for t in transactions]
+        return measure(name, size, calls, "transactions", trace_memory=trace_memory)
+    finally:
+        matcher.retrain_scheduler.shutdown()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark every matching path on synthetic catalogs and print JSON")
+    parser.add_argument("--sizes", default="1000,10000",
+                        help="comma-separated catalog sizes (e.g. 1000,10000,100000,1000000)")
+    parser.add_argument("--only", help=f"comma-separated subset of {','.join(BENCHMARKS)}")
+    parser.add_argument("--requests", type=int, default=1000, help="predict_compatibility calls per size")
+    parser.add_argument("--queries", type=int, default=20, help="catalog-scanning queries per size")
+    parser.add_argument("--max-network", type=int, default=20000,
+                        help="largest participant count for detect_symbiosis_network")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc peak-memory pass")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(
+        sizes=[int(s) for s in args.sizes.split(",")],
+        only=args.only.split(",") if args.only else None,
+        requests=args.requests, queries=args.queries, max_network=args.max_network,
+        seed=args.seed, trace_memory=not args.no_memory)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,257 @@
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from collections import deque
+from multiprocessing import get_context
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from material_taxonomy import MaterialCodes
+from revolutionary_ai_matching import RevolutionaryAIMatching, score_block
+
+SELLER_ARRAYS = ("seller_embeddings", "seller_terms", "material_ids", "seller_carbon", "seller_xyz")
+
+
+def iter_chunks(path: str, chunk_size: int) -> Iterator[List[Dict]]:
+    """Stream records from a JSONL or Parquet file in lists of chunk_size"""
+    if path.endswith(".parquet"):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Reading Parquet input requires pyarrow (pip install pyarrow)")
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pylist()
+        return
+
+    chunk = []
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                chunk.append(json.loads(line))
+            if len(chunk) == chunk_size:
+                yield chunk
+                chunk = []
+    if chunk:
+        yield chunk
+
+
+def score_chunk(matcher: RevolutionaryAIMatching, seller_arrays: Dict[str, np.ndarray],
+                material_codes: MaterialCodes, buyers: List[Dict], top_k: int,
+                max_block_cells: int = 1 << 24) -> Tuple[np.ndarray, np.ndarray]:
+    """Top-k seller positions and revolutionary scores for each buyer in the chunk"""
+    arrays = dict(seller_arrays)
+    # Waste types unknown to the taxonomy are interned per chunk
+    chunk_codes = material_codes.copy()
+    arrays.update(matcher._buyer_arrays(buyers, chunk_codes))
+    arrays["material_compatibility"] = chunk_codes.compatibility()
+    n_sellers = len(arrays["seller_terms"])
+    k = min(top_k, n_sellers)
+
+    # Score a few buyer rows at a time so the block never exceeds max_block_cells
+    rows = max(1, max_block_cells // max(n_sellers, 1))
+    positions = np.empty((len(buyers), k), dtype=np.int64)
+    scores = np.empty((len(buyers), k), dtype=np.float32)
+    for start in range(0, len(buyers), rows):
+        stop = min(start + rows, len(buyers))
+        block = score_block(arrays, start, stop)
+        top = np.argpartition(-block, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(block, top, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        positions[start:stop] = np.take_along_axis(top, order, axis=1)
+        scores[start:stop] = np.take_along_axis(top_scores, order, axis=1)
+    return positions, scores
+
+
+# Worker processes: the seller arrays are memory-mapped from disk, not pickled per task
+_worker = {}
+
+
+def _init_worker(seller_dir: str, material_codes: MaterialCodes, trust_records: Dict, encoder):
+    matcher = RevolutionaryAIMatching(encoder=encoder)
+    matcher.trust_network = trust_records
+    _worker["matcher"] = matcher
+    _worker["material_codes"] = material_codes
+    _worker["seller_arrays"] = {
+        name: np.load(os.path.join(seller_dir, name + ".npy"), mmap_mode="r") for name in SELLER_ARRAYS
+    }
+
+
+def _score_in_worker(buyers: List[Dict], top_k: int, max_block_cells: int):
+    return score_chunk(_worker["matcher"], _worker["seller_arrays"], _worker["material_codes"],
+                       buyers, top_k, max_block_cells)
+
+
+class BulkMatchJob:
+    """Nightly full re-match: every buyer against every seller, top-k per buyer
+
+    Sellers are encoded once in chunks. Buyers are streamed chunk by chunk,
+    encoded in batches and scored with the predict_compatibility weighting,
+    and each buyer's top-k sellers are appended to a JSONL output. After every
+    chunk a checkpoint records the output size, so an interrupted run resumes
+    from the last finished chunk. With workers > 1 the chunks are scored in a
+    process pool that memory-maps the seller arrays.
+    """
+    def __init__(self, buyers_path: str, sellers_path: str, output_path: str, top_k: int = 10,
+                 chunk_size: int = 1024, workers: int = 1, checkpoint_path: Optional[str] = None,
+                 trust_records: Optional[Dict] = None, encoder=None, max_block_cells: int = 1 << 24):
+        self.buyers_path = buyers_path
+        self.sellers_path = sellers_path
+        self.output_path = output_path
+        self.top_k = top_k
+        self.chunk_size = chunk_size
+        self.workers = workers
+        self.checkpoint_path = checkpoint_path or output_path + ".checkpoint"
+        self.trust_records = trust_records or {}
+        self.max_block_cells = max_block_cells
+        self.matcher = RevolutionaryAIMatching(encoder=encoder)
+        self.matcher.trust_network = self.trust_records
+
+    def run(self) -> Dict:
+        """Run (or resume) the job and return summary statistics"""
+        started = time.perf_counter()
+        seller_ids, seller_arrays, material_codes = self._prepare_sellers()
+        checkpoint = self._load_checkpoint()
+
+        # Drop anything written after the last checkpoint
+        mode = "r+" if checkpoint["output_bytes"] and os.path.exists(self.output_path) else "w"
+        with open(self.output_path, mode) as out:
+            out.truncate(checkpoint["output_bytes"])
+            out.seek(checkpoint["output_bytes"])
+            if self.workers > 1:
+                self._run_pool(out, checkpoint, seller_ids, seller_arrays, material_codes)
+            else:
+                self._run_inline(out, checkpoint, seller_ids, seller_arrays, material_codes)
+
+        return {
+            "buyers": checkpoint["buyers_done"],
+            "sellers": len(seller_ids),
+            "chunks": checkpoint["next_chunk"],
+            "seconds": round(time.perf_counter() - started, 3),
+        }
+
+    def _prepare_sellers(self):
+        material_codes = self.matcher.materials.codes()
+        seller_ids = []
+        parts = {name: [] for name in SELLER_ARRAYS}
+        for chunk in iter_chunks(self.sellers_path, self.chunk_size):
+            arrays = self.matcher._seller_arrays(chunk, material_codes)
+            for name in SELLER_ARRAYS:
+                parts[name].append(arrays[name])
+            seller_ids.extend(s["id"] for s in chunk)
+        if not seller_ids:
+            raise ValueError(f"No sellers in {self.sellers_path}")
+        return seller_ids, {name: np.concatenate(p) for name, p in parts.items()}, material_codes
+
+    def _pending_chunks(self, checkpoint: Dict):
+        for index, buyers in enumerate(iter_chunks(self.buyers_path, self.chunk_size)):
+            if index >= checkpoint["next_chunk"]:
+                yield index, buyers
+
+    def _run_inline(self, out, checkpoint, seller_ids, seller_arrays, material_codes):
+        for index, buyers in self._pending_chunks(checkpoint):
+            result = score_chunk(self.matcher, seller_arrays, material_codes, buyers,
+                                 self.top_k, self.max_block_cells)
+            self._write_chunk(out, checkpoint, index, [b["id"] for b in buyers], seller_ids, result)
+
+    def _run_pool(self, out, checkpoint, seller_ids, seller_arrays, material_codes):
+        seller_dir = tempfile.mkdtemp(prefix="bulk-match-sellers-")
+        try:
+            for name, array in seller_arrays.items():
+                np.save(os.path.join(seller_dir, name + ".npy"), array)
+            pool = get_context().Pool(
+                self.workers, initializer=_init_worker,
+                initargs=(seller_dir, material_codes, self.trust_records, self.matcher.model))
+            try:
+                # Bounded window of in-flight chunks keeps memory flat; results
+                # are written in chunk order so the checkpoint stays a prefix
+                in_flight = deque()
+                for index, buyers in self._pending_chunks(checkpoint):
+                    task = pool.apply_async(_score_in_worker, (buyers, self.top_k, self.max_block_cells))
+                    in_flight.append((index, [b["id"] for b in buyers], task))
+                    if len(in_flight) >= 2 * self.workers:
+                        self._drain_one(out, checkpoint, seller_ids, in_flight)
+                while in_flight:
+                    self._drain_one(out, checkpoint, seller_ids, in_flight)
+            finally:
+                pool.terminate()
+                pool.join()
+        finally:
+            shutil.rmtree(seller_dir, ignore_errors=True)
+
+    def _drain_one(self, out, checkpoint, seller_ids, in_flight):
+        index, buyer_ids, task = in_flight.popleft()
+        self._write_chunk(out, checkpoint, index, buyer_ids, seller_ids, task.get())
+
+    def _write_chunk(self, out, checkpoint, index, buyer_ids, seller_ids, result):
+        positions, scores = result
+        for buyer_id, row_positions, row_scores in zip(buyer_ids, positions, scores):
+            out.write(json.dumps({
+                "buyer_id": buyer_id,
+                "matches": [{"seller_id": seller_ids[p], "revolutionary_score": round(float(s), 3)}
+                            for p, s in zip(row_positions, row_scores)],
+            }) + "\n")
+        out.flush()
+        os.fsync(out.fileno())
+        checkpoint["next_chunk"] = index + 1
+        checkpoint["buyers_done"] += len(buyer_ids)
+        checkpoint["output_bytes"] = out.tell()
+        self._save_checkpoint(checkpoint)
+
+    def _fingerprint(self) -> str:
+        # A checkpoint is only valid for the same inputs, model and chunking:
+        # both files by path, size and mtime (a rewritten buyers file would
+        # otherwise resume mid-way through different buyers), plus trust records
+        key = [self.top_k, self.chunk_size, self.matcher.model_name,
+               json.dumps(self.trust_records, sort_keys=True, default=str)]
+        for path in (self.buyers_path, self.sellers_path):
+            stat = os.stat(path)
+            key += [os.path.abspath(path), stat.st_size, stat.st_mtime_ns]
+        return hashlib.sha1(json.dumps(key).encode()).hexdigest()
+
+    def _load_checkpoint(self) -> Dict:
+        fresh = {"fingerprint": self._fingerprint(), "next_chunk": 0, "buyers_done": 0, "output_bytes": 0}
+        if not os.path.exists(self.checkpoint_path):
+            return fresh
+        with open(self.checkpoint_path) as f:
+            checkpoint = json.load(f)
+        return checkpoint if checkpoint.get("fingerprint") == fresh["fingerprint"] else fresh
+
+    def _save_checkpoint(self, checkpoint: Dict):
+        tmp = self.checkpoint_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(checkpoint, f)
+        os.replace(tmp, self.checkpoint_path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score every buyer against every seller and write top-k matches as JSONL")
+    parser.add_argument("buyers", help="buyers (.jsonl or .parquet)")
+    parser.add_argument("sellers", help="sellers (.jsonl or .parquet)")
+    parser.add_argument("output", help="output .jsonl (one line per buyer)")
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--chunk-size", type=int, default=1024)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--checkpoint", help="checkpoint file (default: <output>.checkpoint)")
+    parser.add_argument("--trust", help="JSON file of trust records keyed by participant id")
+    args = parser.parse_args(argv)
+
+    trust_records = None
+    if args.trust:
+        with open(args.trust) as f:
+            trust_records = json.load(f)
+
+    job = BulkMatchJob(args.buyers, args.sellers, args.output, top_k=args.top_k,
+                       chunk_size=args.chunk_size, workers=args.workers,
+                       checkpoint_path=args.checkpoint, trust_records=trust_records)
+    print(json.dumps(job.run()))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,266 @@
+import atexit
+import glob
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Not on POSIX: no cross-process locking, one process per disk_path
+    fcntl = None
+
+
+class EmbeddingCache:
+    """Shared text-embedding cache keyed by model name plus a hash of the text
+
+    The memory tier is a bounded LRU. The optional disk tier keeps one
+    memory-mapped ring of float32 rows per embedding width (so every model's
+    vectors persist), and embeddings survive restarts. Several processes may
+    share one disk_path: new vectors are batched and written under a file
+    lock, and each flush also picks up rows the other processes wrote.
+    """
+    def __init__(self, max_entries: int = 50000, disk_path: Optional[str] = None,
+                 disk_capacity: int = 200000, flush_every: int = 1000):
+        self.max_entries = max_entries
+        self.disk_path = disk_path
+        self.disk_capacity = disk_capacity
+        self.flush_every = flush_every
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0, "disk_evictions": 0}
+
+        # Disk tier: one ring per embedding width, plus vectors not yet written
+        self._disk_rings: Dict[int, _DiskRing] = {}
+        self._disk_pending: Dict[bytes, np.ndarray] = {}
+        if disk_path:
+            os.makedirs(disk_path, exist_ok=True)
+            self._open_disk_rings()
+
+    @staticmethod
+    def make_key(model_name: str, text: str) -> str:
+        """Cache key for one text under one model"""
+        return hashlib.sha1(f"{model_name}\0{text}".encode("utf-8")).hexdigest()
+
+    def encode(self, model, model_name: str, texts: List[str]) -> np.ndarray:
+        """Embeddings for texts, encoding only the cache misses in a single batch"""
+        keys = [self.make_key(model_name, t) for t in texts]
+        found = [self.get(k) for k in keys]
+
+        missing = [i for i, vec in enumerate(found) if vec is None]
+        if missing:
+            # Encode each distinct missing text once
+            unique = list(dict.fromkeys(texts[i] for i in missing))
+            encoded = np.asarray(model.encode(unique), dtype=np.float32)
+            by_text = dict(zip(unique, encoded))
+            for i in missing:
+                found[i] = by_text[texts[i]]
+            for text, vec in by_text.items():
+                self.put(self.make_key(model_name, text), vec)
+
+        if not found:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.vstack(found)
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """Look up one embedding, promoting disk hits into memory"""
+        with self._lock:
+            vec = self._memory.get(key)
+            if vec is not None:
+                self._memory.move_to_end(key)
+                self._counters["hits"] += 1
+                return vec
+
+            if self._disk_rings:
+                digest = _digest(key)
+                for ring in self._disk_rings.values():
+                    vec = ring.get(digest)
+                    if vec is not None:
+                        self._counters["disk_hits"] += 1
+                        self._remember(key, vec)
+                        return vec
+
+            self._counters["misses"] += 1
+            return None
+
+    def put(self, key: str, vec: np.ndarray):
+        """Store one embedding in both tiers"""
+        vec = np.asarray(vec, dtype=np.float32)
+        with self._lock:
+            self._remember(key, vec)
+            if self.disk_path:
+                digest = _digest(key)
+                if not any(digest in ring.index for ring in self._disk_rings.values()):
+                    self._disk_pending[digest] = vec
+                    if len(self._disk_pending) >= self.flush_every:
+                        self._flush_disk()
+
+    def stats(self) -> Dict:
+        """Hit-rate and eviction counters"""
+        with self._lock:
+            stats = dict(self._counters)
+            stats["memory_entries"] = len(self._memory)
+            stats["disk_entries"] = sum(len(ring.index) for ring in self._disk_rings.values())
+        lookups = stats["hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = (stats["hits"] + stats["disk_hits"]) / lookups if lookups else 0.0
+        return stats
+
+    def flush(self):
+        """Persist the disk tier's vectors and index"""
+        with self._lock:
+            self._flush_disk()
+
+    def clear(self):
+        """Drop the memory tier (the disk tier is left intact)"""
+        with self._lock:
+            self._memory.clear()
+
+    def _remember(self, key: str, vec: np.ndarray):
+        self._memory[key] = vec
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self._counters["evictions"] += 1
+
+    # Disk tier
+
+    def _open_disk_rings(self):
+        for header in glob.glob(os.path.join(self.disk_path, "ring-*.json")):
+            dim = int(os.path.basename(header)[len("ring-"):-len(".json")])
+            self._disk_rings[dim] = _DiskRing(self.disk_path, dim, self.disk_capacity)
+
+    def _flush_disk(self):
+        if not self._disk_pending:
+            return
+        by_dim: Dict[int, List[Tuple[bytes, np.ndarray]]] = {}
+        for digest, vec in self._disk_pending.items():
+            by_dim.setdefault(vec.shape[0], []).append((digest, vec))
+        for dim, entries in by_dim.items():
+            ring = self._disk_rings.get(dim)
+            if ring is None:
+                ring = self._disk_rings[dim] = _DiskRing(self.disk_path, dim, self.disk_capacity)
+            self._counters["disk_evictions"] += ring.write(entries)
+        self._disk_pending.clear()
+
+
+class _DiskRing:
+    """Disk rows for one embedding width, shared by every process using the directory
+
+    vectors-<dim>.f32 holds the embeddings and keys-<dim>.bin the 20-byte
+    key digest of each row, so a row overwritten by another process is seen
+    as a miss rather than returned under the wrong key. ring-<dim>.json
+    records the capacity and the next row to write (oldest first once full).
+    Files are created once at full size and only ever opened "r+"; writes
+    happen under an exclusive flock of the directory's lock file.
+    """
+    def __init__(self, path: str, dim: int, capacity: int):
+        self.path = path
+        self.dim = dim
+        self.header_file = os.path.join(path, f"ring-{dim}.json")
+        with self._locked():
+            header = self._read_header()
+            if header is None:
+                header = {"dim": dim, "capacity": capacity, "next_row": 0}
+            self.capacity = header["capacity"]
+            self.vectors = self._open(f"vectors-{dim}.f32", np.float32, (self.capacity, dim))
+            self.digests = self._open(f"keys-{dim}.bin", np.uint8, (self.capacity, 20))
+            self._write_header(header)
+            self.refresh()
+
+    def get(self, digest: bytes) -> Optional[np.ndarray]:
+        row = self.index.get(digest)
+        if row is None:
+            return None
+        # Writers clear a row's digest before overwriting its vector, so a
+        # digest that matches on both sides of the copy brackets a whole vector
+        if self.digests[row].tobytes() == digest:
+            vec = np.array(self.vectors[row])
+            if self.digests[row].tobytes() == digest:
+                return vec
+        # Reused by another process since our last refresh
+        del self.index[digest]
+        return None
+
+    def write(self, entries: List[Tuple[bytes, np.ndarray]]) -> int:
+        """Append rows at the shared write position; returns how many live rows were overwritten"""
+        with self._locked():
+            header = self._read_header()
+            rows = (header["next_row"] + np.arange(len(entries))) % self.capacity
+            evicted = int(self.digests[rows].any(axis=1).sum())
+            # Invalidate the rows before their vectors change, and publish the
+            # new digests only once the vectors are in place (readers don't lock)
+            self.digests[rows] = 0
+            self.digests.flush()
+            self.vectors[rows] = np.stack([vec for _, vec in entries])
+            self.vectors.flush()
+            self.digests[rows] = np.frombuffer(b"".join(digest for digest, _ in entries),
+                                               dtype=np.uint8).reshape(-1, 20)
+            self.digests.flush()
+            row = int(rows[-1] + 1) % self.capacity
+            header["next_row"] = row
+            self._write_header(header)
+            self.refresh()
+        return evicted
+
+    def refresh(self):
+        """Rebuild the digest -> row index from the rows on disk"""
+        live = np.flatnonzero(self.digests.any(axis=1))
+        blob = self.digests[live].tobytes()
+        self.index = dict(zip((blob[i:i + 20] for i in range(0, len(blob), 20)), live.tolist()))
+
+    def _open(self, name: str, dtype, shape) -> np.memmap:
+        file = os.path.join(self.path, name)
+        size = int(np.prod(shape)) * np.dtype(dtype).itemsize
+        with open(file, "ab") as f:
+            # Never truncates: a file another process created is left as is
+            if f.tell() < size:
+                f.truncate(size)
+        return np.memmap(file, dtype=dtype, mode="r+", shape=shape)
+
+    def _read_header(self) -> Optional[Dict]:
+        if not os.path.exists(self.header_file):
+            return None
+        with open(self.header_file) as f:
+            return json.load(f)
+
+    def _write_header(self, header: Dict):
+        tmp = f"{self.header_file}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(header, f)
+        os.replace(tmp, self.header_file)
+
+    @contextmanager
+    def _locked(self):
+        if fcntl is None:
+            yield
+            return
+        with open(os.path.join(self.path, "lock"), "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _digest(key: str) -> bytes:
+    return hashlib.sha1(key.encode("utf-8")).digest()
+
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def get_default_cache() -> EmbeddingCache:
+    """Process-wide cache shared by all matchers (disk tier via EMBEDDING_CACHE_DIR)"""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = EmbeddingCache(disk_path=os.environ.get("EMBEDDING_CACHE_DIR"))
+            if _default_cache.disk_path:
+                atexit.register(_default_cache.flush)
+        return _default_cache
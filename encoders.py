@@ -0,0 +1,75 @@
+import hashlib
+import os
+import re
+import threading
+from typing import List
+
+import numpy as np
+
+
+class SentenceTransformerEncoder:
+    """SentenceTransformer backend that imports and loads the model on first use"""
+    def __init__(self, model_name: str, **model_kwargs):
+        self.name = model_name
+        self.model_kwargs = model_kwargs
+        self._model = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._model is not None
+
+    def warmup(self):
+        """Import sentence_transformers and load the model now"""
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    from sentence_transformers import SentenceTransformer
+                    self._model = SentenceTransformer(self.name, **self.model_kwargs)
+        return self
+
+    def __getstate__(self):
+        # Ship only the configuration to worker processes; each loads its own copy
+        return {"name": self.name, "model_kwargs": self.model_kwargs}
+
+    def __setstate__(self, state):
+        self.__init__(state["name"], **state["model_kwargs"])
+
+    def encode(self, texts: List[str], **kwargs) -> np.ndarray:
+        self.warmup()
+        return np.asarray(self._model.encode(texts, **kwargs), dtype=np.float32)
+
+
+class HashingEncoder:
+    """Deterministic offline encoder: signed feature hashing of word tokens
+
+    Needs nothing beyond NumPy, so tests, benchmarks and offline deployments
+    can run the full matching pipeline without downloading a model. Texts that
+    share words get positive cosine similarity.
+    """
+    loaded = True
+
+    def __init__(self, dim: int = 384, name: str = None):
+        self.dim = dim
+        self.name = name or f"hashing-{dim}"
+
+    def warmup(self):
+        return self
+
+    def encode(self, texts: List[str], **kwargs) -> np.ndarray:
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for token in re.findall(r"\w+", text.lower()):
+                digest = int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "little")
+                out[row, digest % self.dim] += 1.0 if (digest >> 63) else -1.0
+        norms = np.linalg.norm(out, axis=1, keepdims=True)
+        return out / np.maximum(norms, 1e-12)
+
+
+def make_encoder(default_model: str):
+    """Encoder named by MATCHER_ENCODER (a model name, or "hashing[:dim]"), else default_model"""
+    spec = os.environ.get("MATCHER_ENCODER", default_model)
+    if spec == "hashing" or spec.startswith("hashing:"):
+        _, _, dim = spec.partition(":")
+        return HashingEncoder(int(dim) if dim else 384)
+    return SentenceTransformerEncoder(spec)
@@ -0,0 +1,125 @@
+import math
+from typing import Dict, List, Optional
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0088
+MAX_DISTANCE_KM = 500.0  # Beyond this a pair earns no distance credit
+
+
+def coordinates(records: List[Dict]) -> np.ndarray:
+    """(n, 2) latitude/longitude in degrees; NaN rows for records without a location"""
+    out = np.full((len(records), 2), np.nan)
+    for row, record in enumerate(records):
+        lat, lon = record.get('latitude'), record.get('longitude')
+        if lat is not None and lon is not None:
+            out[row] = (lat, lon)
+    return out
+
+
+def unit_vectors(latlon: np.ndarray) -> np.ndarray:
+    """Points on the unit sphere (float64, NaN rows stay NaN)"""
+    lat, lon = np.radians(latlon[:, 0]), np.radians(latlon[:, 1])
+    cos_lat = np.cos(lat)
+    return np.column_stack([cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)])
+
+
+def haversine_block(a_xyz: np.ndarray, b_xyz: np.ndarray) -> np.ndarray:
+    """Great-circle km between every row of a and every row of b
+
+    The haversine of the central angle is a quarter of the squared chord
+    between the unit vectors, so one matrix product gives the whole block.
+    """
+    chord_sq = 2.0 - 2.0 * (a_xyz @ b_xyz.T)
+    np.clip(chord_sq, 0.0, 4.0, out=chord_sq)
+    return 2.0 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(chord_sq) / 2.0)
+
+
+def haversine_pairs(a_xyz: np.ndarray, b_xyz: np.ndarray) -> np.ndarray:
+    """Great-circle km between matching rows of a and b"""
+    chord_sq = np.clip(np.sum((a_xyz - b_xyz) ** 2, axis=1), 0.0, 4.0)
+    return 2.0 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(chord_sq) / 2.0)
+
+
+def distance_score(distance_km, max_km: float = MAX_DISTANCE_KM):
+    """1 at zero distance falling linearly to 0 at max_km (NaN stays NaN)"""
+    return np.maximum(0, 1 - np.asarray(distance_km) / max_km)
+
+
+def pair_distance_km(buyer: Dict, seller: Dict) -> Optional[float]:
+    """Haversine km between two located records, or None if either has no location"""
+    # Scalar math: NumPy call overhead dominates for a single pair
+    lat1, lon1 = buyer.get('latitude'), buyer.get('longitude')
+    lat2, lon2 = seller.get('latitude'), seller.get('longitude')
+    if lat1 is None or lon1 is None or lat2 is None or lon2 is None:
+        return None
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    h = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(min(1.0, h)))
+
+
+def spatial_order(latlon: np.ndarray) -> np.ndarray:
+    """Permutation that sorts records along a Morton (Z-order) curve, so
+    neighbours in the order are mostly neighbours on the map"""
+    scaled = (latlon + (90.0, 180.0)) / (180.0, 360.0) * 0xFFFF
+    cells = np.nan_to_num(scaled, nan=0xFFFF).clip(0, 0xFFFF).astype(np.uint64)
+    code = np.zeros(len(latlon), dtype=np.uint64)
+    for bit in range(16):
+        code |= ((cells[:, 0] >> np.uint64(bit)) & np.uint64(1)) << np.uint64(2 * bit + 1)
+        code |= ((cells[:, 1] >> np.uint64(bit)) & np.uint64(1)) << np.uint64(2 * bit)
+    return np.argsort(code, kind='stable')
+
+
+class NeighborPairs:
+    """Directed (row, col, km) pairs within a distance cutoff, saveable for reuse"""
+    def __init__(self, rows: np.ndarray, cols: np.ndarray, km: np.ndarray, n: int):
+        self.rows = rows
+        self.cols = cols
+        self.km = km
+        self.n = n
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def save(self, path: str):
+        np.savez(path, rows=self.rows, cols=self.cols, km=self.km, n=self.n)
+
+    @classmethod
+    def load(cls, path: str) -> "NeighborPairs":
+        with np.load(path) as data:
+            return cls(data['rows'], data['cols'], data['km'], int(data['n']))
+
+
+class GeoIndex:
+    """k-d tree over record locations for radius queries
+
+    Points are unit vectors, so a great-circle radius maps to a chord radius
+    and the Euclidean tree answers it exactly. Records without a location
+    are not indexed and never appear in results.
+    """
+    def __init__(self, latlon: np.ndarray):
+        from scipy.spatial import cKDTree  # SciPy, only needed for indexing
+        self.n = len(latlon)
+        self.xyz = unit_vectors(latlon)
+        self.located = np.flatnonzero(~np.isnan(self.xyz[:, 0]))
+        self._tree = cKDTree(self.xyz[self.located])
+
+    @classmethod
+    def from_records(cls, records: List[Dict]) -> "GeoIndex":
+        return cls(coordinates(records))
+
+    def pairs_within(self, max_km: float = MAX_DISTANCE_KM) -> NeighborPairs:
+        """Every ordered pair of distinct records at most max_km apart"""
+        pairs = self._tree.query_pairs(_chord(max_km), output_type='ndarray')
+        i, j = self.located[pairs[:, 0]], self.located[pairs[:, 1]]
+        km = haversine_pairs(self.xyz[i], self.xyz[j])
+        return NeighborPairs(np.concatenate([i, j]), np.concatenate([j, i]), np.concatenate([km, km]), self.n)
+
+    def within(self, latitude: float, longitude: float, max_km: float = MAX_DISTANCE_KM) -> np.ndarray:
+        """Indices of records at most max_km from a point"""
+        point = unit_vectors(np.array([[latitude, longitude]]))[0]
+        return np.sort(self.located[self._tree.query_ball_point(point, _chord(max_km))])
+
+
+def _chord(km: float) -> float:
+    return 2.0 * np.sin(min(km / EARTH_RADIUS_KM, np.pi) / 2.0)
@@ -1,70 +1,119 @@
 import os
 from typing import List, Dict, Tuple
-from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
 import numpy as np
+from embedding_cache import EmbeddingCache, get_default_cache
+from encoders import make_encoder
+from seller_index import SellerIndex
+from seller_catalog import SellerCatalog
+from instrumentation import Metrics, cache_gauges
 
 class IndustrialAIMatchingService:
-    def __init__(self):
-        # Load pre-trained Hugging Face model
-        self.model = SentenceTransformer('all-MiniLM-L6-v2')
+    def __init__(self, embedding_cache: EmbeddingCache = None, encoder=None,
+                 index_precision: str = 'float32', index_keep_full: bool = False, metrics: Metrics = None):
+        # Pre-trained Hugging Face model, loaded on first use (see warmup())
+        self.model = encoder or make_encoder('all-MiniLM-L6-v2')
+        self.model_name = self.model.name
+        self.embedding_cache = embedding_cache or get_default_cache()
+        # Persistent catalog for match_indexed()
+        # ('float16'/'int8' trade a little recall for 2-4x less vector memory)
+        self.seller_index = SellerIndex(precision=index_precision, keep_full=index_keep_full)
+        self.seller_catalog = SellerCatalog()
+        # Per-stage timers and counters (no-ops unless enabled, see Metrics.from_env)
+        self.metrics = metrics or Metrics.from_env('industrial')
+        self.metrics.add_collector(lambda: cache_gauges(self.embedding_cache))
         
+    def warmup(self):
+        """Load the encoder now instead of on the first request"""
+        self.model.warmup()
+        self.embedding_cache.encode(self.model, self.model_name, ["warmup"])
+        return self
+    
+    def index_sellers(self, seller_profiles: List[Dict]):
+        """Add or update sellers in the persistent catalog index"""
+        seller_texts = [self._prepare_seller_text(seller) for seller in seller_profiles]
+        embeddings = self._encode(seller_texts)
+        self.seller_index.add_many([seller["id"] for seller in seller_profiles], embeddings)
+        self.seller_catalog.add_many(seller_profiles)
+    
+    def remove_seller(self, seller_id):
+        """Drop a seller from the persistent catalog index"""
+        self.seller_index.remove(seller_id)
+        self.seller_catalog.remove(seller_id)
+    
+    def match_indexed(self, buyer_needs: Dict, top_k: int = 10, shortlist_size: int = 500) -> List[Tuple[float, int]]:
+        """Match against the indexed catalog: semantic shortlist first, full scoring on the shortlist only"""
+        with self.metrics.request('match_indexed'):
+            with self.metrics.stage('prepare_text'):
+                buyer_text = self._prepare_buyer_text(buyer_needs)
+            buyer_embedding = self._encode([buyer_text])[0]
+            
+            # Candidate shortlist by semantic similarity
+            with self.metrics.stage('index_search'):
+                seller_ids, similarities = self.seller_index.search(buyer_embedding, max(top_k, shortlist_size))
+                slots = self.seller_catalog.slots_for(seller_ids)
+            
+            combined = self._combine_scores(buyer_needs, self.seller_catalog, slots, similarities)
+            with self.metrics.stage('top_k'):
+                return self._top_matches(combined, seller_ids, top_k)
+    
     def match_buyers_sellers(self, buyer_needs: Dict, seller_profiles: List[Dict]) -> List[Tuple[float, int]]:
         """Find best matches between buyers and sellers using AI"""
-        # Prepare buyer embedding
-        buyer_text = self._prepare_buyer_text(buyer_needs)
-        buyer_embedding = self.model.encode([buyer_text])[0]
-        
-        # Prepare seller embeddings
-        seller_embeddings = []
-        seller_data = []
-        for seller in seller_profiles:
-            seller_text = self._prepare_seller_text(seller)
-            embedding = self.model.encode([seller_text])[0]
-            seller_embeddings.append(embedding)
-            seller_data.append(seller)
-        
-        # Calculate semantic similarity scores
-        similarities = cosine_similarity([buyer_embedding], seller_embeddings)[0]
-        
-        # Calculate industry compatibility scores
-        industry_scores = []
-        for seller in seller_profiles:
-            score = 1.0 if buyer_needs["industry"] in seller["industries"] else 0.0
-            industry_scores.append(score)
-        
-        # Calculate capability matching scores
-        capability_scores = []
-        for seller in seller_profiles:
-            common_capabilities = set(buyer_needs["required_capabilities"]) & set(seller["capabilities"])
-            score = len(common_capabilities) / max(len(buyer_needs["required_capabilities"]), 1)
-            capability_scores.append(score)
-        
-        # Calculate pricing compatibility scores
-        pricing_scores = []
-        for seller in seller_profiles:
-            if seller["pricing_range"][0] <= buyer_needs["budget"] <= seller["pricing_range"][1]:
-                score = 1.0
-            elif buyer_needs["budget"] < seller["pricing_range"][0]:
-                score = 0.2  # Buyer budget too low
-            else:
-                score = 0.5  # Buyer budget higher than seller range
-            pricing_scores.append(score)
+        with self.metrics.request('match_buyers_sellers'):
+            # Prepare buyer embedding
+            with self.metrics.stage('prepare_text'):
+                buyer_text = self._prepare_buyer_text(buyer_needs)
+                seller_texts = [self._prepare_seller_text(seller) for seller in seller_profiles]
+            buyer_embedding = self._encode([buyer_text])[0]
+            
+            # Prepare seller embeddings (unchanged catalog entries are cache hits)
+            seller_embeddings = self._encode(seller_texts)
+            
+            # Calculate semantic similarity scores (cosine)
+            with self.metrics.stage('cosine'):
+                seller_norms = np.maximum(np.linalg.norm(seller_embeddings, axis=1), 1e-12)
+                buyer_norm = max(float(np.linalg.norm(buyer_embedding)), 1e-12)
+                similarities = (seller_embeddings @ buyer_embedding) / (seller_norms * buyer_norm)
+            
+            # Industry, capability and pricing terms over a columnar view of the sellers
+            # (row i is seller_profiles[i], so repeated ids are each scored)
+            with self.metrics.stage('build_catalog'):
+                catalog = SellerCatalog.from_profiles(seller_profiles)
+            combined = self._combine_scores(buyer_needs, catalog, np.arange(len(seller_profiles)), similarities)
+            with self.metrics.stage('top_k'):
+                return self._top_matches(combined, catalog.ids, 10)
+    
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        """Embeddings for texts through the cache, counted and timed"""
+        self.metrics.inc('encode_calls')
+        self.metrics.observe('encode_batch_size', len(texts))
+        with self.metrics.stage('encode'):
+            return self.embedding_cache.encode(self.model, self.model_name, texts)
+    
+    def _combine_scores(self, buyer_needs: Dict, catalog: SellerCatalog, slots: np.ndarray, similarities: np.ndarray) -> np.ndarray:
+        """Weighted semantic, industry, capability and pricing score per seller slot"""
+        with self.metrics.stage('structured_scores'):
+            industry_scores, capability_scores, pricing_scores = catalog.structured_scores(buyer_needs, slots)
         
         # Combine scores (weighted average)
-        combined_scores = []
-        for i, seller in enumerate(seller_profiles):
-            combined = (
-                0.4 * similarities[i] + 
-                0.2 * industry_scores[i] +
-                0.2 * capability_scores[i] +
-                0.2 * pricing_scores[i]
+        with self.metrics.stage('combine'):
+            return (
+                0.4 * np.asarray(similarities) +
+                0.2 * industry_scores +
+                0.2 * capability_scores +
+                0.2 * pricing_scores
             )
-            combined_scores.append((combined, seller["id"]))
-        
-        # Sort matches by combined score descending and return top matches
-        combined_scores.sort(key=lambda x: x[0], reverse=True)
-        return combined_scores[:10]
+    
+    def _top_matches(self, combined: np.ndarray, seller_ids: List, k: int) -> List[Tuple[float, int]]:
+        """Top-k (score, seller_id) pairs by score descending, without a full sort"""
+        if len(combined) > k:
+            # Everything scoring at least the k-th best, in input order, so ties
+            # (including those at the cut) keep list.sort's order
+            kth = -np.partition(-combined, k - 1)[k - 1]
+            top = np.flatnonzero(combined >= kth)
+        else:
+            top = np.arange(len(combined))
+        top = top[np.argsort(-combined[top], kind="stable")][:k]
+        return [(float(combined[i]), seller_ids[i]) for i in top]
     
     def _prepare_buyer_text(self, buyer: Dict) -> str:
         """Prepare text for buyer embedding"""
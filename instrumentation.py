@@ -0,0 +1,174 @@
+import bisect
+import cProfile
+import os
+import random
+import threading
+import time
+from contextlib import nullcontext
+from typing import Callable, Dict, List, Optional
+
+# Upper bounds (seconds) of the stage latency histogram buckets
+STAGE_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+_DISABLED = nullcontext()
+
+
+class Metrics:
+    """Per-stage timers, counters and value summaries for one matching pipeline
+
+    Wrap hot-path stages in `with metrics.stage("encode"):`. When disabled,
+    stage() and request() return a shared no-op context and inc()/observe()
+    return immediately, so instrumentation can stay in production code.
+
+    Collectors registered with add_collector() are polled at export time
+    (e.g. embedding cache hit rates). With profile_rate > 0 a random sample
+    of request() blocks runs under cProfile and the profile is passed to
+    profile_hook(request_name, profile).
+    """
+    def __init__(self, pipeline: str, enabled: bool = True, profile_rate: float = 0.0,
+                 profile_hook: Optional[Callable] = None):
+        self.pipeline = pipeline
+        self.enabled = enabled
+        self.profile_rate = profile_rate
+        self.profile_hook = profile_hook
+        self._lock = threading.Lock()
+        self._stages: Dict[str, List] = {}    # name -> [count, sum, max, bucket counts]
+        self._counters: Dict[str, float] = {}
+        self._summaries: Dict[str, List] = {}  # name -> [count, sum, max]
+        self._collectors: List[Callable[[], Dict[str, float]]] = []
+
+    @classmethod
+    def from_env(cls, pipeline: str) -> "Metrics":
+        """Enabled by MATCHER_METRICS=1; MATCHER_PROFILE_RATE sets the profiling sample rate"""
+        return cls(pipeline, enabled=os.environ.get("MATCHER_METRICS", "0") not in ("0", "", "off"),
+                   profile_rate=float(os.environ.get("MATCHER_PROFILE_RATE", "0")))
+
+    def stage(self, name: str):
+        """Context manager timing one pipeline stage"""
+        if not self.enabled:
+            return _DISABLED
+        return _StageTimer(self, name)
+
+    def request(self, name: str):
+        """Like stage(), and a sampled fraction of requests is profiled"""
+        if not self.enabled:
+            return _DISABLED
+        if self.profile_hook is not None and self.profile_rate > 0 and random.random() < self.profile_rate:
+            return _ProfiledRequest(self, name)
+        return _StageTimer(self, name)
+
+    def inc(self, name: str, value: float = 1):
+        """Add to a counter"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def observe(self, name: str, value: float):
+        """Record one value (e.g. a batch size) in a count/sum/max summary"""
+        if not self.enabled:
+            return
+        with self._lock:
+            summary = self._summaries.setdefault(name, [0, 0.0, 0.0])
+            summary[0] += 1
+            summary[1] += value
+            summary[2] = max(summary[2], value)
+
+    def add_collector(self, collector: Callable[[], Dict[str, float]]):
+        """Register a callable whose numeric results are exported as gauges"""
+        self._collectors.append(collector)
+
+    def record_stage(self, name: str, seconds: float):
+        with self._lock:
+            stage = self._stages.get(name)
+            if stage is None:
+                stage = self._stages[name] = [0, 0.0, 0.0, [0] * (len(STAGE_BUCKETS) + 1)]
+            stage[0] += 1
+            stage[1] += seconds
+            stage[2] = max(stage[2], seconds)
+            stage[3][bisect.bisect_left(STAGE_BUCKETS, seconds)] += 1
+
+    def reset(self):
+        with self._lock:
+            self._stages.clear()
+            self._counters.clear()
+            self._summaries.clear()
+
+    def snapshot(self) -> Dict:
+        """Structured copy of every metric"""
+        with self._lock:
+            stages = {name: {"count": s[0], "seconds": s[1], "max_seconds": s[2],
+                             "mean_seconds": s[1] / s[0] if s[0] else 0.0}
+                      for name, s in self._stages.items()}
+            counters = dict(self._counters)
+            summaries = {name: {"count": s[0], "sum": s[1], "max": s[2],
+                                "mean": s[1] / s[0] if s[0] else 0.0}
+                         for name, s in self._summaries.items()}
+        gauges = {}
+        for collector in self._collectors:
+            gauges.update({k: v for k, v in collector().items() if isinstance(v, (int, float))})
+        return {"pipeline": self.pipeline, "enabled": self.enabled, "stages": stages,
+                "counters": counters, "summaries": summaries, "gauges": gauges}
+
+    def to_prometheus(self, prefix: str = "matcher") -> str:
+        """Prometheus text exposition format"""
+        label = f'pipeline="{self.pipeline}"'
+        with self._lock:
+            stages = {name: (s[0], s[1], list(s[3])) for name, s in self._stages.items()}
+            counters = dict(self._counters)
+            summaries = {name: tuple(s) for name, s in self._summaries.items()}
+
+        lines = [f"# TYPE {prefix}_stage_seconds histogram"]
+        for name, (count, total, buckets) in sorted(stages.items()):
+            cumulative = 0
+            for bound, bucket in zip(STAGE_BUCKETS + ("+Inf",), buckets):
+                cumulative += bucket
+                lines.append(f'{prefix}_stage_seconds_bucket{{{label},stage="{name}",le="{bound}"}} {cumulative}')
+            lines.append(f'{prefix}_stage_seconds_sum{{{label},stage="{name}"}} {total}')
+            lines.append(f'{prefix}_stage_seconds_count{{{label},stage="{name}"}} {count}')
+        for name, value in sorted(counters.items()):
+            lines.append(f"# TYPE {prefix}_{name}_total counter")
+            lines.append(f"{prefix}_{name}_total{{{label}}} {value}")
+        for name, (count, total, _) in sorted(summaries.items()):
+            lines.append(f"# TYPE {prefix}_{name} summary")
+            lines.append(f"{prefix}_{name}_sum{{{label}}} {total}")
+            lines.append(f"{prefix}_{name}_count{{{label}}} {count}")
+        for name, value in sorted(self.snapshot()["gauges"].items()):
+            lines.append(f"# TYPE {prefix}_{name} gauge")
+            lines.append(f"{prefix}_{name}{{{label}}} {float(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def cache_gauges(cache, prefix: str = "embedding_cache") -> Dict[str, float]:
+    """A cache's stats() counters and hit rate as <prefix>_* gauges"""
+    return {f"{prefix}_{name}": value for name, value in cache.stats().items()}
+
+
+class _StageTimer:
+    __slots__ = ("metrics", "name", "started")
+
+    def __init__(self, metrics: Metrics, name: str):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.record_stage(self.name, time.perf_counter() - self.started)
+
+
+class _ProfiledRequest(_StageTimer):
+    __slots__ = ("profile",)
+
+    def __enter__(self):
+        self.profile = cProfile.Profile()
+        self.profile.enable()
+        return super().__enter__()
+
+    def __exit__(self, *exc):
+        super().__exit__(*exc)
+        self.profile.disable()
+        self.metrics.inc("profiled_requests")
+        self.metrics.profile_hook(self.name, self.profile)
@@ -0,0 +1,186 @@
+import hashlib
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+# Score for two different materials of the same family (e.g. fly ash offered
+# where slag is wanted); the same canonical material scores 1
+RELATED_SCORE = 0.5
+DEFAULT_EMISSION_FACTOR = 1.0  # kgCO2/kg when a material has no listed factor
+
+# canonical name: (family, emission factor kgCO2/kg or None, synonyms)
+MATERIALS = {
+    'cement': ('mineral', 0.95, ['cement waste', 'cement kiln dust']),
+    'fly ash': ('mineral', None, ['flyash', 'coal ash', 'pulverised fuel ash', 'pfa']),
+    'slag': ('mineral', None, ['steel slag', 'blast furnace slag', 'ggbs']),
+    'gypsum': ('mineral', None, ['fgd gypsum', 'synthetic gypsum']),
+    'steel': ('metal', 1.85, ['steel scrap', 'scrap steel', 'ferrous scrap']),
+    'scrap metal': ('metal', 1.9, ['metals', 'metal', 'metal scrap', 'non-ferrous scrap']),
+    'plastic': ('polymer', 3.5, ['plastics', 'plastic waste', 'plastic scrap']),
+    'textiles': ('fibre', 2.1, ['textile', 'textile offcuts', 'textile waste', 'fabric scraps']),
+    'chemicals': ('chemical', 1.7, ['chemical waste']),
+    'spent solvents': ('chemical', None, ['solvents', 'waste solvents', 'used solvents']),
+    'glass cullet': ('glass', None, ['glass', 'cullet', 'waste glass']),
+    'wood chips': ('biomass', None, ['wood', 'wood waste', 'sawdust']),
+    'cardboard': ('paper', None, ['paper', 'paper waste', 'occ']),
+    'sludge': ('organic', None, ['sewage sludge', 'wastewater sludge']),
+    'food waste': ('organic', None, ['organic waste', 'food scraps']),
+    'waste heat': ('energy', None, ['heat', 'excess heat', 'steam']),
+}
+
+
+@lru_cache(maxsize=4096)
+def normalize_material(name: str) -> str:
+    """Lowercase, with separators ('_', '-', runs of spaces) folded to one space"""
+    return ' '.join(re.split(r'[\s_\-]+', str(name).strip().lower())).strip()
+
+
+class MaterialTaxonomy:
+    """Canonical materials with synonyms, a compatibility matrix and emission factors
+
+    Every synonym maps to the interned id of its canonical material, so
+    'steel_slag' and 'Blast furnace slag' are both 'slag'. compatibility[a, b]
+    is 1 for the same material, related_score within a family and 0
+    otherwise; emission_factors[a] is the material's kgCO2/kg. Names the
+    taxonomy does not know are interned per scoring run by MaterialCodes and
+    only match themselves (after normalization).
+    """
+    def __init__(self, materials: Dict[str, Tuple] = None, related_score: float = RELATED_SCORE,
+                 default_factor: float = DEFAULT_EMISSION_FACTOR):
+        materials = MATERIALS if materials is None else materials
+        self.names: List[str] = []
+        self._ids: Dict[str, int] = {}
+        families: Dict[str, int] = {}
+        family_ids, factors = [], []
+        for name, (family, factor, synonyms) in materials.items():
+            material_id = len(self.names)
+            self.names.append(name)
+            for alias in [name] + list(synonyms):
+                self._ids[normalize_material(alias)] = material_id
+            family_ids.append(-1 if family is None else families.setdefault(family, len(families)))
+            factors.append(default_factor if factor is None else factor)
+        self.default_factor = default_factor
+        self.families = np.array(family_ids, dtype=np.int64)
+        self.emission_factors = np.array(factors, dtype=np.float64)
+
+        same_family = (self.families[:, None] == self.families[None, :]) & (self.families[:, None] >= 0)
+        self.compatibility = np.where(same_family, related_score, 0.0).astype(np.float32)
+        np.fill_diagonal(self.compatibility, 1.0)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def canonical_id(self, name: str) -> Optional[int]:
+        """Interned id of a material or any of its synonyms (None if unknown)"""
+        return self._ids.get(normalize_material(name))
+
+    def canonical_name(self, name: str) -> str:
+        """Canonical name, or the normalized name itself if unknown"""
+        material_id = self.canonical_id(name)
+        return normalize_material(name) if material_id is None else self.names[material_id]
+
+    def compatibility_score(self, waste_type: str, material_needed: str) -> float:
+        """How well a waste stream satisfies a material need (one pair)"""
+        waste_id, material_id = self.canonical_id(waste_type), self.canonical_id(material_needed)
+        if waste_id is None or material_id is None:
+            return float(normalize_material(waste_type) == normalize_material(material_needed))
+        return float(self.compatibility[waste_id, material_id])
+
+    def emission_factor(self, name: str) -> float:
+        """kgCO2/kg saved per kg of the material reused"""
+        material_id = self.canonical_id(name)
+        return self.default_factor if material_id is None else float(self.emission_factors[material_id])
+
+    def fingerprint(self) -> str:
+        """Hash of everything scoring reads from the taxonomy (names, synonyms,
+        compatibility and emission factors)"""
+        digest = hashlib.sha1("\0".join(self.names).encode("utf-8"))
+        digest.update(repr(sorted(self._ids.items())).encode("utf-8"))
+        digest.update(self.compatibility.tobytes())
+        digest.update(self.emission_factors.tobytes())
+        return digest.hexdigest()
+
+    def codes(self) -> "MaterialCodes":
+        """A fresh interner for one scoring run"""
+        return MaterialCodes(self)
+
+
+class MaterialCodes:
+    """Material ids for one scoring run: the taxonomy's canonical ids, then
+    any unknown names in arrival order"""
+    def __init__(self, taxonomy: MaterialTaxonomy):
+        self.taxonomy = taxonomy
+        self.unknown: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.taxonomy) + len(self.unknown)
+
+    def copy(self) -> "MaterialCodes":
+        codes = MaterialCodes(self.taxonomy)
+        codes.unknown = dict(self.unknown)
+        return codes
+
+    def id(self, name: str) -> int:
+        material_id = self.taxonomy.canonical_id(name)
+        if material_id is None:
+            material_id = self.unknown.setdefault(normalize_material(name), len(self.taxonomy) + len(self.unknown))
+        return material_id
+
+    def ids(self, names: Iterable[str]) -> np.ndarray:
+        return np.array([self.id(name) for name in names], dtype=np.int64)
+
+    def compatibility(self) -> np.ndarray:
+        """(len, len) compatibility matrix; unknown materials only match themselves"""
+        n = len(self)
+        matrix = np.eye(n, dtype=np.float32)
+        known = len(self.taxonomy)
+        matrix[:known, :known] = self.taxonomy.compatibility
+        return matrix
+
+    def emission_factors(self) -> np.ndarray:
+        factors = np.full(len(self), self.taxonomy.default_factor, dtype=np.float64)
+        factors[:len(self.taxonomy)] = self.taxonomy.emission_factors
+        return factors
+
+
+class MaterialBuckets:
+    """Seller indices bucketed by accepted material id, for candidate generation
+
+    Sellers are sorted by material id with offsets per id (CSR layout), so
+    the sellers accepting a waste stream are a few contiguous slices.
+    """
+    def __init__(self, material_ids: np.ndarray, compatibility: np.ndarray):
+        self.compatibility = compatibility
+        self.order = np.argsort(material_ids, kind='stable')
+        self.offsets = np.searchsorted(material_ids[self.order], np.arange(len(compatibility) + 1))
+
+    def sellers_accepting(self, waste_id: int) -> np.ndarray:
+        """Indices of sellers whose material is compatible with waste_id"""
+        accepted = np.flatnonzero(self.compatibility[waste_id] > 0)
+        return np.concatenate([np.zeros(0, dtype=np.int64)] +
+                              [self.order[self.offsets[m]:self.offsets[m + 1]] for m in accepted])
+
+    def candidate_pairs(self, waste_ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """(buyer, seller) index pairs whose materials are compatible"""
+        rows, cols = [np.zeros(0, dtype=np.int64)], [np.zeros(0, dtype=np.int64)]
+        buyer_order = np.argsort(waste_ids, kind='stable')
+        distinct, starts = np.unique(waste_ids[buyer_order], return_index=True)
+        for waste_id, lo, hi in zip(distinct.tolist(), starts, np.append(starts[1:], len(waste_ids))):
+            buyers = buyer_order[lo:hi]
+            sellers = self.sellers_accepting(waste_id)
+            rows.append(np.repeat(buyers, len(sellers)))
+            cols.append(np.tile(sellers, len(buyers)))
+        return np.concatenate(rows), np.concatenate(cols)
+
+
+_default_taxonomy: Optional[MaterialTaxonomy] = None
+
+
+def get_default_taxonomy() -> MaterialTaxonomy:
+    """Process-wide taxonomy built from MATERIALS"""
+    global _default_taxonomy
+    if _default_taxonomy is None:
+        _default_taxonomy = MaterialTaxonomy()
+    return _default_taxonomy
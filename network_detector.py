@@ -0,0 +1,291 @@
+import heapq
+from itertools import chain
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+from scipy import sparse
+
+from revolutionary_ai_matching import MAX_NETWORK_SIZE, RevolutionaryAIMatching, score_block, score_pairs
+from slot_allocator import SlotAllocator, grown_capacity
+
+# Fill values for unused slots in the per-participant scoring arrays
+_FILL = {"buyer_xyz": np.nan, "seller_xyz": np.nan}
+
+
+class IncrementalNetworkDetector:
+    """detect_symbiosis_network kept current as participants join, change or leave
+
+    Keeps the per-participant scoring arrays (embeddings included), the
+    viable edges (score >= threshold) as adjacency dicts and the connected
+    clusters. add/update/remove encode one participant, rescore only its row
+    and column (O(N)) and repair only the clusters it touched: clusters its
+    new edges join are merged, and its old cluster is re-searched only if
+    the dropped edges may have split it. networks() ranks the clusters in
+    O(number of clusters); a cluster larger than max_network_size is split
+    as detect_symbiosis_network splits it, once per change to that cluster.
+
+    Trust and forecast terms are captured when a participant is written;
+    call update() again after changing its trust records.
+    """
+    def __init__(self, matcher: RevolutionaryAIMatching, threshold: float = 0.7, limit: int = 5,
+                 max_network_size: Optional[int] = MAX_NETWORK_SIZE):
+        self.matcher = matcher
+        self.threshold = threshold
+        self.limit = limit
+        self.max_network_size = max_network_size
+        self.arrays: Dict[str, np.ndarray] = {}
+        self._material_codes = matcher.materials.codes()
+        self._alive = np.zeros(0, dtype=bool)
+        self._profiles: List[Optional[Dict]] = []
+        self._slots = SlotAllocator()
+
+        # Viable edges: _out[i][j] is the score of i as buyer with j as seller
+        self._out: List[Dict[int, float]] = []
+        self._in: List[Dict[int, float]] = []
+
+        # Clusters (connected components of the edges in either direction)
+        self._label: List[int] = []
+        self._members: Dict[int, Set[int]] = {}
+        self._edge_sums: Dict[int, float] = {}
+        self._edge_counts: Dict[int, int] = {}
+        self._next_label = 0
+        # Oversized clusters' split networks, until the cluster changes
+        self._splits: Dict[int, List[Tuple[float, int, List[int]]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, participant_id) -> bool:
+        return participant_id in self._slots
+
+    def add_many(self, participants: List[Dict]):
+        """Add participants; into a fresh detector they are scored in one blocked pass"""
+        ids = [p['id'] for p in participants]
+        # The blocked pass puts participant i in slot i, so no slot may have
+        # been handed out before (not even one since freed)
+        if self._slots.high_water or len(set(ids)) != len(ids):
+            for participant in participants:
+                self.add(participant)
+            return
+        from symbiosis_graph import build_threshold_graph, connected_clusters
+
+        n = len(participants)
+        slots = [self._allocate(p) for p in participants]
+        self._write_rows(slots, participants)
+        graph = build_threshold_graph(lambda start, stop: score_block(self.arrays, start, stop)[:, :n],
+                                      n, n, self.threshold).tocoo()
+        for i, j, score in zip(graph.row.tolist(), graph.col.tolist(), graph.data.tolist()):
+            self._out[i][j] = score
+            self._in[j][i] = score
+
+        n_clusters, labels = connected_clusters(graph.tocsr())
+        self._members = {}
+        for slot, label in enumerate(labels.tolist()):
+            self._members.setdefault(label, set()).add(slot)
+            self._label[slot] = label
+        self._edge_sums, self._edge_counts = {}, {}
+        for label, members in self._members.items():
+            self._edge_sums[label], self._edge_counts[label] = self._edge_totals(members)
+        self._splits = {}
+        self._next_label = n_clusters
+
+    def add(self, participant: Dict):
+        """Insert or replace one participant and repair the clusters it touches"""
+        slot = self._slots.get(participant['id'])
+        if slot is None:
+            slot = self._allocate(participant)
+        self._profiles[slot] = participant
+        self._write_rows([slot], [participant])
+
+        # Only this participant's row (as buyer) and column (as seller) change
+        live = np.flatnonzero(self._alive)
+        row = score_block(self.arrays, slot, slot + 1)[0, live]
+        column = score_pairs(self.arrays, live, np.full(len(live), slot))
+        others = live != slot
+        out_mask = others & (row >= self.threshold)
+        in_mask = others & (column >= self.threshold)
+        self._set_edges(slot, dict(zip(live[out_mask].tolist(), row[out_mask].tolist())),
+                        dict(zip(live[in_mask].tolist(), column[in_mask].tolist())))
+
+    update = add
+
+    def remove(self, participant_id):
+        """Drop a participant; its slot is reused by later adds"""
+        slot = self._slots.release(participant_id)
+        if slot is None:
+            return
+        self._set_edges(slot, {}, {}, staying=False)
+        label = self._label[slot]
+        members = self._members[label]
+        members.discard(slot)
+        if not members:
+            del self._members[label]
+            del self._edge_sums[label]
+            del self._edge_counts[label]
+        self._label[slot] = -1
+        self._alive[slot] = False
+        self._profiles[slot] = None
+
+    def networks(self, limit: Optional[int] = None) -> List[Dict]:
+        """The best `limit` networks, as detect_symbiosis_network describes them"""
+        scored = []
+        for label, members in self._members.items():
+            if self.max_network_size is None or len(members) <= self.max_network_size:
+                score = self._edge_sums[label] / max(self._edge_counts[label], 1)
+                scored.append((score, -min(members), sorted(members)))
+            else:
+                scored.extend(self._split(label))
+        best = heapq.nlargest(limit or self.limit, scored, key=lambda network: network[:2])
+        return [self.matcher._describe_network([self._profiles[s] for s in slots], score)
+                for score, _, slots in best]
+
+    def _set_edges(self, slot: int, out_edges: Dict[int, float], in_edges: Dict[int, float],
+                   staying: bool = True):
+        label = self._label[slot]
+        old_neighbors = set(self._out[slot]) | set(self._in[slot])
+        self._edge_sums[label] -= sum(self._out[slot].values()) + sum(self._in[slot].values())
+        self._edge_counts[label] -= len(self._out[slot]) + len(self._in[slot])
+        for j in self._out[slot]:
+            del self._in[j][slot]
+        for i in self._in[slot]:
+            del self._out[i][slot]
+
+        affected = {label}
+        self._out[slot] = out_edges
+        self._in[slot] = in_edges
+        for j, score in out_edges.items():
+            self._in[j][slot] = score
+            affected.add(self._label[j])
+        for i, score in in_edges.items():
+            self._out[i][slot] = score
+            affected.add(self._label[i])
+        for changed in affected:
+            self._splits.pop(changed, None)
+
+        # Dropped edges can only split the old cluster if the participants
+        # they touched are no longer connected to each other
+        if self._connected(old_neighbors | {slot} if staying else old_neighbors):
+            self._merge(affected, sum(out_edges.values()) + sum(in_edges.values()),
+                        len(out_edges) + len(in_edges))
+        else:
+            self._relabel(affected)
+
+    def _connected(self, targets: Set[int]) -> bool:
+        # Search from one target and stop as soon as all of them are reached
+        if len(targets) <= 1:
+            return True
+        remaining = set(targets)
+        start = remaining.pop()
+        seen, stack = {start}, [start]
+        while stack:
+            node = stack.pop()
+            for neighbor in chain(self._out[node], self._in[node]):
+                if neighbor not in seen:
+                    seen.add(neighbor)
+                    stack.append(neighbor)
+                    remaining.discard(neighbor)
+                    if not remaining:
+                        return True
+        return False
+
+    def _merge(self, labels: Set[int], added_sum: float, added_count: int):
+        # Relabel the smaller clusters into the largest one
+        keep = max(labels, key=lambda label: len(self._members[label]))
+        for label in labels - {keep}:
+            members = self._members.pop(label)
+            self._edge_sums[keep] += self._edge_sums.pop(label)
+            self._edge_counts[keep] += self._edge_counts.pop(label)
+            for node in members:
+                self._label[node] = keep
+            self._members[keep] |= members
+        self._edge_sums[keep] += added_sum
+        self._edge_counts[keep] += added_count
+
+    def _relabel(self, labels: Set[int]):
+        # Old clusters can only split or merge among themselves, so the new
+        # components are found by a search over their members alone
+        nodes = set()
+        for label in labels:
+            nodes |= self._members.pop(label)
+            del self._edge_sums[label]
+            del self._edge_counts[label]
+        while nodes:
+            start = nodes.pop()
+            component, stack = {start}, [start]
+            while stack:
+                node = stack.pop()
+                for neighbor in chain(self._out[node], self._in[node]):
+                    if neighbor not in component:
+                        component.add(neighbor)
+                        stack.append(neighbor)
+            nodes -= component
+            label = self._next_label
+            self._next_label += 1
+            for node in component:
+                self._label[node] = label
+            self._members[label] = component
+            self._edge_sums[label], self._edge_counts[label] = self._edge_totals(component)
+
+    def _edge_totals(self, members: Set[int]) -> Tuple[float, int]:
+        return (sum(sum(self._out[m].values()) for m in members),
+                sum(len(self._out[m]) for m in members))
+
+    def _split(self, label: int) -> List[Tuple[float, int, List[int]]]:
+        # An oversized cluster's networks, from the same split as the batch path
+        if label not in self._splits:
+            from symbiosis_graph import cluster_network_scores, split_clusters
+
+            slots = np.array(sorted(self._members[label]))
+            out = [self._out[slot] for slot in slots.tolist()]
+            counts = np.fromiter(map(len, out), dtype=np.int64, count=len(out))
+            total = int(counts.sum())
+            local = np.full(len(self._profiles), -1, dtype=np.int64)
+            local[slots] = np.arange(len(slots))
+            cols = local[np.fromiter(chain.from_iterable(out), dtype=np.int64, count=total)]
+            scores = np.fromiter(chain.from_iterable(edges.values() for edges in out), dtype=np.float64, count=total)
+            graph = sparse.csr_matrix((scores, (np.repeat(np.arange(len(slots)), counts), cols)),
+                                      shape=(len(slots), len(slots)))
+            n_networks, labels = split_clusters(graph, self.max_network_size)
+            network_scores = cluster_network_scores(graph, labels, n_networks)
+            groups = [slots[labels == k].tolist() for k in range(n_networks)]
+            self._splits[label] = [(float(network_scores[k]), -group[0], group) for k, group in enumerate(groups)]
+        return self._splits[label]
+
+    def _write_rows(self, slots: List[int], participants: List[Dict]):
+        rows = self.matcher._buyer_arrays(participants, self._material_codes)
+        rows.update(self.matcher._seller_arrays(participants, self._material_codes))
+        for name, values in rows.items():
+            if name not in self.arrays:
+                self.arrays[name] = np.full((len(self._alive),) + values.shape[1:], _FILL.get(name, 0),
+                                            dtype=values.dtype)
+            self.arrays[name][slots] = values
+        # New waste types or materials grow the compatibility matrix
+        if len(self._material_codes) != len(self.arrays.get("material_compatibility", ())):
+            self.arrays["material_compatibility"] = self._material_codes.compatibility()
+
+    def _allocate(self, participant: Dict) -> int:
+        slot = self._slots.allocate(participant['id'])
+        if slot >= len(self._alive):
+            capacity = grown_capacity(len(self._alive))
+            for name, array in self.arrays.items():
+                if name == "material_compatibility":
+                    continue  # indexed by material id, not by slot
+                grown = np.full((capacity,) + array.shape[1:], _FILL.get(name, 0), dtype=array.dtype)
+                grown[:len(array)] = array
+                self.arrays[name] = grown
+            self._alive = np.concatenate([self._alive, np.zeros(capacity - len(self._alive), dtype=bool)])
+        if slot == len(self._profiles):
+            self._profiles.append(None)
+            self._out.append({})
+            self._in.append({})
+            self._label.append(-1)
+        self._profiles[slot] = participant
+        self._alive[slot] = True
+        # A new participant starts as its own cluster
+        label = self._next_label
+        self._next_label += 1
+        self._label[slot] = label
+        self._members[label] = {slot}
+        self._edge_sums[label] = 0.0
+        self._edge_counts[label] = 0
+        return slot
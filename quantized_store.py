@@ -0,0 +1,128 @@
+import os
+from typing import Optional
+
+import numpy as np
+
+PRECISIONS = ('float32', 'float16', 'int8')
+
+
+class QuantizedEmbeddingStore:
+    """Slot-addressed embedding matrix stored as float32, float16 or int8
+
+    int8 rows are symmetrically quantized with one scale per vector
+    (code = round(x / scale), scale = max|x| / 127), so a 768-dim row costs
+    772 bytes instead of 3072. Kernels dequantize one cache-sized block at a
+    time into float32 and use a BLAS matrix product. With keep_full=True the
+    float32 originals are kept for a rescoring pass; after save()/load(mmap=True)
+    they stay on disk and only the rescored rows are paged in.
+
+    Memory-mapped stores are copy-on-write: updates stay in memory and never
+    touch the saved snapshot, and save() replaces files atomically, so a
+    loaded store can be saved back to the path it came from.
+    """
+    def __init__(self, dim: int, precision: str = 'float32', keep_full: bool = False,
+                 block_size: int = 8192):
+        if precision not in PRECISIONS:
+            raise ValueError(f"precision must be one of {PRECISIONS}, got {precision!r}")
+        self.dim = dim
+        self.precision = precision
+        self.keep_full = keep_full and precision != 'float32'
+        self.block_size = block_size
+        self.codes = np.zeros((0, dim), dtype=np.int8 if precision == 'int8' else precision)
+        self.scales = np.ones(0, dtype=np.float32)
+        self.full: Optional[np.ndarray] = np.zeros((0, dim), dtype=np.float32) if self.keep_full else None
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    @property
+    def nbytes(self) -> int:
+        """Resident size of the quantized codes and scales"""
+        return self.codes.nbytes + self.scales.nbytes
+
+    def resize(self, capacity: int):
+        """Grow (or shrink) to `capacity` slots"""
+        self.codes = _resized(self.codes, capacity)
+        self.scales = _resized(self.scales, capacity, fill=1.0)
+        if self.full is not None:
+            self.full = _resized(self.full, capacity)
+
+    def set(self, slot: int, vector: np.ndarray):
+        """Store one vector at a slot"""
+        vector = np.asarray(vector, dtype=np.float32)
+        if self.precision == 'int8':
+            scale = float(np.max(np.abs(vector))) / 127 or 1.0
+            self.codes[slot] = np.clip(np.rint(vector / scale), -127, 127)
+            self.scales[slot] = scale
+        else:
+            self.codes[slot] = vector
+        if self.full is not None:
+            self.full[slot] = vector
+
+    def get(self, slots) -> np.ndarray:
+        """Dequantized float32 vectors for the given slot(s)"""
+        vectors = self.codes[slots].astype(np.float32, copy=False)
+        if self.precision == 'int8':
+            vectors *= self.scales[slots][..., None]
+        return vectors
+
+    def dot(self, slots: np.ndarray, query: np.ndarray) -> np.ndarray:
+        """Approximate query . vector for each slot, scanned in dequantized blocks"""
+        query = np.asarray(query, dtype=np.float32)
+        out = np.empty(len(slots), dtype=np.float32)
+        for start in range(0, len(slots), self.block_size):
+            block = slots[start:start + self.block_size]
+            scores = self.codes[block].astype(np.float32, copy=False) @ query
+            if self.precision == 'int8':
+                # The per-vector scale factors out of the dot product
+                scores *= self.scales[block]
+            out[start:start + len(block)] = scores
+        return out
+
+    def rescore(self, slots: np.ndarray, query: np.ndarray) -> np.ndarray:
+        """Exact float32 query . vector for a (small) candidate set"""
+        if self.full is None:
+            return self.dot(slots, query)
+        return self.full[slots] @ np.asarray(query, dtype=np.float32)
+
+    def save(self, path: str):
+        """Write codes, scales and (if kept) float32 originals as .npy files"""
+        os.makedirs(path, exist_ok=True)
+        save_array(os.path.join(path, 'codes.npy'), self.codes)
+        save_array(os.path.join(path, 'scales.npy'), self.scales)
+        if self.full is not None:
+            save_array(os.path.join(path, 'full.npy'), self.full)
+        elif os.path.exists(os.path.join(path, 'full.npy')):
+            os.remove(os.path.join(path, 'full.npy'))
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = False, **kwargs) -> "QuantizedEmbeddingStore":
+        """Open a saved store; with mmap the arrays are memory-mapped (copy-on-write), not read"""
+        mode = 'c' if mmap else None
+        codes = np.load(os.path.join(path, 'codes.npy'), mmap_mode=mode)
+        precision = 'int8' if codes.dtype == np.int8 else str(codes.dtype)
+        full_file = os.path.join(path, 'full.npy')
+        store = cls(codes.shape[1], precision, keep_full=False, **kwargs)
+        store.codes = codes
+        store.scales = np.load(os.path.join(path, 'scales.npy'), mmap_mode=mode)
+        if os.path.exists(full_file):
+            store.full = np.load(full_file, mmap_mode=mode)
+            store.keep_full = True
+        return store
+
+
+def save_array(path: str, array: np.ndarray):
+    """np.save to a temporary file renamed over path, so readers (and memory
+    maps of the old file) never see a partly written array"""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'wb') as f:
+        np.save(f, array)
+    os.replace(tmp, path)
+
+
+def _resized(array: np.ndarray, capacity: int, fill: float = 0.0) -> np.ndarray:
+    # Copies into memory, so a memory-mapped store becomes resident once it grows
+    out = np.full((capacity,) + array.shape[1:], fill, dtype=array.dtype)
+    n = min(capacity, len(array))
+    out[:n] = array[:n]
+    return out
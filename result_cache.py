@@ -0,0 +1,159 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+
+# One encoder for every key (json.dumps builds a new one per call with these options)
+_CANONICAL_JSON = json.JSONEncoder(sort_keys=True, default=str, separators=(",", ":"))
+
+
+class MemoryBackend:
+    """In-process LRU of (expires_at, value) entries"""
+    def __init__(self, max_entries: int = 100000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[Tuple[float, Dict]]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def set(self, key: str, expires_at: float, value: Dict) -> int:
+        """Store one entry; returns how many LRU entries were evicted"""
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        evicted = 0
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            evicted += 1
+        return evicted
+
+    def delete(self, key: str):
+        self._entries.pop(key, None)
+
+    def clear(self):
+        self._entries.clear()
+
+
+class SqliteBackend:
+    """Local sqlite3 file of JSON entries: survives restarts and can be shared
+    by the worker processes on one host
+
+    LRU order is a last-used timestamp; the table is trimmed back to
+    max_entries every trim_every writes rather than on each one.
+    """
+    def __init__(self, path: str, max_entries: int = 1000000, trim_every: int = 1000):
+        self.path = path
+        self.max_entries = max_entries
+        self.trim_every = trim_every
+        self._writes = 0
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS results "
+                         "(key TEXT PRIMARY KEY, expires REAL, used REAL, value TEXT)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS results_used ON results (used)")
+
+    def __len__(self) -> int:
+        return self._db.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def get(self, key: str) -> Optional[Tuple[float, Dict]]:
+        row = self._db.execute("SELECT expires, value FROM results WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        self._db.execute("UPDATE results SET used = ? WHERE key = ?", (time.time(), key))
+        return row[0], json.loads(row[1])
+
+    def set(self, key: str, expires_at: float, value: Dict) -> int:
+        self._db.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)",
+                         (key, expires_at, time.time(), json.dumps(value, default=float)))
+        self._writes += 1
+        if self._writes % self.trim_every:
+            return 0
+        # Expired entries go first, then the least recently used beyond max_entries
+        evicted = self._db.execute("DELETE FROM results WHERE expires <= ?", (time.time(),)).rowcount
+        evicted += self._db.execute("DELETE FROM results WHERE key IN (SELECT key FROM results "
+                                    "ORDER BY used DESC LIMIT -1 OFFSET ?)", (self.max_entries,)).rowcount
+        return evicted
+
+    def delete(self, key: str):
+        self._db.execute("DELETE FROM results WHERE key = ?", (key,))
+
+    def clear(self):
+        self._db.execute("DELETE FROM results")
+
+
+class ResultCache:
+    """TTL + LRU cache of scoring results under versioned keys
+
+    Callers build keys with make_key() from everything a result depends on
+    (the profiles themselves, trust terms, model fingerprints), so an edited
+    profile or a changed trust record simply misses and the stale entry
+    ages out. Keys hold no process-local state, so a shared backend is
+    reused across worker processes and restarts.
+    The backend is a MemoryBackend unless one is given; any object with
+    get/set/delete/clear like MemoryBackend or SqliteBackend will do.
+    """
+    def __init__(self, max_entries: int = 100000, ttl_seconds: float = 3600.0, backend=None,
+                 clock: Callable[[], float] = time.time):
+        self.ttl_seconds = ttl_seconds
+        self.backend = backend if backend is not None else MemoryBackend(max_entries)
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "expired": 0, "evictions": 0, "invalidations": 0}
+
+    @classmethod
+    def from_env(cls) -> Optional["ResultCache"]:
+        """RESULT_CACHE_SIZE entries (0 disables), RESULT_CACHE_TTL seconds and,
+        with RESULT_CACHE_PATH, a sqlite file instead of process memory"""
+        max_entries = int(os.environ.get("RESULT_CACHE_SIZE", "100000"))
+        if max_entries <= 0:
+            return None
+        path = os.environ.get("RESULT_CACHE_PATH")
+        return cls(max_entries=max_entries, ttl_seconds=float(os.environ.get("RESULT_CACHE_TTL", "3600")),
+                   backend=SqliteBackend(path, max_entries) if path else None)
+
+    @staticmethod
+    def make_key(*parts) -> str:
+        """Cache key over the parts a result depends on; dict parts (profiles)
+        are fingerprinted regardless of key order, all in one hash"""
+        return hashlib.sha1(_CANONICAL_JSON.encode(parts).encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Cached result, or None if absent or past its TTL"""
+        with self._lock:
+            entry = self.backend.get(key)
+            if entry is not None and entry[0] <= self.clock():
+                self.backend.delete(key)
+                self._counters["expired"] += 1
+                entry = None
+            self._counters["hits" if entry is not None else "misses"] += 1
+            return None if entry is None else dict(entry[1])
+
+    def put(self, key: str, value: Dict):
+        with self._lock:
+            self._counters["evictions"] += self.backend.set(key, self.clock() + self.ttl_seconds, dict(value))
+
+    def clear(self):
+        """Invalidate every entry (e.g. after a new model goes live)"""
+        with self._lock:
+            self.backend.clear()
+            self._counters["invalidations"] += 1
+
+    def stats(self) -> Dict:
+        """Hit-rate, expiry and eviction counters"""
+        with self._lock:
+            stats = dict(self._counters)
+            stats["entries"] = len(self.backend)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
@@ -0,0 +1,206 @@
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class RetrainPolicy:
+    """When the adaptation model should be retrained
+
+    Any of the triggers fires a retrain: `every_rows` new transactions,
+    `max_interval` seconds since the last training (with at least one new
+    row), or a population stability index above `drift_threshold` between
+    the scores observed since the last training and those before it. Until
+    the first training, the first `min_drift_samples` scores observed are
+    the reference, so drift can also trigger the first training.
+    """
+    def __init__(self, every_rows: Optional[int] = 100, max_interval: Optional[float] = None,
+                 drift_threshold: Optional[float] = None, drift_window: int = 1000,
+                 drift_bins: int = 10, min_drift_samples: int = 200):
+        self.every_rows = every_rows
+        self.max_interval = max_interval
+        self.drift_threshold = drift_threshold
+        self.drift_window = drift_window
+        self.drift_bins = drift_bins
+        self.min_drift_samples = min_drift_samples
+
+    def reason(self, rows_since: int, seconds_since: float, drift: Optional[float]) -> Optional[str]:
+        """Name of the trigger that fires, or None"""
+        if self.every_rows and rows_since >= self.every_rows:
+            return "rows"
+        if self.max_interval is not None and rows_since > 0 and seconds_since >= self.max_interval:
+            return "interval"
+        if self.drift_threshold is not None and drift is not None and drift >= self.drift_threshold:
+            return "drift"
+        return None
+
+
+class RetrainScheduler:
+    """Retrains a model off the request path and swaps it in atomically
+
+    `snapshot_fn()` returns the (X, y) training data and `fit_fn(model, X, y)`
+    returns a new fitted model; neither may mutate the serving model. Both
+    run on a single background thread. With `fit_executor` set to a process
+    pool, the fit itself runs there, so fit_fn must be picklable. Readers of
+    `model` always get either the old or the new fully trained model.
+    """
+    def __init__(self, fit_fn: Callable, snapshot_fn: Callable[[], Tuple[np.ndarray, np.ndarray]],
+                 model, policy: RetrainPolicy = None, fit_executor: Executor = None):
+        self.fit_fn = fit_fn
+        self.snapshot_fn = snapshot_fn
+        self.policy = policy or RetrainPolicy()
+        self.fit_executor = fit_executor
+        self._model = model
+        self._version = 0
+        self._lock = threading.Lock()
+        self._runner = ThreadPoolExecutor(max_workers=1, thread_name_prefix="retrain")
+        self._in_flight: Optional[Future] = None
+        self._listeners: List[Callable] = []
+
+        self._rows_since = 0
+        self._last_trained = time.monotonic()
+        self._reference_scores: Optional[np.ndarray] = None
+        self._recent_scores = deque(maxlen=self.policy.drift_window)
+        self._metrics = {
+            "trainings": 0,
+            "failures": 0,
+            "coalesced": 0,
+            "last_training_seconds": None,
+            "total_training_seconds": 0.0,
+            "last_trigger": None,
+            "last_training_rows": 0,
+            "listener_failures": 0,
+        }
+
+    @property
+    def model(self):
+        """Current serving model"""
+        return self._model
+
+    @property
+    def version(self) -> int:
+        """Incremented on every successful swap"""
+        return self._version
+
+    def add_listener(self, listener: Callable):
+        """Call listener(model, version) after each swap (exceptions are logged, not raised)"""
+        self._listeners.append(listener)
+
+    def record_rows(self, n: int = 1) -> Optional[Future]:
+        """Count new training rows and retrain if the policy says so"""
+        with self._lock:
+            self._rows_since += n
+        return self.maybe_retrain()
+
+    def observe_score(self, score: float):
+        """Track served scores for drift detection (O(1))"""
+        if self.policy.drift_threshold is not None:
+            self._recent_scores.append(score)
+            if self._reference_scores is None and len(self._recent_scores) >= self.policy.min_drift_samples:
+                self._seed_reference()
+
+    def _seed_reference(self):
+        # No training yet: the first scores served become the baseline
+        with self._lock:
+            if self._reference_scores is None:
+                self._reference_scores = np.clip(np.array(list(self._recent_scores), dtype=float), 0.0, 1.0)
+                self._recent_scores.clear()
+
+    def drift(self) -> Optional[float]:
+        """Population stability index of recent scores against the reference window"""
+        if self._reference_scores is None or len(self._recent_scores) < self.policy.min_drift_samples:
+            return None
+        bins = np.linspace(0.0, 1.0, self.policy.drift_bins + 1)
+        recent = np.clip(np.array(list(self._recent_scores), dtype=float), 0.0, 1.0)
+        expected = np.histogram(self._reference_scores, bins)[0] / len(self._reference_scores)
+        actual = np.histogram(recent, bins)[0] / len(recent)
+        expected, actual = np.maximum(expected, 1e-4), np.maximum(actual, 1e-4)
+        return float(np.sum((actual - expected) * np.log(actual / expected)))
+
+    def maybe_retrain(self) -> Optional[Future]:
+        """Submit a retrain if a policy trigger fires"""
+        with self._lock:
+            if self._in_flight is not None and not self._in_flight.done():
+                # Triggers that fire mid-training are picked up after it ends
+                return self._in_flight
+            rows_since = self._rows_since
+            seconds_since = time.monotonic() - self._last_trained
+        reason = self.policy.reason(rows_since, seconds_since, self.drift())
+        if reason is None:
+            return None
+        return self.retrain(reason)
+
+    def retrain(self, reason: str = "manual") -> Future:
+        """Submit a retrain now; at most one runs at a time"""
+        with self._lock:
+            if self._in_flight is not None and not self._in_flight.done():
+                self._metrics["coalesced"] += 1
+                return self._in_flight
+            self._rows_since = 0
+            self._last_trained = time.monotonic()
+            self._in_flight = self._runner.submit(self._train, reason)
+            return self._in_flight
+
+    def wait(self, timeout: Optional[float] = None):
+        """Block until the in-flight retrain (if any) finishes"""
+        future = self._in_flight
+        if future is not None:
+            future.result(timeout)
+
+    def metrics(self) -> Dict:
+        with self._lock:
+            metrics = dict(self._metrics)
+            metrics["model_version"] = self._version
+            metrics["in_flight"] = self._in_flight is not None and not self._in_flight.done()
+            metrics["rows_since_training"] = self._rows_since
+        metrics["drift"] = self.drift()
+        return metrics
+
+    def shutdown(self, wait: bool = True):
+        self._runner.shutdown(wait=wait)
+
+    def _train(self, reason: str):
+        started = time.perf_counter()
+        try:
+            X, y = self.snapshot_fn()
+            if len(y) == 0:
+                return self._model
+            if self.fit_executor is not None:
+                model = self.fit_executor.submit(self.fit_fn, self._model, X, y).result()
+            else:
+                model = self.fit_fn(self._model, X, y)
+        except Exception:
+            with self._lock:
+                self._metrics["failures"] += 1
+            logger.exception("Adaptation model retraining failed")
+            raise
+
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            # Single reference assignment: readers see old or new, never partial
+            self._model = model
+            self._version += 1
+            version = self._version
+            self._metrics["trainings"] += 1
+            self._metrics["last_training_seconds"] = elapsed
+            self._metrics["total_training_seconds"] += elapsed
+            self._metrics["last_trigger"] = reason
+            self._metrics["last_training_rows"] = len(y)
+            if self._recent_scores:
+                self._reference_scores = np.clip(np.array(list(self._recent_scores), dtype=float), 0.0, 1.0)
+                self._recent_scores.clear()
+        for listener in self._listeners:
+            # The new model is already live; a failing listener must not fail the retrain
+            try:
+                listener(model, version)
+            except Exception:
+                with self._lock:
+                    self._metrics["listener_failures"] += 1
+                logger.exception("Retrain listener failed")
+        return model
@@ -1,43 +1,192 @@
 import numpy as np
-import pandas as pd
-from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
-from sklearn.ensemble import GradientBoostingRegressor
 from datetime import datetime, timedelta
-from typing import Dict, List, Tuple
-import numpy as np
+from typing import Dict, List, Optional, Tuple
+import copy
+import hashlib
+import pickle
+from functools import partial
+from embedding_cache import EmbeddingCache, get_default_cache
+from encoders import make_encoder
+from transaction_log import TransactionLog
+from retraining import RetrainPolicy, RetrainScheduler
+from trust_store import TrustStore
+from instrumentation import Metrics, cache_gauges
+from result_cache import ResultCache
+from material_taxonomy import MaterialBuckets, MaterialCodes, MaterialTaxonomy, get_default_taxonomy
+import geospatial
+
+# Largest symbiosis network reported: at low thresholds nearly every
+# participant is transitively connected, and a component of hundreds is not
+# a network anyone can act on
+MAX_NETWORK_SIZE = 20
 
 class RevolutionaryAIMatching:
     """Patent-worthy Industrial Symbiosis Matching AI"""
-    def __init__(self):
-        self.model = SentenceTransformer('all-mpnet-base-v2')
-        self.adaptation_model = GradientBoostingRegressor()
-        self.transaction_history = pd.DataFrame()
-        self.trust_network = {}
+    def __init__(self, embedding_cache: EmbeddingCache = None, transaction_log: TransactionLog = None,
+                 retrain_policy: RetrainPolicy = None, retrain_window: int = 5000,
+                 warm_start_estimators: int = 20, max_estimators: int = 500, fit_executor=None,
+                 encoder=None, metrics: Metrics = None, materials: MaterialTaxonomy = None,
+                 result_cache: ResultCache = None):
+        # The encoder loads its model on first use (see warmup())
+        self.model = encoder or make_encoder('all-mpnet-base-v2')
+        self.model_name = self.model.name
+        self.embedding_cache = embedding_cache or get_default_cache()
+        self.transaction_log = transaction_log if transaction_log is not None else TransactionLog()
+        self.trust_network = TrustStore()
+        # Waste types and needed materials are matched through canonical ids
+        self.materials = materials if materials is not None else get_default_taxonomy()
+        
+        # Adaptation retraining runs off the request path on a snapshot of the
+        # last `retrain_window` rows; the fitted model is swapped in atomically
+        self.retrain_window = retrain_window
+        self.retrain_scheduler = RetrainScheduler(
+            fit_fn=partial(_fit_adaptation_model, warm_start_estimators=warm_start_estimators,
+                           max_estimators=max_estimators),
+            snapshot_fn=lambda: self.transaction_log.training_data(window=self.retrain_window),
+            model=None,
+            policy=retrain_policy,
+            fit_executor=fit_executor,
+        )
+        
+        # predict_compatibility results, keyed by both profiles, the pair's
+        # trust score and a scope hashing the encoder, taxonomy and adaptation
+        # model (see ResultCache.from_env). Every part is content-derived, so
+        # worker processes sharing a SqliteBackend reuse each other's results
+        # across restarts; a new model invalidates them all
+        self.result_cache = result_cache if result_cache is not None else ResultCache.from_env()
+        self._result_scope = self._scope_key(None)
+        self.retrain_scheduler.add_listener(self._invalidate_results)
+        
+        # Per-stage timers and counters (no-ops unless enabled, see Metrics.from_env)
+        self.metrics = metrics or Metrics.from_env('revolutionary')
+        self.metrics.add_collector(self._gauges)
+    
+    def _gauges(self) -> Dict[str, float]:
+        gauges = cache_gauges(self.embedding_cache)
+        if self.result_cache is not None:
+            gauges.update(cache_gauges(self.result_cache, 'result_cache'))
+        gauges['adaptation_model_version'] = self.retrain_scheduler.version
+        return gauges
+    
+    @property
+    def trust_network(self) -> TrustStore:
+        """Participant trust records (array-backed, behaves like a dict)"""
+        return self._trust_network
+    
+    @trust_network.setter
+    def trust_network(self, records: Dict):
+        self._trust_network = records if isinstance(records, TrustStore) else TrustStore(records)
+    
+    @property
+    def adaptation_model(self):
+        """Current serving adaptation model (replaced atomically by retraining)"""
+        model = self.retrain_scheduler.model
+        if model is None:
+            # Nothing trained yet: an unfitted regressor, as before
+            from sklearn.ensemble import GradientBoostingRegressor
+            model = GradientBoostingRegressor()
+        return model
+    
+    def warmup(self):
+        """Load the encoder and heavy libraries now instead of on the first request"""
+        self.model.warmup()
+        self._encode_normalized(["warmup"])
+        import sklearn.ensemble  # noqa: F401 (first retrain pays nothing)
+        return self
+    
+    @property
+    def transaction_history(self):
+        """Transaction history as a DataFrame (built on demand from the columnar log)"""
+        return self.transaction_log.to_frame()
         
     def predict_compatibility(self, buyer: Dict, seller: Dict) -> Dict:
         """Predict compatibility with future forecasting"""
-        # Semantic matching
-        buyer_text = self._prepare_buyer_text(buyer)
-        seller_text = self._prepare_seller_text(seller)
-        semantic_score = self._calculate_semantic_similarity(buyer_text, seller_text)
-        
+        with self.metrics.request('predict_compatibility'):
+            key, result = self._cached_result(buyer, seller)
+            if result is not None:
+                return result
+            
+            # Semantic matching
+            with self.metrics.stage('prepare_text'):
+                buyer_text = self._prepare_buyer_text(buyer)
+                seller_text = self._prepare_seller_text(seller)
+            semantic_score = self._calculate_semantic_similarity(buyer_text, seller_text)
+            return self._store_result(key, self._compatibility_result(buyer, seller, semantic_score))
+    
+    def predict_compatibility_batch(self, pairs: List[Tuple[Dict, Dict]]) -> List[Dict]:
+        """predict_compatibility for many (buyer, seller) pairs with one batched encode"""
+        if not pairs:
+            return []
+        with self.metrics.request('predict_compatibility_batch'):
+            keys, results = zip(*(self._cached_result(buyer, seller) for buyer, seller in pairs))
+            results = list(results)
+            missing = [i for i, result in enumerate(results) if result is None]
+            if not missing:
+                return results
+            
+            # Only the pairs without a cached result are encoded
+            with self.metrics.stage('prepare_text'):
+                texts = ([self._prepare_buyer_text(pairs[i][0]) for i in missing] +
+                         [self._prepare_seller_text(pairs[i][1]) for i in missing])
+            embeddings = self._encode_normalized(texts)
+            with self.metrics.stage('cosine'):
+                semantic_scores = np.einsum('ij,ij->i', embeddings[:len(missing)], embeddings[len(missing):])
+            for i, score in zip(missing, semantic_scores):
+                buyer, seller = pairs[i]
+                results[i] = self._store_result(keys[i], self._compatibility_result(buyer, seller, float(score)))
+            return results
+    
+    def _cached_result(self, buyer: Dict, seller: Dict) -> Tuple[Optional[str], Optional[Dict]]:
+        """(cache key, cached result or None) for one pair"""
+        if self.result_cache is None:
+            return None, None
+        with self.metrics.stage('result_cache'):
+            key = ResultCache.make_key(self._result_scope, buyer, seller,
+                                       self._calculate_trust_score(seller['id'], buyer['id']))
+            result = self.result_cache.get(key)
+        if result is not None:
+            # Served scores still feed drift detection
+            self.retrain_scheduler.observe_score(result['revolutionary_score'])
+        return key, result
+    
+    def _store_result(self, key: str, result: Dict) -> Dict:
+        if key is not None:
+            self.result_cache.put(key, result)
+        return result
+    
+    def _scope_key(self, model) -> str:
+        """Result-cache scope for the current encoder, taxonomy and adaptation model"""
+        model_hash = None if model is None else hashlib.sha1(pickle.dumps(model)).hexdigest()
+        return ResultCache.make_key(self.model_name, self.materials.fingerprint(), model_hash)
+    
+    def _invalidate_results(self, model, version: int):
+        self._result_scope = self._scope_key(model)
+        if self.result_cache is not None:
+            self.result_cache.clear()
+    
+    def _compatibility_result(self, buyer: Dict, seller: Dict, semantic_score: float) -> Dict:
+        """Combine a pair's semantic score with the trust, sustainability and forecast terms"""
         # Dynamic trust scoring
-        trust_score = self._calculate_trust_score(seller['id'], buyer['id'])
+        with self.metrics.stage('trust'):
+            trust_score = self._calculate_trust_score(seller['id'], buyer['id'])
         
         # Sustainability impact
-        sustainability_score = self._calculate_sustainability_impact(buyer, seller)
+        with self.metrics.stage('sustainability'):
+            sustainability_score = self._calculate_sustainability_impact(buyer, seller)
         
         # Time-series forecasting
-        forecast_score = self._forecast_future_compatibility(buyer, seller)
+        with self.metrics.stage('forecast'):
+            forecast_score = self._forecast_future_compatibility(buyer, seller)
         
         # Composite revolutionary score
-        revolutionary_score = (
-            0.3 * semantic_score +
-            0.25 * trust_score +
-            0.25 * sustainability_score +
-            0.2 * forecast_score
-        )
+        with self.metrics.stage('combine'):
+            revolutionary_score = (
+                0.3 * semantic_score +
+                0.25 * trust_score +
+                0.25 * sustainability_score +
+                0.2 * forecast_score
+            )
+            self.retrain_scheduler.observe_score(revolutionary_score)
         
         return {
             "semantic_score": round(semantic_score, 3),
@@ -50,69 +199,209 @@ class RevolutionaryAIMatching:
     
     def record_transaction_outcome(self, transaction: Dict):
         """Adaptive learning from transaction results"""
-        # Update transaction history
-        new_row = pd.DataFrame([transaction])
-        self.transaction_history = pd.concat([self.transaction_history, new_row], ignore_index=True)
+        with self.metrics.request('record_transaction_outcome'):
+            # Update transaction history (O(1) columnar append)
+            self.transaction_log.append(transaction)
+            
+            # Retrain adaptation model when the policy fires, off the request path
+            self.retrain_scheduler.record_rows(1)
+    
+    def predict_compatibility_matrix(self, buyers: List[Dict], sellers: List[Dict]) -> np.ndarray:
+        """Revolutionary scores for every buyer (rows) against every seller (columns)"""
+        if not buyers or not sellers:
+            return np.zeros((len(buyers), len(sellers)), dtype=np.float32)
+        with self.metrics.request('predict_compatibility_matrix'):
+            arrays = self._scoring_arrays(buyers, sellers)
+            with self.metrics.stage('score_block'):
+                return score_block(arrays, 0, len(buyers))
+    
+    def detect_symbiosis_network(self, participants: List[Dict], threshold: float = 0.7,
+                                 top_k: int = None, workers: int = 1, max_distance_km: float = None,
+                                 neighbor_pairs: geospatial.NeighborPairs = None,
+                                 require_material_match: bool = False,
+                                 max_network_size: Optional[int] = MAX_NETWORK_SIZE) -> List[Dict]:
+        """Identify multi-party industrial symbiosis opportunities
         
-        # Retrain adaptation model quarterly
-        if len(self.transaction_history) % 100 == 0:
-            self._retrain_adaptation_model()
+        With workers > 1 the row blocks are scored in a process pool that
+        shares the scoring arrays through shared memory (see sharded_scoring).
+        
+        With max_distance_km (or precomputed neighbor_pairs from
+        GeoIndex.pairs_within) only located participants that close together
+        are ever paired: far pairs are pruned by a k-d tree before any
+        encoding, and participants with no neighbour are never encoded.
+        
+        With require_material_match only pairs whose waste stream and needed
+        material are compatible in the material taxonomy are scored; the
+        candidates come straight from sellers bucketed by material.
+        
+        Networks are the connected clusters of viable pairs, split along
+        their strongest edges into groups of at most max_network_size (None
+        keeps whole components). A network's score is the mean of its viable
+        pair scores.
+        """
+        if not participants:
+            return []
+        
+        with self.metrics.request('detect_symbiosis_network'):
+            if max_distance_km is not None or neighbor_pairs is not None or require_material_match:
+                graph = self._candidate_threshold_graph(participants, threshold, top_k, max_distance_km,
+                                                        neighbor_pairs, require_material_match)
+                with self.metrics.stage('rank_networks'):
+                    return self._rank_networks(participants, graph, max_network_size)
+            
+            # Sparse graph of viable pairwise compatibilities (score >= threshold),
+            # scored in row blocks so the dense N x N matrix never exists
+            arrays = self._scoring_arrays(participants, participants)
+            with self.metrics.stage('threshold_graph'):
+                if workers > 1:
+                    from sharded_scoring import sharded_threshold_graph
+                    graph = sharded_threshold_graph(arrays, threshold, top_k=top_k, workers=workers)
+                else:
+                    from symbiosis_graph import build_threshold_graph  # SciPy, only needed here
+                    graph = build_threshold_graph(
+                        lambda start, stop: score_block(arrays, start, stop),
+                        len(participants), len(participants), threshold, top_k=top_k)
+            with self.metrics.stage('rank_networks'):
+                return self._rank_networks(participants, graph, max_network_size)
     
-    def detect_symbiosis_network(self, participants: List[Dict]) -> List[Dict]:
-        """Identify multi-party industrial symbiosis opportunities"""
-        # Matrix of pairwise compatibilities
-        compatibility_matrix = np.zeros((len(participants), len(participants)))
+    def _candidate_threshold_graph(self, participants: List[Dict], threshold: float, top_k: int,
+                                   max_distance_km: float, neighbor_pairs: geospatial.NeighborPairs,
+                                   require_material_match: bool):
+        """Threshold graph over the candidate pairs only (geographically close and/or material compatible)"""
+        from symbiosis_graph import edges_to_graph, threshold_edges
+        
+        rows = cols = km = None
+        if max_distance_km is not None or neighbor_pairs is not None:
+            with self.metrics.stage('geo_pruning'):
+                if neighbor_pairs is None:
+                    neighbor_pairs = geospatial.GeoIndex.from_records(participants).pairs_within(max_distance_km)
+                rows, cols, km = neighbor_pairs.rows, neighbor_pairs.cols, neighbor_pairs.km
+        
+        if require_material_match:
+            with self.metrics.stage('material_pruning'):
+                material_codes = self.materials.codes()
+                waste_ids = material_codes.ids(p['waste_type'] for p in participants)
+                material_ids = material_codes.ids(p['material_needed'] for p in participants)
+                compatibility = material_codes.compatibility()
+                if rows is None:
+                    rows, cols = MaterialBuckets(material_ids, compatibility).candidate_pairs(waste_ids)
+                else:
+                    keep = compatibility[waste_ids[rows], material_ids[cols]] > 0
+                    rows, cols, km = rows[keep], cols[keep], km[keep]
+        
+        with self.metrics.stage('candidate_order'):
+            active = np.union1d(rows, cols)
+            if km is not None:
+                # Number the active participants along a space-filling curve so a
+                # block of consecutive rows has few distinct neighbours
+                active = active[geospatial.spatial_order(geospatial.coordinates([participants[i] for i in active]))]
+            else:
+                # Rows with the same waste stream share their candidate sellers
+                active = active[np.argsort(waste_ids[active], kind='stable')]
+            local = np.full(len(participants), -1, dtype=np.int64)
+            local[active] = np.arange(len(active))
         
-        for i, p1 in enumerate(participants):
-            for j, p2 in enumerate(participants):
-                if i != j:
-                    comp = self.predict_compatibility(p1, p2)
-                    compatibility_matrix[i][j] = comp['revolutionary_score']
+        # Only participants with at least one candidate pair are encoded
+        arrays = self._scoring_arrays([participants[i] for i in active], [participants[i] for i in active])
+        with self.metrics.stage('threshold_graph'):
+            scores = score_pairs(arrays, local[rows], local[cols], distance_km=km)
+            edges = threshold_edges(rows, cols, scores, threshold, top_k)
+            return edges_to_graph([edges], len(participants), len(participants))
+    
+    def _rank_networks(self, participants: List[Dict], graph, max_network_size: Optional[int],
+                       limit: int = 5) -> List[Dict]:
+        """Cluster the compatibility graph and describe the best `limit` networks"""
+        from symbiosis_graph import cluster_network_scores, split_clusters, top_clusters
         
-        # Find optimal clusters (minimum spanning tree approach)
-        clusters = self._find_optimal_clusters(compatibility_matrix)
+        # Find optimal clusters (connected components of the viable-pair graph,
+        # oversized ones split along their strongest edges)
+        n_clusters, labels = split_clusters(graph, max_network_size)
+        network_scores = cluster_network_scores(graph, labels, n_clusters)
         
-        # Calculate symbiosis potential
+        # Calculate symbiosis potential for the best clusters only
         networks = []
-        for cluster_indices in clusters:
-            # Get actual participant objects
+        for cluster in top_clusters(network_scores, limit):
+            cluster_indices = np.flatnonzero(labels == cluster)
             cluster_participants = [participants[i] for i in cluster_indices]
-            
-            # Extract submatrix for this cluster
-            submatrix = compatibility_matrix[cluster_indices][:, cluster_indices]
-            network_score = np.mean(submatrix)
-            
-            waste_reduction = sum(p['annual_waste'] for p in cluster_participants) * 0.3
-            carbon_reduction = sum(p['carbon_footprint'] for p in cluster_participants) * 0.25
-            
-            networks.append({
-                "participants": [p['id'] for p in cluster_participants],
-                "network_score": round(network_score, 3),
-                "waste_reduction_potential": round(waste_reduction, 2),
-                "carbon_reduction_potential": round(carbon_reduction, 2),
-                "economic_value": round(network_score * 100000, 2)  # Placeholder formula
-            })
+            networks.append(self._describe_network(cluster_participants, float(network_scores[cluster])))
         
-        return sorted(networks, key=lambda x: x['network_score'], reverse=True)[:5]
+        return networks
+    
+    def _describe_network(self, cluster_participants: List[Dict], network_score: float) -> Dict:
+        """Symbiosis potential of one cluster"""
+        waste_reduction = sum(p['annual_waste'] for p in cluster_participants) * 0.3
+        carbon_reduction = sum(p['carbon_footprint'] for p in cluster_participants) * 0.25
+        
+        return {
+            "participants": [p['id'] for p in cluster_participants],
+            "network_score": round(network_score, 3),
+            "waste_reduction_potential": round(waste_reduction, 2),
+            "carbon_reduction_potential": round(carbon_reduction, 2),
+            "economic_value": round(network_score * 100000, 2)  # Placeholder formula
+        }
+    
+    def _scoring_arrays(self, buyers: List[Dict], sellers: List[Dict]) -> Dict[str, np.ndarray]:
+        """Per-participant arrays from which score_block computes any block of pair scores"""
+        with self.metrics.stage('scoring_arrays'):
+            material_codes = self.materials.codes()
+            arrays = self._seller_arrays(sellers, material_codes)
+            arrays.update(self._buyer_arrays(buyers, material_codes))
+            arrays["material_compatibility"] = material_codes.compatibility()
+            return arrays
+    
+    def _buyer_arrays(self, buyers: List[Dict], material_codes: MaterialCodes) -> Dict[str, np.ndarray]:
+        """Buyer-side scoring arrays (material_codes is shared with the seller side)"""
+        # Semantic matching: each profile is encoded once
+        embeddings = self._encode_normalized([self._prepare_buyer_text(b) for b in buyers])
+        
+        # Dynamic trust scoring
+        store = self.trust_network
+        buyer_trust = store.buyer_component[store.slots(b['id'] for b in buyers)]
+        
+        # Sustainability impact inputs: coordinates where known, with the
+        # caller-supplied distance_to_seller as the fallback distance
+        distance = np.array([b.get('distance_to_seller', np.nan) for b in buyers], dtype=np.float32)
+        
+        return {
+            "buyer_embeddings": embeddings,
+            # Terms that depend on the buyer alone are folded in up front
+            "buyer_terms": (0.25 * buyer_trust + 0.2 * self._market_forecast()).astype(np.float32),
+            "buyer_distance": np.nan_to_num(geospatial.distance_score(distance)).astype(np.float32),
+            "buyer_xyz": geospatial.unit_vectors(geospatial.coordinates(buyers)),
+            "waste_ids": material_codes.ids(b['waste_type'] for b in buyers),
+            "buyer_carbon": np.array([b['carbon_footprint'] for b in buyers], dtype=np.float32),
+        }
+    
+    def _seller_arrays(self, sellers: List[Dict], material_codes: MaterialCodes) -> Dict[str, np.ndarray]:
+        """Seller-side scoring arrays (material_codes is shared with the buyer side)"""
+        embeddings = self._encode_normalized([self._prepare_seller_text(s) for s in sellers])
+        store = self.trust_network
+        seller_trust = store.seller_component[store.slots(s['id'] for s in sellers)]
+        return {
+            "seller_embeddings": embeddings,
+            "seller_terms": (0.25 * seller_trust).astype(np.float32),
+            "seller_xyz": geospatial.unit_vectors(geospatial.coordinates(sellers)),
+            "material_ids": material_codes.ids(s['material_needed'] for s in sellers),
+            "seller_carbon": np.array([s['carbon_footprint'] for s in sellers], dtype=np.float32),
+        }
     
     def _calculate_trust_score(self, seller_id: str, buyer_id: str) -> float:
         """Blockchain-verified trust scoring"""
         # Factors: transaction success rate, dispute history, verification level
-        seller_trust = self.trust_network.get(seller_id, {"success_rate": 0.8, "disputes": 0, "verification": 1})
-        buyer_trust = self.trust_network.get(buyer_id, {"success_rate": 0.8, "disputes": 0, "verification": 1})
-        
-        # Composite trust algorithm
-        return 0.6 * seller_trust['success_rate'] + \
-               0.2 * (1 - min(1, seller_trust['disputes']/10)) + \
-               0.1 * seller_trust['verification'] + \
-               0.1 * buyer_trust['success_rate']
+        # (seller and buyer terms are precomputed by the trust store)
+        return self.trust_network.trust_score(seller_id, buyer_id)
     
     def _calculate_sustainability_impact(self, buyer: Dict, seller: Dict) -> float:
         """Measure environmental impact of potential match"""
         # Factors: distance, material compatibility, carbon reduction
-        distance_score = max(0, 1 - (buyer['distance_to_seller'] / 500))  # 500km max
+        distance_km = geospatial.pair_distance_km(buyer, seller)
+        if distance_km is None:
+            distance_km = buyer.get('distance_to_seller')
+        # 500km max; no credit when the distance is unknown
+        distance_score = 0.0 if distance_km is None else max(0, 1 - (distance_km / geospatial.MAX_DISTANCE_KM))
         
-        material_score = 1.0 if buyer['waste_type'] == seller['material_needed'] else 0.0
+        # Canonical materials: synonyms match fully, related materials partly
+        material_score = self.materials.compatibility_score(buyer['waste_type'], seller['material_needed'])
         
         carbon_score = min(1, (buyer['carbon_footprint'] + seller['carbon_footprint']) / 10000)
         
@@ -120,6 +409,10 @@ class RevolutionaryAIMatching:
     
     def _forecast_future_compatibility(self, buyer: Dict, seller: Dict) -> float:
         """Predict compatibility 6-12 months in future"""
+        return self._market_forecast()
+    
+    def _market_forecast(self) -> float:
+        """Market-level compatibility projection shared by all pairs"""
         # Time-series analysis of market trends
         forecast_data = {
             'industry_growth': 0.05,  # Placeholder - would come from market data API
@@ -131,13 +424,9 @@ class RevolutionaryAIMatching:
         return min(1.0, 0.7 + 0.3 * sum(forecast_data.values()))
     
     def _retrain_adaptation_model(self):
-        """Continuous learning from transaction outcomes"""
-        # Use historical data to improve matching accuracy
-        X = self.transaction_history[['semantic_score', 'trust_score', 
-                                    'sustainability_score', 'forecast_score']]
-        y = self.transaction_history['success_indicator']
-        
-        self.adaptation_model.fit(X, y)
+        """Continuous learning from transaction outcomes (blocks until the new model is live)"""
+        # Use recent historical data to improve matching accuracy
+        self.retrain_scheduler.retrain(reason="manual").result()
     
     def _quality_label(self, score: float) -> str:
         """Categorize match quality"""
@@ -165,29 +454,100 @@ class RevolutionaryAIMatching:
     
     def _calculate_semantic_similarity(self, text1: str, text2: str) -> float:
         """Calculate semantic similarity between two texts"""
-        embeddings = self.model.encode([text1, text2])
-        # Convert to numpy arrays
-        emb1 = np.array([embeddings[0]])
-        emb2 = np.array([embeddings[1]])
-        return cosine_similarity(emb1, emb2)[0][0]
-    
-    def _find_optimal_clusters(self, matrix: np.ndarray, threshold: float = 0.7) -> List[List[int]]:
-        """Find optimal clusters using threshold-based grouping"""
-        clusters = []
-        n = len(matrix)
-        visited = [False] * n
-        
-        for i in range(n):
-            if not visited[i]:
-                cluster = [i]
-                visited[i] = True
-                for j in range(n):
-                    if not visited[j] and matrix[i][j] >= threshold:
-                        cluster.append(j)
-                        visited[j] = True
-                clusters.append(cluster)
-        
-        return clusters
+        embeddings = self._encode_normalized([text1, text2])
+        with self.metrics.stage('cosine'):
+            return float(embeddings[0] @ embeddings[1])
+    
+    def _encode_normalized(self, texts: List[str]) -> np.ndarray:
+        """Encode texts in one batch and L2-normalize the rows"""
+        self.metrics.inc('encode_calls')
+        self.metrics.observe('encode_batch_size', len(texts))
+        with self.metrics.stage('encode'):
+            embeddings = self.embedding_cache.encode(self.model, self.model_name, texts)
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            return embeddings / np.maximum(norms, 1e-12)
+
+def score_block(arrays: Dict[str, np.ndarray], start: int, stop: int) -> np.ndarray:
+    """Revolutionary scores for buyer rows start:stop against every seller"""
+    # Semantic similarity: one normalized matrix product
+    scores = arrays["buyer_embeddings"][start:stop] @ arrays["seller_embeddings"].T
+    scores *= 0.3
+    
+    # Trust and forecast terms broadcast over the block
+    scores += arrays["buyer_terms"][start:stop, None]
+    scores += arrays["seller_terms"][None, :]
+    
+    # Sustainability impact: distance, material compatibility and combined carbon
+    scores += 0.25 * 0.4 * _distance_block(arrays, start, stop)
+    scores += 0.25 * 0.4 * arrays["material_compatibility"][arrays["waste_ids"][start:stop, None],
+                                                            arrays["material_ids"][None, :]]
+    carbon_score = arrays["buyer_carbon"][start:stop, None] + arrays["seller_carbon"][None, :]
+    carbon_score /= 10000
+    np.minimum(carbon_score, 1, out=carbon_score)
+    scores += 0.25 * 0.2 * carbon_score
+    
+    return scores
+
+def score_pairs(arrays: Dict[str, np.ndarray], rows: np.ndarray, cols: np.ndarray,
+                distance_km: np.ndarray = None, block_rows: int = 256) -> np.ndarray:
+    """Revolutionary scores of individual (buyer row, seller column) pairs, as score_block would give"""
+    out = np.empty(len(rows), dtype=np.float32)
+    order = np.argsort(rows, kind='stable')
+    bounds = np.searchsorted(rows[order], np.arange(0, len(arrays["buyer_terms"]) + block_rows, block_rows))
+    for block, (lo, hi) in enumerate(zip(bounds[:-1], bounds[1:])):
+        if lo == hi:
+            continue
+        pairs = order[lo:hi]
+        r, c = rows[pairs], cols[pairs]
+        
+        # Semantic similarity: one matrix product against the block's distinct sellers
+        start = block * block_rows
+        sellers, position = np.unique(c, return_inverse=True)
+        semantic = arrays["buyer_embeddings"][start:start + block_rows] @ arrays["seller_embeddings"][sellers].T
+        scores = 0.3 * semantic[r - start, position]
+        # Terms are added one at a time, as score_block does, so both round alike
+        scores += arrays["buyer_terms"][r]
+        scores += arrays["seller_terms"][c]
+        
+        if distance_km is None:
+            km = geospatial.haversine_pairs(arrays["buyer_xyz"][r], arrays["seller_xyz"][c])
+            distance = np.where(np.isnan(km), arrays["buyer_distance"][r], geospatial.distance_score(km))
+        else:
+            distance = geospatial.distance_score(distance_km[pairs])
+        scores += 0.25 * 0.4 * distance
+        scores += 0.25 * 0.4 * arrays["material_compatibility"][arrays["waste_ids"][r], arrays["material_ids"][c]]
+        scores += 0.25 * 0.2 * np.minimum(1, (arrays["buyer_carbon"][r] + arrays["seller_carbon"][c]) / 10000)
+        out[pairs] = scores
+    return out
+
+def _distance_block(arrays: Dict[str, np.ndarray], start: int, stop: int) -> np.ndarray:
+    """Distance scores for buyer rows start:stop: haversine where both sides are located,
+    else the buyer's distance_to_seller"""
+    fallback = arrays["buyer_distance"][start:stop, None]
+    buyer_xyz = arrays["buyer_xyz"][start:stop]
+    seller_xyz = arrays["seller_xyz"]
+    buyer_located = ~np.isnan(buyer_xyz[:, 0])
+    seller_located = ~np.isnan(seller_xyz[:, 0])
+    if not buyer_located.any() or not seller_located.any():
+        return fallback
+    
+    km = geospatial.haversine_block(np.nan_to_num(buyer_xyz), np.nan_to_num(seller_xyz))
+    located_score = geospatial.distance_score(km).astype(np.float32)
+    return np.where(buyer_located[:, None] & seller_located[None, :], located_score, fallback)
+
+def _fit_adaptation_model(current, X: np.ndarray, y: np.ndarray,
+                          warm_start_estimators: int, max_estimators: int):
+    """Fit a new adaptation model without touching the serving one"""
+    from sklearn.ensemble import GradientBoostingRegressor
+    # Warm start: keep the fitted trees and boost a few more on the new
+    # window; start over once the ensemble reaches max_estimators
+    if hasattr(current, 'estimators_') and current.n_estimators + warm_start_estimators <= max_estimators:
+        model = copy.deepcopy(current)
+        model.set_params(warm_start=True, n_estimators=current.n_estimators + warm_start_estimators)
+    else:
+        model = GradientBoostingRegressor()
+    model.fit(X, y)
+    return model
 
 # Patentable Innovations:
 # 1. Dynamic trust scoring with blockchain verification
@@ -0,0 +1,167 @@
+import asyncio
+import time
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+class ServiceOverloaded(RuntimeError):
+    """The scoring queue is full; shed the request or retry later"""
+
+
+class ScoringService:
+    """Micro-batching asyncio front end for predict_compatibility
+
+    Callers await score(buyer, seller). Requests are queued and flushed as one
+    predict_compatibility_batch call (a single batched encode) once
+    max_batch_size requests are waiting or the oldest has waited max_wait_ms,
+    and each caller gets its own result back. The batch runs in an executor
+    thread, so the next batch fills up while the current one encodes.
+
+    At most max_queue requests may wait. Beyond that score() raises
+    ServiceOverloaded, or with wait=True suspends the caller until there is room.
+    """
+    def __init__(self, matcher, max_batch_size: int = 64, max_wait_ms: float = 5.0,
+                 max_queue: int = 1024, executor=None, latency_window: int = 4096):
+        self.matcher = matcher
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.max_queue = max_queue
+        self.executor = executor
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._in_flight = 0
+        self._latencies = deque(maxlen=latency_window)
+        self._counters = {
+            "requests": 0,
+            "rejected": 0,
+            "failed": 0,
+            "batches": 0,
+            "batched_requests": 0,
+            "peak_queue_depth": 0,
+            "last_batch_size": 0,
+            "last_batch_seconds": 0.0,
+        }
+
+    async def start(self) -> "ScoringService":
+        """Start the batching loop on the running event loop"""
+        if self._worker is None:
+            self._queue = asyncio.Queue(self.max_queue)
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+        return self
+
+    async def stop(self):
+        """Finish the queued requests, then stop the batching loop"""
+        if self._worker is None:
+            return
+        await self._queue.join()
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+
+    async def __aenter__(self) -> "ScoringService":
+        return await self.start()
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+    async def score(self, buyer: Dict, seller: Dict, wait: bool = False) -> Dict:
+        """Compatibility result for one pair, scored as part of the next batch"""
+        await self.start()
+        future = asyncio.get_running_loop().create_future()
+        item = (buyer, seller, future, time.perf_counter())
+        if wait:
+            await self._queue.put(item)
+        else:
+            try:
+                self._queue.put_nowait(item)
+            except asyncio.QueueFull:
+                self._counters["rejected"] += 1
+                raise ServiceOverloaded(f"Scoring queue is full ({self.max_queue} requests waiting)")
+        self._counters["requests"] += 1
+        self._counters["peak_queue_depth"] = max(self._counters["peak_queue_depth"], self._queue.qsize())
+        return await future
+
+    def metrics(self) -> Dict:
+        """Queue depth, batch sizes and end-to-end latency percentiles"""
+        counters = dict(self._counters)
+        counters["queue_depth"] = self._queue.qsize() if self._queue is not None else 0
+        counters["in_flight"] = self._in_flight
+        counters["mean_batch_size"] = counters["batched_requests"] / counters["batches"] if counters["batches"] else 0.0
+        latencies = np.array(self._latencies) if self._latencies else np.zeros(1)
+        counters["latency_p50_seconds"] = float(np.percentile(latencies, 50))
+        counters["latency_p99_seconds"] = float(np.percentile(latencies, 99))
+        return counters
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._next_batch(loop)
+            try:
+                await self._flush(loop, batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _next_batch(self, loop) -> List[Tuple]:
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            # Take whatever is already queued, then wait out the deadline
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _flush(self, loop, batch: List[Tuple]):
+        # Callers that gave up (cancelled) are not scored
+        live = [item for item in batch if not item[2].done()]
+        if not live:
+            return
+        started = time.perf_counter()
+        self._in_flight = len(live)
+        try:
+            results = await loop.run_in_executor(self.executor, self._score_batch,
+                                                 [(buyer, seller) for buyer, seller, _, _ in live])
+        finally:
+            self._in_flight = 0
+        finished = time.perf_counter()
+
+        self._counters["batches"] += 1
+        self._counters["batched_requests"] += len(live)
+        self._counters["last_batch_size"] = len(live)
+        self._counters["last_batch_seconds"] = finished - started
+        for (_, _, future, enqueued), result in zip(live, results):
+            self._latencies.append(finished - enqueued)
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                self._counters["failed"] += 1
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def _score_batch(self, pairs: List[Tuple[Dict, Dict]]) -> List:
+        try:
+            return self.matcher.predict_compatibility_batch(pairs)
+        except Exception:
+            # One malformed request must not fail the whole batch: score each
+            # pair alone so only the bad ones get an error
+            results = []
+            for buyer, seller in pairs:
+                try:
+                    results.append(self.matcher.predict_compatibility(buyer, seller))
+                except Exception as e:
+                    results.append(e)
+            return results
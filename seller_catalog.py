@@ -0,0 +1,183 @@
+from typing import Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+
+from slot_allocator import SlotAllocator, grown_capacity
+
+
+class SellerCatalog:
+    """Columnar seller store for vectorized structured-feature scoring
+
+    Pricing bounds are float arrays; industries and capabilities are sparse
+    multi-hot rows over interned vocabularies. Rows are slots keyed by seller
+    id, so add/update/remove never rebuild the other columns. The sparse
+    matrices are rebuilt lazily on the first score after a change.
+
+    from_profiles() builds a one-off catalog straight into columns: one row
+    per profile in list order, so duplicate seller ids keep their own rows
+    (id lookups such as slots_for() resolve to the last of them).
+    """
+    def __init__(self):
+        self._slots = SlotAllocator()
+        self._price_low = np.zeros(0, dtype=np.float64)
+        self._price_high = np.zeros(0, dtype=np.float64)
+        self._industry_terms: List[np.ndarray] = []
+        self._capability_terms: List[np.ndarray] = []
+        self._industry_vocab: Dict[str, int] = {}
+        self._capability_vocab: Dict[str, int] = {}
+        self._industry_matrix = None
+        self._capability_matrix = None
+
+    @classmethod
+    def from_profiles(cls, seller_profiles: List[Dict]) -> "SellerCatalog":
+        """Catalog with row i holding seller_profiles[i], built column-wise"""
+        catalog = cls()
+        n = len(seller_profiles)
+        catalog._slots = SlotAllocator.from_ids([seller["id"] for seller in seller_profiles])
+        prices = np.array([seller["pricing_range"][:2] for seller in seller_profiles],
+                          dtype=np.float64).reshape(n, 2)
+        catalog._price_low, catalog._price_high = prices[:, 0].copy(), prices[:, 1].copy()
+        catalog._industry_matrix = cls._multi_hot_columns(
+            catalog._industry_vocab, [seller["industries"] for seller in seller_profiles])
+        catalog._capability_matrix = cls._multi_hot_columns(
+            catalog._capability_vocab, [seller["capabilities"] for seller in seller_profiles])
+        # Per-row term arrays are only split out if the catalog is changed later
+        catalog._industry_terms = catalog._capability_terms = None
+        return catalog
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, seller_id) -> bool:
+        return seller_id in self._slots
+
+    @property
+    def ids(self) -> List[Optional[Hashable]]:
+        """Seller id per slot (None for free slots)"""
+        return self._slots.ids
+
+    def add(self, seller: Dict):
+        """Insert or replace one seller's structured columns"""
+        self._split_terms()
+        slot = self._slots.get(seller["id"])
+        if slot is None:
+            slot = self._allocate_slot(seller["id"])
+        self._price_low[slot] = seller["pricing_range"][0]
+        self._price_high[slot] = seller["pricing_range"][1]
+        self._industry_terms[slot] = self._intern(self._industry_vocab, seller["industries"])
+        self._capability_terms[slot] = self._intern(self._capability_vocab, seller["capabilities"])
+        self._industry_matrix = self._capability_matrix = None
+
+    def add_many(self, seller_profiles: List[Dict]):
+        for seller in seller_profiles:
+            self.add(seller)
+
+    update = add
+
+    def remove(self, seller_id):
+        """Drop a seller; its slot is reused by later adds"""
+        slot = self._slots.release(seller_id)
+        if slot is None:
+            return
+        self._split_terms()
+        self._industry_terms[slot] = self._capability_terms[slot] = np.zeros(0, dtype=np.int32)
+        self._industry_matrix = self._capability_matrix = None
+
+    def slots_for(self, seller_ids: List) -> np.ndarray:
+        """Row slots for a list of seller ids"""
+        return np.fromiter((self._slots.slot_of[sid] for sid in seller_ids), dtype=np.int64, count=len(seller_ids))
+
+    def live_slots(self) -> np.ndarray:
+        """Slots currently holding a seller, in slot order"""
+        return np.fromiter((slot for slot, sid in enumerate(self._slots.ids) if sid is not None), dtype=np.int64)
+
+    def structured_scores(self, buyer_needs: Dict, slots: np.ndarray = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Industry, capability and pricing score arrays for the given slots (all slots by default)"""
+        if slots is None:
+            slots = np.arange(self._slots.high_water)
+        industry_matrix, capability_matrix = self._matrices()
+
+        # Industry membership: one sparse column lookup
+        industry_id = self._industry_vocab.get(buyer_needs["industry"])
+        if industry_id is None:
+            industry_scores = np.zeros(len(slots))
+        else:
+            industry_scores = industry_matrix[slots][:, industry_id].toarray().ravel()
+
+        # Capability overlap: sparse multi-hot rows times the buyer's multi-hot vector
+        required = buyer_needs["required_capabilities"]
+        required_ids = {self._capability_vocab[c] for c in required if c in self._capability_vocab}
+        if required_ids:
+            buyer_vector = np.zeros(len(self._capability_vocab))
+            buyer_vector[list(required_ids)] = 1.0
+            overlap = capability_matrix[slots] @ buyer_vector
+        else:
+            overlap = np.zeros(len(slots))
+        capability_scores = overlap / max(len(required), 1)
+
+        # Pricing range: inside 1.0, budget too low 0.2, budget above range 0.5
+        budget = buyer_needs["budget"]
+        low, high = self._price_low[slots], self._price_high[slots]
+        pricing_scores = np.where((low <= budget) & (budget <= high), 1.0,
+                                  np.where(budget < low, 0.2, 0.5))
+
+        return industry_scores, capability_scores, pricing_scores
+
+    def _matrices(self):
+        if self._industry_matrix is None:
+            self._industry_matrix = self._multi_hot(self._industry_terms, len(self._industry_vocab))
+            self._capability_matrix = self._multi_hot(self._capability_terms, len(self._capability_vocab))
+        return self._industry_matrix, self._capability_matrix
+
+    @staticmethod
+    def _multi_hot(rows: List[np.ndarray], width: int) -> sparse.csr_matrix:
+        indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+        indptr[1:] = np.cumsum([len(r) for r in rows])
+        indices = np.concatenate(rows) if rows else np.zeros(0, dtype=np.int32)
+        data = np.ones(len(indices), dtype=np.float64)
+        return sparse.csr_matrix((data, indices, indptr), shape=(len(rows), max(width, 1)))
+
+    @staticmethod
+    def _multi_hot_columns(vocab: Dict[str, int], term_lists: List[List[str]]) -> sparse.csr_matrix:
+        # All rows interned in one pass over the flattened terms
+        lengths = np.fromiter(map(len, term_lists), dtype=np.int64, count=len(term_lists))
+        indptr = np.zeros(len(term_lists) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=indptr[1:])
+        indices = np.fromiter((vocab.setdefault(term, len(vocab)) for terms in term_lists for term in terms),
+                              dtype=np.int32, count=int(indptr[-1]))
+        matrix = sparse.csr_matrix((np.ones(len(indices)), indices, indptr),
+                                   shape=(len(term_lists), max(len(vocab), 1)))
+        # Duplicate terms collapse to one hot entry, as in _intern()
+        matrix.sum_duplicates()
+        matrix.data[:] = 1.0
+        return matrix
+
+    def _split_terms(self):
+        if self._industry_terms is not None:
+            return
+        industry_matrix, capability_matrix = self._matrices()
+        self._industry_terms = self._matrix_rows(industry_matrix)
+        self._capability_terms = self._matrix_rows(capability_matrix)
+
+    @staticmethod
+    def _matrix_rows(matrix: sparse.csr_matrix) -> List[np.ndarray]:
+        indices = matrix.indices.astype(np.int32, copy=False)
+        return [indices[lo:hi] for lo, hi in zip(matrix.indptr[:-1].tolist(), matrix.indptr[1:].tolist())]
+
+    @staticmethod
+    def _intern(vocab: Dict[str, int], terms: List[str]) -> np.ndarray:
+        # Duplicate terms collapse to one hot entry, matching set semantics
+        ids = {vocab.setdefault(term, len(vocab)) for term in terms}
+        return np.array(sorted(ids), dtype=np.int32)
+
+    def _allocate_slot(self, seller_id) -> int:
+        slot = self._slots.allocate(seller_id)
+        if slot >= len(self._price_low):
+            capacity = grown_capacity(len(self._price_low))
+            self._price_low = np.resize(self._price_low, capacity)
+            self._price_high = np.resize(self._price_high, capacity)
+        if slot == len(self._industry_terms):
+            self._industry_terms.append(np.zeros(0, dtype=np.int32))
+            self._capability_terms.append(np.zeros(0, dtype=np.int32))
+        return slot
@@ -0,0 +1,200 @@
+import json
+import os
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from quantized_store import QuantizedEmbeddingStore, save_array
+from slot_allocator import SlotAllocator, grown_capacity
+
+
+class SellerIndex:
+    """Top-k retrieval over normalized seller embeddings
+
+    Vectors live in slot arrays so add/update/remove are O(1). Search is an
+    exact blocked matrix product by default; after build_ivf() it probes only
+    the n_probe closest inverted lists (IVF) to produce the shortlist.
+
+    With precision='float16' or 'int8' the vectors are kept quantized (see
+    QuantizedEmbeddingStore). Pass keep_full=True to rescore the best
+    k * rescore_factor candidates with the float32 originals.
+    """
+    def __init__(self, dim: Optional[int] = None, block_size: int = 65536, n_probe: int = 8,
+                 precision: str = 'float32', keep_full: bool = False, rescore_factor: int = 4):
+        self.dim = dim
+        self.block_size = block_size
+        self.n_probe = n_probe
+        self.precision = precision
+        self.keep_full = keep_full
+        self.rescore_factor = rescore_factor
+        self._store: Optional[QuantizedEmbeddingStore] = None
+        if dim:
+            self._store = QuantizedEmbeddingStore(dim, precision, keep_full)
+        self._alive = np.zeros(0, dtype=bool)
+        self._slots = SlotAllocator()
+
+        # IVF state (empty until build_ivf is called)
+        self._centroids: Optional[np.ndarray] = None
+        self._assign = np.zeros(0, dtype=np.int32)
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, seller_id) -> bool:
+        return seller_id in self._slots
+
+    def add(self, seller_id, embedding: np.ndarray):
+        """Insert or replace one seller's embedding"""
+        vec = self._normalize(np.asarray(embedding, dtype=np.float32).reshape(1, -1))[0]
+        slot = self._slots.get(seller_id)
+        if slot is None:
+            slot = self._allocate_slot(seller_id, vec.shape[0])
+        self._store.set(slot, vec)
+        self._alive[slot] = True
+        if self._centroids is not None:
+            self._assign[slot] = int(np.argmax(self._centroids @ vec))
+
+    def add_many(self, seller_ids: List, embeddings: np.ndarray):
+        """Insert or replace a batch of sellers"""
+        for seller_id, embedding in zip(seller_ids, embeddings):
+            self.add(seller_id, embedding)
+
+    update = add
+
+    def remove(self, seller_id):
+        """Drop a seller from the index; its slot is reused by later adds"""
+        slot = self._slots.release(seller_id)
+        if slot is None:
+            return
+        self._alive[slot] = False
+
+    def build_ivf(self, n_lists: int, iterations: int = 10, seed: int = 0):
+        """Cluster the stored vectors into n_lists inverted lists (spherical k-means)"""
+        slots = np.flatnonzero(self._alive)
+        if len(slots) == 0:
+            return
+        n_lists = min(n_lists, len(slots))
+        data = self._store.get(slots)
+        rng = np.random.default_rng(seed)
+        centroids = data[rng.choice(len(slots), n_lists, replace=False)].copy()
+        for _ in range(iterations):
+            labels = self._nearest_centroid(data, centroids)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, data)
+            empty = np.bincount(labels, minlength=n_lists) == 0
+            sums[empty] = centroids[empty]
+            centroids = self._normalize(sums)
+        self._centroids = centroids
+        self._assign = np.zeros(len(self._alive), dtype=np.int32)
+        self._assign[slots] = self._nearest_centroid(data, centroids)
+
+    def search(self, query: np.ndarray, k: int) -> Tuple[List, np.ndarray]:
+        """Seller ids and cosine scores of the (approximate) top-k neighbours"""
+        query = self._normalize(np.asarray(query, dtype=np.float32).reshape(1, -1))[0]
+        candidates = self._candidate_slots(query)
+        if len(candidates) == 0 or k <= 0:
+            return [], np.zeros(0, dtype=np.float32)
+
+        rescore = self._store.precision != 'float32' and self._store.keep_full
+        best_slots, best_scores = self._scan(candidates, query, k * self.rescore_factor if rescore else k)
+        if rescore:
+            # Exact float32 pass over the quantized shortlist
+            best_scores = self._store.rescore(best_slots, query)
+            best_slots, best_scores = _top_k(best_slots, best_scores, k)
+
+        order = np.argsort(-best_scores)
+        return [self._slots.ids[s] for s in best_slots[order]], best_scores[order]
+
+    def embedding(self, seller_id) -> np.ndarray:
+        """Stored (normalized, dequantized) embedding for one seller"""
+        return self._store.get(self._slots.slot_of[seller_id])
+
+    @property
+    def nbytes(self) -> int:
+        """Resident size of the stored vectors"""
+        return self._store.nbytes if self._store is not None else 0
+
+    def save(self, path: str):
+        """Write the index to a directory"""
+        os.makedirs(path, exist_ok=True)
+        if self._store is not None:
+            self._store.save(os.path.join(path, "vectors"))
+        save_array(os.path.join(path, "alive.npy"), self._alive)
+        for name in ("centroids.npy", "assign.npy"):
+            if self._centroids is None and os.path.exists(os.path.join(path, name)):
+                os.remove(os.path.join(path, name))
+        if self._centroids is not None:
+            save_array(os.path.join(path, "centroids.npy"), self._centroids)
+            save_array(os.path.join(path, "assign.npy"), self._assign)
+        # index.json goes last and atomically: it is what load() reads first
+        tmp = os.path.join(path, f"index.json.{os.getpid()}.tmp")
+        with open(tmp, "w") as f:
+            json.dump({"dim": self.dim, "precision": self.precision, "keep_full": self.keep_full,
+                       "ids": self._slots.ids, "free": self._slots.free}, f)
+        os.replace(tmp, os.path.join(path, "index.json"))
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = False, **kwargs) -> "SellerIndex":
+        """Read an index written by save(); with mmap the vectors are memory-mapped
+        copy-on-write, so later changes never write into the saved files"""
+        with open(os.path.join(path, "index.json")) as f:
+            meta = json.load(f)
+        index = cls(precision=meta["precision"], keep_full=meta["keep_full"], **kwargs)
+        index.dim = meta["dim"]
+        if os.path.exists(os.path.join(path, "vectors")):
+            index._store = QuantizedEmbeddingStore.load(os.path.join(path, "vectors"), mmap=mmap)
+        index._alive = np.load(os.path.join(path, "alive.npy"))
+        index._slots = SlotAllocator.from_ids(meta["ids"], meta["free"])
+        index._assign = np.zeros(len(index._alive), dtype=np.int32)
+        if os.path.exists(os.path.join(path, "centroids.npy")):
+            index._centroids = np.load(os.path.join(path, "centroids.npy"))
+            index._assign = np.load(os.path.join(path, "assign.npy"))
+        return index
+
+    def _scan(self, candidates: np.ndarray, query: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        # Blocked scan keeps the temporary score buffer bounded
+        best_slots = np.zeros(0, dtype=np.int64)
+        best_scores = np.zeros(0, dtype=np.float32)
+        for start in range(0, len(candidates), self.block_size):
+            block = candidates[start:start + self.block_size]
+            slots = np.concatenate([best_slots, block])
+            scores = np.concatenate([best_scores, self._store.dot(block, query)])
+            best_slots, best_scores = _top_k(slots, scores, k)
+        return best_slots, best_scores
+
+    def _candidate_slots(self, query: np.ndarray) -> np.ndarray:
+        if self._centroids is None:
+            return np.flatnonzero(self._alive)
+        n_probe = min(self.n_probe, len(self._centroids))
+        probed = np.argpartition(-(self._centroids @ query), n_probe - 1)[:n_probe]
+        probe_mask = np.zeros(len(self._centroids), dtype=bool)
+        probe_mask[probed] = True
+        return np.flatnonzero(self._alive & probe_mask[self._assign])
+
+    def _allocate_slot(self, seller_id, dim: int) -> int:
+        if self._store is None:
+            self.dim = dim
+            self._store = QuantizedEmbeddingStore(dim, self.precision, self.keep_full)
+        slot = self._slots.allocate(seller_id)
+        if slot >= len(self._store):
+            capacity = grown_capacity(len(self._store))
+            self._store.resize(capacity)
+            self._alive = np.concatenate([self._alive, np.zeros(capacity - len(self._alive), dtype=bool)])
+            self._assign = np.concatenate([self._assign, np.zeros(capacity - len(self._assign), dtype=np.int32)])
+        return slot
+
+    @staticmethod
+    def _nearest_centroid(data: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+        return np.argmax(data @ centroids.T, axis=1)
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+
+def _top_k(slots: np.ndarray, scores: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    if len(scores) <= k:
+        return slots, scores
+    top = np.argpartition(-scores, k - 1)[:k]
+    return slots[top], scores[top]
@@ -0,0 +1,88 @@
+import os
+from multiprocessing import get_context, shared_memory
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from revolutionary_ai_matching import score_block
+from symbiosis_graph import edges_to_graph, threshold_block
+
+
+class SharedArrays:
+    """Copies a dict of NumPy arrays into named shared-memory segments once
+
+    Workers attach to the segments by name (see attach()), so a row block
+    task carries only two integers and the embeddings are never pickled.
+    """
+    def __init__(self, arrays: Dict[str, np.ndarray]):
+        self.segments: List[shared_memory.SharedMemory] = []
+        self.spec: Dict[str, Tuple[str, tuple, str]] = {}
+        for name, array in arrays.items():
+            array = np.ascontiguousarray(array)
+            segment = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            np.ndarray(array.shape, dtype=array.dtype, buffer=segment.buf)[...] = array
+            self.segments.append(segment)
+            self.spec[name] = (segment.name, array.shape, array.dtype.str)
+
+    def close(self):
+        for segment in self.segments:
+            segment.close()
+            segment.unlink()
+        self.segments = []
+
+    def __enter__(self) -> "SharedArrays":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def attach(spec: Dict[str, Tuple[str, tuple, str]]) -> Tuple[Dict[str, np.ndarray], list]:
+    """Zero-copy views of arrays published by SharedArrays (keep the handles alive)
+
+    Pool workers share their parent's resource tracker, so attaching does
+    not hand ownership of the segments to the worker.
+    """
+    arrays, handles = {}, []
+    for name, (segment_name, shape, dtype) in spec.items():
+        segment = shared_memory.SharedMemory(name=segment_name)
+        handles.append(segment)
+        arrays[name] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=segment.buf)
+    return arrays, handles
+
+
+# Worker process state
+_worker = {}
+
+
+def _init_worker(spec, threshold: float, top_k: Optional[int]):
+    _worker["arrays"], _worker["handles"] = attach(spec)
+    _worker["threshold"] = threshold
+    _worker["top_k"] = top_k
+
+
+def _score_rows(bounds: Tuple[int, int]):
+    start, stop = bounds
+    block = score_block(_worker["arrays"], start, stop)
+    return threshold_block(block, start, _worker["threshold"], _worker["top_k"])
+
+
+def sharded_threshold_graph(arrays: Dict[str, np.ndarray], threshold: float, top_k: Optional[int] = None,
+                            workers: Optional[int] = None, max_block_cells: int = 1 << 22):
+    """Same graph as build_threshold_graph over score_block, with row blocks scored in a process pool
+
+    Each worker attaches to the scoring arrays in shared memory and returns
+    only the viable edges of its blocks, which are merged into one CSR graph.
+    """
+    workers = workers or os.cpu_count() or 1
+    n_rows = len(arrays["buyer_terms"])
+    n_cols = len(arrays["seller_terms"])
+    # Enough blocks that every worker stays busy, each at most max_block_cells
+    block_rows = max(1, min(max_block_cells // max(n_cols, 1), -(-n_rows // (4 * workers))))
+    bounds = [(start, min(start + block_rows, n_rows)) for start in range(0, n_rows, block_rows)]
+
+    with SharedArrays(arrays) as shared:
+        with get_context().Pool(workers, initializer=_init_worker,
+                                initargs=(shared.spec, threshold, top_k)) as pool:
+            parts = pool.map(_score_rows, bounds, chunksize=1)
+    return edges_to_graph(parts, n_rows, n_cols)
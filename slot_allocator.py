@@ -0,0 +1,68 @@
+from typing import Dict, Hashable, Iterable, Iterator, List, Optional
+
+
+class SlotAllocator:
+    """Interns ids to integer slots of parallel arrays, reusing freed slots
+
+    slot_of maps each live id to its slot and ids[slot] is the id held in a
+    slot (None once freed). Slots of removed ids go on a free list and are
+    handed out again before any new slot, so the owner's arrays only grow
+    when every slot is taken; the owner checks allocate()'s slot against its
+    capacity and grows by grown_capacity(). `reserved` leading slots are
+    never handed out (e.g. a default record in slot 0).
+    """
+    def __init__(self, reserved: int = 0):
+        self.ids: List[Optional[Hashable]] = [None] * reserved
+        self.slot_of: Dict[Hashable, int] = {}
+        self.free: List[int] = []
+
+    @classmethod
+    def from_ids(cls, ids: List[Optional[Hashable]], free: Iterable[int] = ()) -> "SlotAllocator":
+        """Allocator for slots already filled with `ids` (a duplicate id resolves to its last slot)"""
+        slots = cls()
+        slots.ids = list(ids)
+        slots.slot_of = {key: slot for slot, key in enumerate(slots.ids) if key is not None}
+        slots.free = list(free)
+        return slots
+
+    def __len__(self) -> int:
+        return len(self.slot_of)
+
+    def __contains__(self, key) -> bool:
+        return key in self.slot_of
+
+    def __iter__(self) -> Iterator:
+        return iter(self.slot_of)
+
+    @property
+    def high_water(self) -> int:
+        """Number of slots ever handed out (live or free)"""
+        return len(self.ids)
+
+    def get(self, key, default: Optional[int] = None) -> Optional[int]:
+        return self.slot_of.get(key, default)
+
+    def allocate(self, key) -> int:
+        """Slot for a new id: a freed one if any, else the next unused slot"""
+        if self.free:
+            slot = self.free.pop()
+            self.ids[slot] = key
+        else:
+            slot = len(self.ids)
+            self.ids.append(key)
+        self.slot_of[key] = slot
+        return slot
+
+    def release(self, key) -> Optional[int]:
+        """Free an id's slot for reuse; returns the slot (None for unknown ids)"""
+        slot = self.slot_of.pop(key, None)
+        if slot is not None:
+            self.ids[slot] = None
+            self.free.append(slot)
+        return slot
+
+
+def grown_capacity(capacity: int) -> int:
+    """Next capacity for slot arrays that are full"""
+    # Grow geometrically so appends stay amortized O(1)
+    return max(16, 2 * capacity)
@@ -0,0 +1,155 @@
+from typing import Callable, Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+from scipy.sparse.csgraph import connected_components
+
+# Edges filtered per vectorized pass when splitting oversized clusters
+_SPLIT_CHUNK = 4096
+
+
+def threshold_block(block: np.ndarray, row_offset: int, threshold: float,
+                    top_k: Optional[int] = None, exclude_diagonal: bool = True) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Viable edges (rows, cols, scores) of one dense block of pair scores"""
+    if exclude_diagonal:
+        # Global row r sits on column r; never link a participant to itself
+        rows = np.arange(block.shape[0])
+        cols = rows + row_offset
+        inside = cols < block.shape[1]
+        block[rows[inside], cols[inside]] = -np.inf
+    if top_k is not None and top_k < block.shape[1]:
+        # Keep only each row's top_k neighbours before thresholding
+        cutoff = np.partition(block, block.shape[1] - top_k, axis=1)[:, block.shape[1] - top_k]
+        block = np.where(block >= cutoff[:, None], block, -np.inf)
+    rows, cols = np.nonzero(block >= threshold)
+    return rows + row_offset, cols, block[rows, cols].astype(np.float32)
+
+
+def threshold_edges(rows: np.ndarray, cols: np.ndarray, scores: np.ndarray, threshold: float,
+                    top_k: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Viable edges among scored candidate pairs (the sparse counterpart of threshold_block)"""
+    keep = (scores >= threshold) & (rows != cols)
+    if top_k is not None:
+        # Rank each row's candidates by score and keep the best top_k
+        order = np.lexsort((-scores, rows))
+        first = np.searchsorted(rows[order], rows[order])
+        ranked = np.zeros(len(rows), dtype=bool)
+        ranked[order] = np.arange(len(order)) - first < top_k
+        keep &= ranked
+    return rows[keep], cols[keep], scores[keep].astype(np.float32)
+
+
+def build_threshold_graph(score_rows: Callable[[int, int], np.ndarray], n_rows: int, n_cols: int,
+                          threshold: float, top_k: Optional[int] = None,
+                          max_block_cells: int = 1 << 24) -> sparse.csr_matrix:
+    """CSR graph of pair scores >= threshold, scoring `score_rows(start, stop)` one row block at a time
+
+    Peak memory is one block of max_block_cells scores plus the viable edges.
+    """
+    block_rows = max(1, max_block_cells // max(n_cols, 1))
+    parts = []
+    for start in range(0, n_rows, block_rows):
+        stop = min(start + block_rows, n_rows)
+        parts.append(threshold_block(score_rows(start, stop), start, threshold, top_k))
+    return edges_to_graph(parts, n_rows, n_cols)
+
+
+def edges_to_graph(parts, n_rows: int, n_cols: int) -> sparse.csr_matrix:
+    """Merge (rows, cols, scores) edge lists into one CSR matrix"""
+    if parts:
+        rows = np.concatenate([p[0] for p in parts])
+        cols = np.concatenate([p[1] for p in parts])
+        data = np.concatenate([p[2] for p in parts])
+    else:
+        rows = cols = np.zeros(0, dtype=np.int64)
+        data = np.zeros(0, dtype=np.float32)
+    return sparse.csr_matrix((data, (rows, cols)), shape=(n_rows, n_cols))
+
+
+def connected_clusters(graph: sparse.csr_matrix) -> Tuple[int, np.ndarray]:
+    """Clusters as connected components, an edge in either direction linking two participants"""
+    # Labels are numbered in order of each cluster's lowest participant index
+    return connected_components(graph, directed=True, connection='weak')
+
+
+def split_clusters(graph: sparse.csr_matrix, max_size: Optional[int]) -> Tuple[int, np.ndarray]:
+    """Connected clusters, with any larger than max_size split along their strongest edges
+
+    Oversized components are re-grown by size-capped single linkage: their
+    edges are taken best score first (ties by row, then column) and join two
+    clusters only while the result stays within max_size. Labels are
+    numbered in order of each cluster's lowest participant index, as in
+    connected_clusters. max_size=None keeps the plain components.
+    """
+    n_clusters, labels = connected_clusters(graph)
+    sizes = np.bincount(labels, minlength=n_clusters)
+    big = sizes > (max_size if max_size is not None else len(labels))
+    if not big.any():
+        return n_clusters, labels
+
+    coo = graph.tocoo()
+    inside = big[labels[coo.row]]
+    rows, cols, scores = coo.row[inside], coo.col[inside], coo.data[inside]
+    order = np.lexsort((cols, rows, -scores))
+    rows, cols = rows[order], cols[order]
+    parent = np.arange(len(labels))
+    size = np.ones(len(labels), dtype=np.int64)
+
+    def find(nodes):
+        # Union by size keeps the trees O(log n) deep
+        while True:
+            up = parent[nodes]
+            if np.array_equal(up, nodes):
+                return nodes
+            nodes = up
+
+    def find_one(node):
+        while parent[node] != node:
+            node = parent[node]
+        return node
+
+    # Clusters only grow, so an edge already within one cluster or over the
+    # cap stays that way: each chunk is filtered in bulk and only the
+    # surviving edges are joined one by one
+    for start in range(0, len(rows), _SPLIT_CHUNK):
+        root_i = find(rows[start:start + _SPLIT_CHUNK])
+        root_j = find(cols[start:start + _SPLIT_CHUNK])
+        joinable = (root_i != root_j) & (size[root_i] + size[root_j] <= max_size)
+        for i, j in zip(root_i[joinable].tolist(), root_j[joinable].tolist()):
+            i, j = find_one(i), find_one(j)
+            if i != j and size[i] + size[j] <= max_size:
+                if size[i] < size[j]:
+                    i, j = j, i
+                parent[j] = i
+                size[i] += size[j]
+
+    roots = find(np.arange(len(labels)))
+    keys = np.where(big[labels], n_clusters + roots, labels)
+    _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+    rank = np.empty(len(first), dtype=np.int64)
+    rank[np.argsort(first, kind='stable')] = np.arange(len(first))
+    return len(first), rank[inverse]
+
+
+def cluster_network_scores(graph: sparse.csr_matrix, labels: np.ndarray, n_clusters: int) -> np.ndarray:
+    """Mean score over each cluster's viable edges (edges to other clusters
+    and non-viable pairs are left out; a lone participant scores 0)"""
+    coo = graph.tocoo()
+    inside = labels[coo.row] == labels[coo.col]
+    cluster_of_edge = labels[coo.row[inside]]
+    edge_sums = np.bincount(cluster_of_edge, weights=coo.data[inside], minlength=n_clusters)
+    edge_counts = np.bincount(cluster_of_edge, minlength=n_clusters)
+    return edge_sums / np.maximum(edge_counts, 1)
+
+
+def top_clusters(network_scores: np.ndarray, limit: int) -> np.ndarray:
+    """Cluster labels of the best `limit` scores, ties broken by label"""
+    if len(network_scores) > limit:
+        candidates = np.argpartition(-network_scores, limit - 1)[:limit]
+        # Pull in every cluster tied with the cut-off so the tie-break is stable
+        cutoff = network_scores[candidates].min()
+        candidates = np.flatnonzero(network_scores >= cutoff)
+    else:
+        candidates = np.arange(len(network_scores))
+    order = np.lexsort((candidates, -network_scores[candidates]))
+    return candidates[order][:limit]
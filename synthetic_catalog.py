@@ -0,0 +1,146 @@
+from typing import Dict, List
+
+import numpy as np
+
+INDUSTRIES = ['cement', 'steel', 'chemicals', 'plastics', 'textiles', 'metals', 'paper',
+              'glass', 'food processing', 'energy', 'construction', 'automotive']
+MATERIALS = ['fly ash', 'slag', 'plastic', 'scrap metal', 'waste heat', 'wood chips',
+             'glass cullet', 'textile offcuts', 'spent solvents', 'gypsum', 'sludge', 'cardboard']
+CAPABILITIES = ['shredding', 'pelletizing', 'smelting', 'composting', 'pyrolysis', 'sorting',
+                'washing', 'drying', 'grinding', 'anaerobic digestion', 'filtration', 'baling']
+SERVICES = ['machine learning', 'computer vision', 'predictive maintenance', 'IoT', 'predictive analytics',
+            'data visualization', 'NLP', 'supply chain optimization', 'robotics', 'edge computing',
+            'digital twins', 'quality control', 'energy monitoring', 'recommendation systems']
+TIMELINES = ['1 month', '3 months', '6 months', '12 months']
+
+
+def generate_buyers(n: int, seed: int = 0) -> List[Dict]:
+    """Waste producers in the schema RevolutionaryAIMatching scores"""
+    rng = np.random.default_rng(seed)
+    industries = rng.integers(len(INDUSTRIES), size=n)
+    wastes = rng.integers(len(MATERIALS), size=n)
+    annual_waste = rng.integers(10, 50000, size=n).tolist()
+    carbon = rng.integers(100, 9000, size=n).tolist()
+    distance = rng.integers(0, 800, size=n).tolist()
+    quantity = rng.integers(1, 5000, size=n).tolist()
+    latitude, longitude = _locations(rng, n)
+    return [{
+        'id': f"b{i}",
+        'industry': INDUSTRIES[industries[i]],
+        'annual_waste': annual_waste[i],
+        'waste_type': MATERIALS[wastes[i]],
+        'carbon_footprint': carbon[i],
+        'distance_to_seller': distance[i],
+        'quantity': quantity[i],
+        'latitude': latitude[i],
+        'longitude': longitude[i],
+    } for i in range(n)]
+
+
+def generate_sellers(n: int, seed: int = 0) -> List[Dict]:
+    """Material consumers in the schema RevolutionaryAIMatching scores"""
+    rng = np.random.default_rng(seed + 1)
+    materials = rng.integers(len(MATERIALS), size=n)
+    capabilities = _pick_lists(rng, CAPABILITIES, n, 1, 4)
+    carbon = rng.integers(100, 9000, size=n).tolist()
+    latitude, longitude = _locations(rng, n)
+    return [{
+        'id': f"s{i}",
+        'material_needed': MATERIALS[materials[i]],
+        'capabilities': capabilities[i],
+        'carbon_footprint': carbon[i],
+        'latitude': latitude[i],
+        'longitude': longitude[i],
+    } for i in range(n)]
+
+
+def generate_participants(n: int, seed: int = 0) -> List[Dict]:
+    """Network participants that both produce waste and consume material (located like the buyers)"""
+    participants = []
+    for i, (buyer, seller) in enumerate(zip(generate_buyers(n, seed), generate_sellers(n, seed))):
+        seller.pop('latitude')
+        seller.pop('longitude')
+        buyer.update(seller)
+        buyer['id'] = f"p{i}"
+        participants.append(buyer)
+    return participants
+
+
+def generate_transactions(n: int, seed: int = 0) -> List[Dict]:
+    """Scored transaction outcomes for record_transaction_outcome"""
+    rng = np.random.default_rng(seed + 2)
+    scores = rng.random((n, 4))
+    # Outcomes loosely follow the scores so the adaptation model has signal
+    success = (scores.mean(axis=1) + 0.2 * rng.standard_normal(n) > 0.5).astype(float)
+    return [{
+        'buyer_id': f"b{i}",
+        'seller_id': f"s{i}",
+        'semantic_score': row[0],
+        'trust_score': row[1],
+        'sustainability_score': row[2],
+        'forecast_score': row[3],
+        'success_indicator': outcome,
+    } for i, (row, outcome) in enumerate(zip(scores.tolist(), success.tolist()))]
+
+
+def generate_industrial_buyers(n: int, seed: int = 0) -> List[Dict]:
+    """Buyer needs in the schema IndustrialAIMatchingService scores"""
+    rng = np.random.default_rng(seed + 3)
+    industries = rng.integers(len(INDUSTRIES), size=n)
+    required = _pick_lists(rng, SERVICES, n, 1, 4)
+    budget = rng.integers(5, 200, size=n) * 1000
+    timelines = rng.integers(len(TIMELINES), size=n)
+    return [{
+        'industry': INDUSTRIES[industries[i]],
+        'description': f"Need {' and '.join(required[i])} for {INDUSTRIES[industries[i]]} operations",
+        'required_capabilities': required[i],
+        'budget': int(budget[i]),
+        'timeline': TIMELINES[timelines[i]],
+    } for i in range(n)]
+
+
+def generate_industrial_sellers(n: int, seed: int = 0) -> List[Dict]:
+    """Seller profiles in the schema IndustrialAIMatchingService scores"""
+    rng = np.random.default_rng(seed + 4)
+    industries = _pick_lists(rng, INDUSTRIES, n, 1, 3)
+    capabilities = _pick_lists(rng, SERVICES, n, 2, 5)
+    low = rng.integers(5, 150, size=n) * 1000
+    high = low + rng.integers(10, 100, size=n) * 1000
+    experience = rng.integers(1, 30, size=n).tolist()
+    return [{
+        'id': i,
+        'industries': industries[i],
+        'capabilities': capabilities[i],
+        'description': f"{capabilities[i][0]} solutions for {industries[i][0]}",
+        'pricing_range': [int(low[i]), int(high[i])],
+        'years_experience': experience[i],
+    } for i in range(n)]
+
+
+def generate_mvp_buyers(n: int, seed: int = 0) -> List[Dict]:
+    """Buyers for the keyword matcher in ai-service"""
+    rng = np.random.default_rng(seed + 5)
+    return [{'id': f"b{i}", 'needs': ' '.join(needs)}
+            for i, needs in enumerate(_pick_lists(rng, SERVICES, n, 1, 4))]
+
+
+def generate_mvp_sellers(n: int, seed: int = 0) -> List[Dict]:
+    """Sellers for the keyword matcher in ai-service"""
+    rng = np.random.default_rng(seed + 6)
+    return [{'id': f"s{i}", 'capabilities': ' '.join(capabilities)}
+            for i, capabilities in enumerate(_pick_lists(rng, SERVICES, n, 2, 6))]
+
+
+def _locations(rng: np.random.Generator, n: int):
+    # Sites cluster around a few dozen industrial hubs, so most pairs are far apart
+    hubs = np.random.default_rng(0).uniform((25, -120), (60, 140), size=(40, 2))
+    centre = hubs[rng.integers(len(hubs), size=n)]
+    return ((centre[:, 0] + rng.normal(0, 2, n)).round(4).tolist(),
+            (centre[:, 1] + rng.normal(0, 3, n)).round(4).tolist())
+
+
+def _pick_lists(rng: np.random.Generator, vocabulary: List[str], n: int, low: int, high: int) -> List[List[str]]:
+    # Between low and high distinct terms per row, drawn from one random permutation per row
+    counts = rng.integers(low, high + 1, size=n)
+    order = np.argsort(rng.random((n, len(vocabulary))), axis=1)
+    return [[vocabulary[j] for j in row[:count]] for row, count in zip(order.tolist(), counts.tolist())]
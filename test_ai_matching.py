@@ -1,15 +1,15 @@
 import sys
 from pathlib import Path
 
-# Add the absolute path to the application directory
-app_path = Path("c:/Users/amrey/Desktop/industrial symbiosis market place")
+# Run from anywhere: the matchers live next to this file
+app_path = Path(__file__).resolve().parent
 sys.path.insert(0, str(app_path))
 
-from app.services.ai_service import AIService
+from industrial_ai_matching import IndustrialAIMatchingService
 
 def run_test():
     print("Testing Industrial AI Matching Service...")
-    service = AIService()
+    service = IndustrialAIMatchingService()
     
     # Define a buyer with specific needs
     buyer = {
@@ -49,7 +49,7 @@ def run_test():
     ]
     
     # Find matches
-    matches = service.find_matches(buyer, sellers)
+    matches = service.match_buyers_sellers(buyer, sellers)
     
     print("\nBuyer Requirements:")
     print(f"Industry: {buyer['industry']}")
@@ -0,0 +1,90 @@
+import json
+import os
+import random
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from bulk_match import BulkMatchJob
+from encoders import HashingEncoder
+from revolutionary_ai_matching import RevolutionaryAIMatching
+
+MATERIALS = ["slag", "fly ash", "plastic", "glass"]
+TRUST = {"s3": {"success_rate": 1.0, "disputes": 0, "verification": 3}}
+
+
+def _write_jsonl(path, records):
+    path.write_text("".join(json.dumps(record) + "\n" for record in records))
+    return str(path)
+
+
+def _participants(seed, n_buyers=120, n_sellers=80):
+    rng = random.Random(seed)
+    buyers = [{"id": f"b{i}", "industry": rng.choice(["steel", "cement"]), "annual_waste": rng.randint(1, 9000),
+               "waste_type": rng.choice(MATERIALS), "carbon_footprint": rng.randint(1, 9000),
+               "distance_to_seller": rng.randint(0, 600)} for i in range(n_buyers)]
+    sellers = [{"id": f"s{i}", "material_needed": rng.choice(MATERIALS), "capabilities": ["sorting", "shredding"][:i % 3],
+                "carbon_footprint": rng.randint(1, 9000)} for i in range(n_sellers)]
+    return buyers, sellers
+
+
+def _job(tmp_path, buyers_path, sellers_path, **kwargs):
+    return BulkMatchJob(buyers_path, sellers_path, str(tmp_path / "out.jsonl"), top_k=5, chunk_size=32,
+                        trust_records=TRUST, encoder=HashingEncoder(), **kwargs)
+
+
+def _output(tmp_path):
+    return [json.loads(line) for line in (tmp_path / "out.jsonl").read_text().splitlines()]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_bulk_results_match_pairwise_scores(tmp_path, workers):
+    buyers, sellers = _participants(0)
+    buyers_path, sellers_path = _write_jsonl(tmp_path / "b.jsonl", buyers), _write_jsonl(tmp_path / "s.jsonl", sellers)
+    summary = _job(tmp_path, buyers_path, sellers_path, workers=workers).run()
+    assert summary["buyers"] == len(buyers) and summary["sellers"] == len(sellers)
+
+    matcher = RevolutionaryAIMatching(encoder=HashingEncoder())
+    matcher.trust_network = TRUST
+    scores = matcher.predict_compatibility_matrix(buyers, sellers)
+    for row, buyer in zip(_output(tmp_path), buyers):
+        assert row["buyer_id"] == buyer["id"]
+        expected = np.round(np.sort(scores[int(buyer["id"][1:])])[::-1][:5], 3)
+        np.testing.assert_allclose([m["revolutionary_score"] for m in row["matches"]], expected, atol=1.5e-3)
+
+
+def test_interrupted_run_resumes_from_checkpoint(tmp_path):
+    buyers, sellers = _participants(1)
+    buyers_path, sellers_path = _write_jsonl(tmp_path / "b.jsonl", buyers), _write_jsonl(tmp_path / "s.jsonl", sellers)
+    _job(tmp_path, buyers_path, sellers_path).run()
+    complete = _output(tmp_path)
+
+    # Roll the checkpoint back two chunks and leave a torn line behind
+    checkpoint_path = tmp_path / "out.jsonl.checkpoint"
+    checkpoint = json.loads(checkpoint_path.read_text())
+    lines = (tmp_path / "out.jsonl").read_text().splitlines(keepends=True)
+    checkpoint.update(next_chunk=2, buyers_done=64, output_bytes=sum(len(line) for line in lines[:64]))
+    checkpoint_path.write_text(json.dumps(checkpoint))
+    with open(tmp_path / "out.jsonl", "a") as out:
+        out.write('{"partial')
+
+    assert _job(tmp_path, buyers_path, sellers_path).run()["buyers"] == len(buyers)
+    assert _output(tmp_path) == complete
+
+
+def test_rewritten_buyers_file_invalidates_checkpoint(tmp_path):
+    buyers, sellers = _participants(2)
+    buyers_path, sellers_path = _write_jsonl(tmp_path / "b.jsonl", buyers), _write_jsonl(tmp_path / "s.jsonl", sellers)
+    _job(tmp_path, buyers_path, sellers_path).run()
+
+    # Same path, new content: the job must start over, not skip finished chunks
+    new_buyers, _ = _participants(3, n_buyers=90)
+    _write_jsonl(tmp_path / "b.jsonl", new_buyers)
+    os.utime(buyers_path, ns=(0, os.stat(buyers_path).st_mtime_ns + 1))
+    summary = _job(tmp_path, buyers_path, sellers_path).run()
+    assert summary["buyers"] == len(new_buyers)
+    assert [row["buyer_id"] for row in _output(tmp_path)] == [b["id"] for b in new_buyers]
@@ -0,0 +1,84 @@
+import multiprocessing
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from embedding_cache import EmbeddingCache
+from encoders import HashingEncoder
+
+
+def _texts(prefix, n):
+    return [f"{prefix} waste stream {i}" for i in range(n)]
+
+
+def test_disk_tier_round_trip_for_every_model(tmp_path):
+    small, large = HashingEncoder(16), HashingEncoder(32)
+    cache = EmbeddingCache(disk_path=str(tmp_path))
+    expected_small = cache.encode(small, small.name, _texts("a", 20))
+    expected_large = cache.encode(large, large.name, _texts("b", 20))
+    cache.flush()
+
+    reopened = EmbeddingCache(disk_path=str(tmp_path))
+    np.testing.assert_array_equal(reopened.encode(small, small.name, _texts("a", 20)), expected_small)
+    np.testing.assert_array_equal(reopened.encode(large, large.name, _texts("b", 20)), expected_large)
+    stats = reopened.stats()
+    assert stats["disk_hits"] == 40 and stats["misses"] == 0 and stats["disk_entries"] == 40
+
+
+def test_caches_sharing_a_directory_keep_each_others_rows(tmp_path):
+    encoder = HashingEncoder(16)
+    first = EmbeddingCache(disk_path=str(tmp_path))
+    second = EmbeddingCache(disk_path=str(tmp_path))
+    first.encode(encoder, encoder.name, _texts("a", 10))
+    first.flush()
+    second.encode(encoder, encoder.name, _texts("b", 10))
+    second.flush()
+
+    # The second flush appended after the first and picked up its rows
+    assert second.stats()["disk_entries"] == 20
+    reopened = EmbeddingCache(disk_path=str(tmp_path))
+    reopened.encode(encoder, encoder.name, _texts("a", 10) + _texts("b", 10))
+    assert reopened.stats()["disk_hits"] == 20
+
+
+def test_rows_overwritten_elsewhere_are_misses(tmp_path):
+    encoder = HashingEncoder(16)
+    reader = EmbeddingCache(max_entries=0, disk_path=str(tmp_path), disk_capacity=4)
+    reader.encode(encoder, encoder.name, _texts("a", 4))
+    reader.flush()
+
+    writer = EmbeddingCache(disk_path=str(tmp_path))
+    writer.encode(encoder, encoder.name, _texts("b", 4))
+    writer.flush()
+    assert writer.stats()["disk_evictions"] == 4
+
+    # reader's index still points "a" keys at rows that now hold "b" vectors
+    expected = encoder.encode(_texts("a", 4))
+    np.testing.assert_allclose(reader.encode(encoder, encoder.name, _texts("a", 4)), expected, rtol=1e-6)
+    assert reader.stats()["disk_hits"] == 0
+
+
+def _fill(path, prefix):
+    encoder = HashingEncoder(16)
+    cache = EmbeddingCache(disk_path=path, flush_every=7)
+    cache.encode(encoder, encoder.name, _texts(prefix, 200))
+    cache.flush()
+
+
+def test_concurrent_processes_share_one_directory(tmp_path):
+    context = multiprocessing.get_context("fork")
+    workers = [context.Process(target=_fill, args=(str(tmp_path), prefix)) for prefix in "abc"]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+        assert worker.exitcode == 0
+
+    encoder = HashingEncoder(16)
+    cache = EmbeddingCache(disk_path=str(tmp_path))
+    texts = _texts("a", 200) + _texts("b", 200) + _texts("c", 200)
+    np.testing.assert_allclose(cache.encode(encoder, encoder.name, texts), encoder.encode(texts), rtol=1e-6)
+    assert cache.stats()["disk_hits"] == 600
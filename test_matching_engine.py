@@ -0,0 +1,64 @@
+import random
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# The MVP matcher lives in ai-service/, which is not a package
+sys.path.insert(0, str(Path(__file__).resolve().parent / "ai-service"))
+
+from matching_engine import KeywordIndex, match_buyers_sellers
+
+WORDS = ["ai", "iot", "vision", "learning", "deep", "sensors", "predictive", "analytics",
+         "maintenance", "machine", "computer", "cloud"]
+
+
+def _exhaustive(buyers, sellers, threshold=0.2):
+    # The original buyer x seller loop
+    matches = []
+    for buyer in buyers:
+        for seller in sellers:
+            buyer_needs = set(buyer['needs'].lower().split())
+            seller_caps = set(seller['capabilities'].lower().split())
+            common = buyer_needs.intersection(seller_caps)
+            score = len(common) / max(len(buyer_needs), 1)
+            if score > threshold:
+                matches.append({'buyer_id': buyer['id'], 'seller_id': seller['id'],
+                                'score': round(score, 2), 'matched_keywords': list(common)})
+    return sorted(matches, key=lambda x: x['score'], reverse=True)
+
+
+def _profiles(rng, n, key, prefix):
+    return [{'id': f"{prefix}{i}", key: " ".join(rng.choice(WORDS).upper() if rng.random() < 0.1 else rng.choice(WORDS)
+                                                 for _ in range(rng.randint(0, 6)))}
+            for i in range(n)]
+
+
+def _normalized(matches):
+    return [dict(m, matched_keywords=sorted(m['matched_keywords'])) for m in matches]
+
+
+def test_index_matches_the_exhaustive_loop():
+    rng = random.Random(6)
+    for _ in range(300):
+        buyers = _profiles(rng, rng.randint(0, 8), 'needs', 'b')
+        sellers = _profiles(rng, rng.randint(0, 12), 'capabilities', 's')
+        assert _normalized(match_buyers_sellers(buyers, sellers)) == _normalized(_exhaustive(buyers, sellers))
+
+
+@pytest.mark.parametrize("n", range(1, 12))
+def test_thresholds_at_score_boundaries(n):
+    # Thresholds exactly at, and one float step either side of, every k / n
+    rng = random.Random(n)
+    # Sellers sharing every possible number of keywords, plus random ones
+    sellers = [{'id': f"c{c}", 'capabilities': " ".join(WORDS[:c] + ["cloud"])} for c in range(n + 1)]
+    sellers += _profiles(rng, 40, 'capabilities', 's')
+    index = KeywordIndex(sellers)
+    buyer = {'id': 'b', 'needs': " ".join(WORDS[:n])}
+    for k in range(n + 1):
+        for threshold in (k / n, np.nextafter(k / n, 0), np.nextafter(k / n, 1), 0.1 * k):
+            threshold = float(threshold)
+            got = sorted(index.match(buyer, threshold), key=lambda x: x['score'], reverse=True)
+            assert (_normalized(got) ==
+                    _normalized(_exhaustive([buyer], sellers, threshold))), (k, threshold)
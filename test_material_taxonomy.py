@@ -0,0 +1,67 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from material_taxonomy import (DEFAULT_EMISSION_FACTOR, RELATED_SCORE, MaterialBuckets, MaterialTaxonomy,
+                               normalize_material)
+
+# The backend's original per-material table
+BACKEND_FACTORS = {'cement': 0.95, 'steel': 1.85, 'plastic': 3.5,
+                   'textiles': 2.1, 'chemicals': 1.7, 'metals': 1.9}
+
+
+@pytest.mark.parametrize("name", ["slag", "steel_slag", "Steel-Slag", "  steel   slag ", "GGBS", "Blast furnace slag"])
+def test_synonyms_and_separators_resolve_to_the_canonical_material(name):
+    taxonomy = MaterialTaxonomy()
+    assert taxonomy.canonical_name(name) == "slag"
+    assert taxonomy.compatibility_score(name, "slag") == 1.0
+
+
+def test_same_family_scores_related_and_others_zero():
+    taxonomy = MaterialTaxonomy()
+    assert RELATED_SCORE == 0.5
+    assert taxonomy.compatibility_score("fly ash", "steel_slag") == 0.5
+    assert taxonomy.compatibility_score("steel scrap", "metals") == 0.5
+    assert taxonomy.compatibility_score("fly ash", "plastic") == 0.0
+
+
+def test_backend_emission_factors_are_unchanged():
+    taxonomy = MaterialTaxonomy()
+    for name, factor in BACKEND_FACTORS.items():
+        assert taxonomy.emission_factor(name) == factor
+    assert taxonomy.emission_factor("generic") == DEFAULT_EMISSION_FACTOR == 1.0
+
+
+def test_unknown_names_only_match_themselves():
+    taxonomy = MaterialTaxonomy()
+    assert taxonomy.canonical_id("rubber crumb") is None
+    assert taxonomy.canonical_name("Rubber_Crumb") == normalize_material("rubber crumb")
+    assert taxonomy.compatibility_score("Rubber_Crumb", "rubber crumb") == 1.0
+    assert taxonomy.compatibility_score("rubber crumb", "plastic") == 0.0
+
+    codes = taxonomy.codes()
+    ids = codes.ids(["rubber crumb", "cork", "Rubber-Crumb", "plastic"])
+    assert ids[0] == ids[2] != ids[1] and ids[3] == taxonomy.canonical_id("plastic")
+    matrix = codes.compatibility()
+    np.testing.assert_array_equal(matrix[len(taxonomy):], np.eye(len(codes))[len(taxonomy):])
+
+
+def test_candidate_pairs_match_brute_force_compatibility():
+    taxonomy = MaterialTaxonomy()
+    rng = np.random.default_rng(5)
+    names = list(taxonomy.names) + ["rubber crumb", "cork"]
+    codes = taxonomy.codes()
+    waste_ids = codes.ids(rng.choice(names, size=60))
+    material_ids = codes.ids(rng.choice(names, size=80))
+    compatibility = codes.compatibility()
+
+    rows, cols = MaterialBuckets(material_ids, compatibility).candidate_pairs(waste_ids)
+    expected = compatibility[waste_ids[:, None], material_ids[None, :]] > 0
+    got = np.zeros_like(expected)
+    got[rows, cols] = True
+    assert len(rows) == expected.sum()  # no pair twice
+    np.testing.assert_array_equal(got, expected)
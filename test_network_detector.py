@@ -0,0 +1,67 @@
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from embedding_cache import EmbeddingCache
+from encoders import HashingEncoder
+from material_taxonomy import MATERIALS
+from network_detector import IncrementalNetworkDetector
+from revolutionary_ai_matching import RevolutionaryAIMatching
+from synthetic_catalog import generate_participants
+
+
+def _assert_matches_batch(matcher, detector):
+    live = [profile for profile in detector._profiles if profile is not None]
+    expected = matcher.detect_symbiosis_network(live, detector.threshold)
+    got = detector.networks()
+    assert [n["participants"] for n in got] == [n["participants"] for n in expected]
+    for network, reference in zip(got, expected):
+        assert network["network_score"] == pytest.approx(reference["network_score"], abs=1e-3)
+
+
+@pytest.mark.parametrize("threshold", [0.68, 0.6])
+def test_random_updates_match_batch_detection(threshold):
+    # 0.6 puts most participants in one component, exercising the split
+    rng = random.Random(3)
+    matcher = RevolutionaryAIMatching(encoder=HashingEncoder(), embedding_cache=EmbeddingCache())
+    participants = generate_participants(400)
+    extra = generate_participants(600, seed=9)[400:]
+    for i, participant in enumerate(extra):
+        participant["id"] = f"x{i}"
+    ids = [p["id"] for p in participants]
+
+    detector = IncrementalNetworkDetector(matcher, threshold=threshold)
+    detector.add_many(participants)
+    _assert_matches_batch(matcher, detector)
+
+    for step in range(300):
+        op = rng.random()
+        if op < 0.4:
+            changed = dict(rng.choice(participants))
+            changed["waste_type"] = rng.choice(list(MATERIALS))
+            changed["annual_waste"] = rng.randint(1, 9999)
+            detector.update(changed)
+        elif op < 0.7 and extra:
+            detector.add(extra.pop())
+        else:
+            detector.remove(rng.choice(ids))
+        if step % 50 == 49:
+            _assert_matches_batch(matcher, detector)
+
+
+def test_add_many_after_removing_everyone_reuses_freed_slots():
+    matcher = RevolutionaryAIMatching(encoder=HashingEncoder(), embedding_cache=EmbeddingCache())
+    participants = generate_participants(45)
+    detector = IncrementalNetworkDetector(matcher, threshold=0.6)
+    detector.add_many(participants[:40])
+    for participant in participants[:40]:
+        detector.remove(participant["id"])
+    assert len(detector) == 0 and detector.networks() == []
+
+    detector.add_many(participants[40:])
+    assert len(detector) == 5
+    _assert_matches_batch(matcher, detector)
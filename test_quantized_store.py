@@ -0,0 +1,61 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from quantized_store import QuantizedEmbeddingStore
+
+
+def _vectors(n, dim=32, seed=0):
+    return np.random.default_rng(seed).standard_normal((n, dim)).astype(np.float32)
+
+
+def _store(vectors, precision, **kwargs):
+    store = QuantizedEmbeddingStore(vectors.shape[1], precision, **kwargs)
+    store.resize(len(vectors))
+    for slot, vector in enumerate(vectors):
+        store.set(slot, vector)
+    return store
+
+
+@pytest.mark.parametrize("precision", ["float32", "float16", "int8"])
+def test_store_round_trip(tmp_path, precision):
+    store = _store(_vectors(10), precision, keep_full=True)
+    store.save(str(tmp_path))
+
+    for mmap in (False, True):
+        loaded = QuantizedEmbeddingStore.load(str(tmp_path), mmap=mmap)
+        assert loaded.precision == precision and loaded.keep_full == (precision != "float32")
+        np.testing.assert_array_equal(loaded.get(np.arange(10)), store.get(np.arange(10)))
+
+
+@pytest.mark.parametrize("precision, tolerance", [("float32", 1e-6), ("float16", 1e-2), ("int8", 5e-2)])
+def test_blocked_dot_matches_dequantized_vectors(precision, tolerance):
+    vectors, query = _vectors(50), _vectors(1, seed=1)[0]
+    store = _store(vectors, precision, keep_full=True, block_size=16)
+    slots = np.arange(49, -1, -3)
+    np.testing.assert_allclose(store.dot(slots, query), store.get(slots) @ query, rtol=1e-5, atol=1e-4)
+    np.testing.assert_allclose(store.get(slots), vectors[slots], atol=tolerance * np.abs(vectors).max())
+    np.testing.assert_allclose(store.rescore(slots, query), vectors[slots] @ query, rtol=1e-5)
+    if precision == "int8":
+        assert store.nbytes == 50 * (32 + 4)
+
+
+def test_memory_mapped_updates_do_not_touch_the_snapshot(tmp_path):
+    vectors = _vectors(4)
+    _store(vectors, "int8").save(str(tmp_path))
+    loaded = QuantizedEmbeddingStore.load(str(tmp_path), mmap=True)
+    loaded.set(0, -vectors[0])
+    loaded.resize(6)
+    loaded.set(5, vectors[1])
+
+    snapshot = QuantizedEmbeddingStore.load(str(tmp_path))
+    assert len(snapshot) == 4 and len(loaded) == 6
+    np.testing.assert_array_equal(snapshot.get(np.arange(4)), _store(vectors, "int8").get(np.arange(4)))
+    loaded.save(str(tmp_path))
+    np.testing.assert_array_equal(QuantizedEmbeddingStore.load(str(tmp_path)).get(np.arange(6)), loaded.get(np.arange(6)))
+    with pytest.raises(ValueError):
+        QuantizedEmbeddingStore(8, "int4")
@@ -0,0 +1,138 @@
+import importlib.util
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from embedding_cache import EmbeddingCache
+from encoders import HashingEncoder
+from material_taxonomy import MATERIALS, MaterialTaxonomy
+from result_cache import ResultCache, SqliteBackend
+from retraining import RetrainPolicy
+from revolutionary_ai_matching import RevolutionaryAIMatching
+from synthetic_catalog import generate_buyers, generate_sellers, generate_transactions
+
+TRUST = {"b1": {"success_rate": 0.5, "disputes": 3, "verification": 1}}
+
+
+def _matcher(result_cache):
+    matcher = RevolutionaryAIMatching(encoder=HashingEncoder(), embedding_cache=EmbeddingCache(),
+                                      result_cache=result_cache, retrain_policy=RetrainPolicy(every_rows=None))
+    matcher.trust_network = TRUST
+    return matcher
+
+
+def _uncached():
+    matcher = _matcher(None)
+    matcher.result_cache = None
+    return matcher
+
+
+def _pairs(n=20):
+    return list(zip(generate_buyers(n), generate_sellers(n)))
+
+
+def test_memory_backend_lru_and_ttl():
+    now = [0.0]
+    cache = ResultCache(max_entries=2, ttl_seconds=10, clock=lambda: now[0])
+    cache.put("a", {"x": 1})
+    cache.put("b", {"x": 2})
+    cache.get("a")
+    cache.put("c", {"x": 3})
+    assert cache.get("b") is None and cache.get("a") == {"x": 1} and cache.get("c") == {"x": 3}
+    now[0] = 11
+    assert cache.get("a") is None
+    stats = cache.stats()
+    assert stats["evictions"] == 1 and stats["expired"] == 1 and stats["hits"] == 3
+
+
+@pytest.mark.parametrize("backend", ["memory", "sqlite"])
+def test_make_key_is_order_independent_and_round_trips(tmp_path, backend):
+    cache = ResultCache(backend=SqliteBackend(str(tmp_path / "r.db")) if backend == "sqlite" else None)
+    key = ResultCache.make_key("scope", {"id": 1, "industry": "steel"}, 0.5)
+    assert key == ResultCache.make_key("scope", {"industry": "steel", "id": 1}, 0.5)
+    cache.put(key, {"revolutionary_score": 0.812, "match_quality": "High Value"})
+    assert cache.get(key) == {"revolutionary_score": 0.812, "match_quality": "High Value"}
+
+
+def test_sqlite_backend_survives_reopen_and_trims(tmp_path):
+    path = str(tmp_path / "r.db")
+    cache = ResultCache(backend=SqliteBackend(path, max_entries=3, trim_every=5))
+    for key in "abcde":
+        cache.put(key, {"key": key})
+    assert cache.stats()["entries"] == 3 and cache.stats()["evictions"] == 2
+
+    reopened = ResultCache(backend=SqliteBackend(path))
+    assert reopened.get("e") == {"key": "e"} and reopened.get("a") is None
+
+
+def test_cached_results_match_uncached_through_trust_changes():
+    cached, uncached = _matcher(ResultCache()), _uncached()
+    pairs = _pairs()
+    first = [cached.predict_compatibility(b, s) for b, s in pairs]
+    assert first == [uncached.predict_compatibility(b, s) for b, s in pairs]
+    assert cached.predict_compatibility_batch(pairs) == first
+    assert cached.result_cache.stats()["hits"] == len(pairs)
+
+    for matcher in (cached, uncached):
+        matcher.trust_network[pairs[1][0]["id"]] = {"success_rate": 0.99, "disputes": 0, "verification": 3}
+    assert cached.predict_compatibility(*pairs[1]) == uncached.predict_compatibility(*pairs[1]) != first[1]
+
+
+def test_matchers_share_results_through_sqlite(tmp_path):
+    # Two matchers stand in for two worker processes (or a restart)
+    path = str(tmp_path / "r.db")
+    pairs = _pairs()
+    first = _matcher(ResultCache(backend=SqliteBackend(path)))
+    expected = first.predict_compatibility_batch(pairs)
+
+    second = _matcher(ResultCache(backend=SqliteBackend(path)))
+    assert second.predict_compatibility_batch(pairs) == expected
+    assert second.result_cache.stats()["hits"] == len(pairs)
+
+    # A different trust record is a different key, not a stale hit
+    second.trust_network = {pairs[0][1]["id"]: {"success_rate": 0.1}}
+    assert second.predict_compatibility(*pairs[0]) != expected[0]
+
+
+def test_retrain_changes_scope_and_invalidates():
+    matcher = _matcher(ResultCache())
+    pairs = _pairs(5)
+    before = [matcher.predict_compatibility(b, s) for b, s in pairs]
+    scope = matcher._result_scope
+    for transaction in generate_transactions(50):
+        matcher.record_transaction_outcome(transaction)
+    matcher._retrain_adaptation_model()
+    assert matcher._result_scope != scope
+    assert matcher.result_cache.stats()["entries"] == 0
+    assert [matcher.predict_compatibility(b, s) for b, s in pairs] == before
+
+
+def _backend_matcher(result_cache, materials=None):
+    # backend/revolutionary_ai_matching.py shares its module name with the top-level matcher
+    path = Path(__file__).resolve().parent / "backend" / "revolutionary_ai_matching.py"
+    spec = importlib.util.spec_from_file_location("backend_revolutionary_ai_matching", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.RevolutionaryAIMatching(encoder=HashingEncoder(), embedding_cache=EmbeddingCache(),
+                                          materials=materials, result_cache=result_cache)
+
+
+def test_backend_results_are_scoped_to_the_taxonomy(tmp_path):
+    path = str(tmp_path / "r.db")
+    buyer = {"industry": "cement", "waste_type": "cement kiln dust", "quantity": 2000, "distance_to_seller": 40}
+    seller = {"material_needed": "kiln dust", "capabilities": ["grinding"]}
+    first = _backend_matcher(ResultCache(backend=SqliteBackend(path)))
+    expected = first.predict_compatibility(buyer, seller)
+
+    restarted = _backend_matcher(ResultCache(backend=SqliteBackend(path)))
+    assert restarted.predict_compatibility(buyer, seller) == expected
+    assert restarted.result_cache.stats()["hits"] == 1
+
+    # An edited emission factor is a different scope, not a stale hit
+    edited = MaterialTaxonomy(dict(MATERIALS, cement=("mineral", 0.5, ["cement kiln dust"])))
+    changed = _backend_matcher(ResultCache(backend=SqliteBackend(path)), materials=edited)
+    assert changed.predict_compatibility(buyer, seller)["sustainability_score"] != expected["sustainability_score"]
+    assert changed.result_cache.stats()["hits"] == 0
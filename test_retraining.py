@@ -0,0 +1,43 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from retraining import RetrainPolicy, RetrainScheduler
+
+
+def _scheduler(policy):
+    X, y = np.arange(20, dtype=float).reshape(10, 2), np.arange(10, dtype=float)
+    return RetrainScheduler(fit_fn=lambda model, X, y: ("fitted", len(y)), snapshot_fn=lambda: (X, y),
+                            model=None, policy=policy)
+
+
+def test_drift_can_trigger_the_first_training():
+    scheduler = _scheduler(RetrainPolicy(every_rows=None, drift_threshold=0.2, min_drift_samples=50))
+    for score in np.linspace(0.2, 0.4, 50):
+        scheduler.observe_score(score)
+    assert scheduler.drift() is None  # Reference seeded, nothing recent yet
+
+    for score in np.linspace(0.7, 0.9, 50):
+        scheduler.observe_score(score)
+    assert scheduler.drift() > 0.2
+    scheduler.record_rows(1).result()
+    assert scheduler.version == 1 and scheduler.metrics()["last_trigger"] == "drift"
+    scheduler.shutdown()
+
+
+def test_failing_listener_does_not_fail_the_retrain():
+    scheduler = _scheduler(RetrainPolicy(every_rows=None))
+    seen = []
+
+    def broken(model, version):
+        raise RuntimeError("listener bug")
+
+    scheduler.add_listener(broken)
+    scheduler.add_listener(lambda model, version: seen.append(version))
+    assert scheduler.retrain().result() == ("fitted", 10)
+    assert scheduler.model == ("fitted", 10) and seen == [1]
+    assert scheduler.metrics()["listener_failures"] == 1
+    scheduler.shutdown()
@@ -0,0 +1,125 @@
+import asyncio
+import importlib.util
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from embedding_cache import EmbeddingCache
+from encoders import HashingEncoder
+from scoring_service import ScoringService, ServiceOverloaded
+from synthetic_catalog import generate_buyers, generate_sellers
+
+
+class _RecordingMatcher:
+    """Scores a pair as its buyer's "n"; can be held inside a batch"""
+    def __init__(self):
+        self.batches = []
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.release.set()
+
+    def predict_compatibility_batch(self, pairs):
+        self.batches.append(len(pairs))
+        self.started.set()
+        self.release.wait(5)
+        return [self.predict_compatibility(buyer, seller) for buyer, seller in pairs]
+
+    def predict_compatibility(self, buyer, seller):
+        if buyer.get("bad"):
+            raise ValueError("malformed buyer")
+        return {"n": buyer["n"]}
+
+
+def _backend_matcher():
+    # backend/revolutionary_ai_matching.py (the --serve worker) shares its module name with the top-level matcher
+    path = Path(__file__).resolve().parent / "backend" / "revolutionary_ai_matching.py"
+    spec = importlib.util.spec_from_file_location("backend_revolutionary_ai_matching", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    matcher = module.RevolutionaryAIMatching(encoder=HashingEncoder(), embedding_cache=EmbeddingCache())
+    matcher.result_cache = None
+    return matcher
+
+
+def _score_all(service, buyers, seller=None):
+    async def run():
+        async with service:
+            return await asyncio.gather(*(service.score(buyer, seller or {}) for buyer in buyers),
+                                        return_exceptions=True)
+    return asyncio.run(run())
+
+
+def test_flushes_when_the_batch_is_full():
+    matcher = _RecordingMatcher()
+    service = ScoringService(matcher, max_batch_size=4, max_wait_ms=60_000)
+    started = time.perf_counter()
+    results = _score_all(service, [{"n": i} for i in range(8)])
+    assert results == [{"n": i} for i in range(8)]
+    assert matcher.batches == [4, 4] and time.perf_counter() - started < 5
+
+
+def test_flushes_a_partial_batch_after_max_wait():
+    matcher = _RecordingMatcher()
+    service = ScoringService(matcher, max_batch_size=100, max_wait_ms=20)
+    started = time.perf_counter()
+    assert _score_all(service, [{"n": i} for i in range(3)]) == [{"n": 0}, {"n": 1}, {"n": 2}]
+    assert matcher.batches == [3] and time.perf_counter() - started < 5
+    assert service.metrics()["mean_batch_size"] == 3
+
+
+def test_full_queue_rejects_or_suspends():
+    async def run():
+        matcher = _RecordingMatcher()
+        matcher.release.clear()
+        service = ScoringService(matcher, max_batch_size=1, max_wait_ms=0, max_queue=2)
+        async with service:
+            # The first request is held inside its batch, so the next two fill the queue
+            first = asyncio.ensure_future(service.score({"n": 0}, {}))
+            while not matcher.started.is_set():
+                await asyncio.sleep(0.001)
+            queued = [asyncio.ensure_future(service.score({"n": i}, {})) for i in (1, 2)]
+            await asyncio.sleep(0.01)
+            with pytest.raises(ServiceOverloaded):
+                await service.score({"n": 3}, {})
+
+            waiting = asyncio.ensure_future(service.score({"n": 4}, {}, wait=True))
+            await asyncio.sleep(0.01)
+            assert not waiting.done()
+            matcher.release.set()
+            results = await asyncio.gather(first, *queued, waiting)
+        assert results == [{"n": 0}, {"n": 1}, {"n": 2}, {"n": 4}]
+        assert service.metrics()["rejected"] == 1
+    asyncio.run(run())
+
+
+def test_a_bad_pair_fails_alone():
+    matcher = _RecordingMatcher()
+    service = ScoringService(matcher, max_batch_size=8, max_wait_ms=50)
+    results = _score_all(service, [{"n": 0}, {"n": 1, "bad": True}, {"n": 2}])
+    assert results[0] == {"n": 0} and results[2] == {"n": 2}
+    assert isinstance(results[1], ValueError) and service.metrics()["failed"] == 1
+
+    # The same through the real matcher: a buyer without an industry is malformed
+    buyers = generate_buyers(4)
+    del buyers[2]["industry"]
+    results = _score_all(ScoringService(_backend_matcher(), max_batch_size=8, max_wait_ms=50),
+                         buyers, generate_sellers(1)[0])
+    assert isinstance(results[2], KeyError)
+    assert all(isinstance(result, dict) for i, result in enumerate(results) if i != 2)
+
+
+def test_batched_results_equal_single_predictions():
+    buyers, sellers = generate_buyers(20), generate_sellers(20)
+    service = ScoringService(_backend_matcher(), max_batch_size=8, max_wait_ms=50)
+
+    async def run():
+        async with service:
+            return await asyncio.gather(*(service.score(b, s) for b, s in zip(buyers, sellers)))
+    reference = _backend_matcher()
+    assert asyncio.run(run()) == [reference.predict_compatibility(b, s) for b, s in zip(buyers, sellers)]
+    assert service.metrics()["batches"] < len(buyers)
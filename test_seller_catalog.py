@@ -0,0 +1,65 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from embedding_cache import EmbeddingCache
+from encoders import HashingEncoder
+from industrial_ai_matching import IndustrialAIMatchingService
+from seller_catalog import SellerCatalog
+from synthetic_catalog import generate_industrial_buyers, generate_industrial_sellers
+
+
+def _incremental(sellers):
+    catalog = SellerCatalog()
+    for seller in sellers:
+        catalog.add(seller)
+    return catalog
+
+
+def test_from_profiles_matches_incremental_adds():
+    sellers = generate_industrial_sellers(500)
+    sellers[3]["industries"] = ["cement", "cement", "steel"]
+    built, added = SellerCatalog.from_profiles(sellers), _incremental(sellers)
+    for buyer in generate_industrial_buyers(10):
+        for got, expected in zip(built.structured_scores(buyer), added.structured_scores(buyer)):
+            np.testing.assert_array_equal(got, expected)
+
+
+def test_from_profiles_catalog_can_be_changed():
+    sellers = generate_industrial_sellers(50)
+    built, added = SellerCatalog.from_profiles(sellers), _incremental(sellers)
+    for catalog in (built, added):
+        catalog.remove(sellers[5]["id"])
+        catalog.add(dict(sellers[10], id="new", industries=["glass"]))
+        catalog.update(dict(sellers[7], capabilities=["sorting"]))
+    ids = [seller["id"] for seller in sellers if seller["id"] != sellers[5]["id"]] + ["new"]
+    assert len(built) == len(added) == 50
+    buyer = generate_industrial_buyers(1)[0]
+    for got, expected in zip(built.structured_scores(buyer, built.slots_for(ids)),
+                             added.structured_scores(buyer, added.slots_for(ids))):
+        np.testing.assert_array_equal(got, expected)
+
+
+def test_match_buyers_sellers_scores_repeated_ids():
+    service = IndustrialAIMatchingService(embedding_cache=EmbeddingCache(), encoder=HashingEncoder())
+    buyer = generate_industrial_buyers(1)[0]
+    seller = generate_industrial_sellers(1)[0]
+    # Same id, different offers: both rows are scored on their own terms
+    cheap = dict(seller, pricing_range=[0, buyer["budget"]])
+    pricey = dict(seller, pricing_range=[buyer["budget"] + 1, buyer["budget"] + 2])
+    matches = service.match_buyers_sellers(buyer, [pricey, cheap])
+    assert [seller_id for _, seller_id in matches] == [seller["id"], seller["id"]]
+    assert matches[0][0] - matches[1][0] > 0.1
+
+
+def test_top_matches_keep_input_order_for_ties():
+    service = IndustrialAIMatchingService(encoder=HashingEncoder(), embedding_cache=EmbeddingCache())
+    rng = np.random.default_rng(4)
+    combined = rng.choice([0.2, 0.5, 0.7, 0.9], size=300)
+    ids = [f"s{i}" for i in range(300)]
+    for k in (1, 5, 40, 299, 300, 500):
+        expected = sorted(zip(combined.tolist(), ids), key=lambda x: x[0], reverse=True)[:k]
+        assert service._top_matches(combined, ids, k) == expected
@@ -0,0 +1,54 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from seller_index import SellerIndex
+
+
+def _vectors(n, dim=32, seed=0):
+    return np.random.default_rng(seed).standard_normal((n, dim)).astype(np.float32)
+
+
+def test_index_search_survives_save_load(tmp_path):
+    index = SellerIndex(precision="int8", keep_full=True)
+    vectors = _vectors(200)
+    index.add_many([f"s{i}" for i in range(200)], vectors)
+    index.remove("s7")
+    index.build_ivf(8)
+    index.save(str(tmp_path))
+
+    loaded = SellerIndex.load(str(tmp_path))
+    assert len(loaded) == 199 and "s7" not in loaded
+    for query in _vectors(5, seed=1):
+        ids, scores = index.search(query, 10)
+        loaded_ids, loaded_scores = loaded.search(query, 10)
+        assert ids == loaded_ids
+        np.testing.assert_allclose(scores, loaded_scores)
+
+
+@pytest.mark.parametrize("mmap", [False, True])
+def test_loaded_index_can_be_changed_and_saved_in_place(tmp_path, mmap):
+    index = SellerIndex()
+    index.add_many([f"s{i}" for i in range(100)], _vectors(100))
+    index.save(str(tmp_path))
+
+    snapshot = SellerIndex.load(str(tmp_path), mmap=mmap)
+    loaded = SellerIndex.load(str(tmp_path), mmap=mmap)
+    # Updates must not leak into the saved files (or other loads of them)
+    loaded.update("s0", -index.embedding("s0"))
+    np.testing.assert_allclose(snapshot.embedding("s0"), index.embedding("s0"))
+
+    # Growing past capacity and saving over the files it was loaded from
+    extra = _vectors(2000, seed=2)
+    loaded.add_many([f"x{i}" for i in range(2000)], extra)
+    loaded.save(str(tmp_path))
+
+    reloaded = SellerIndex.load(str(tmp_path), mmap=mmap)
+    assert len(reloaded) == 2100
+    np.testing.assert_allclose(reloaded.embedding("s0"), -index.embedding("s0"), rtol=1e-6)
+    np.testing.assert_allclose(reloaded.embedding("x5"), extra[5] / np.linalg.norm(extra[5]), rtol=1e-5)
+    assert not list(tmp_path.rglob("*.tmp"))
@@ -0,0 +1,27 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from slot_allocator import SlotAllocator, grown_capacity
+
+
+def test_freed_slots_are_reused_before_new_ones():
+    slots = SlotAllocator(reserved=1)
+    assert [slots.allocate(key) for key in "abc"] == [1, 2, 3]
+    assert slots.release("b") == 2 and slots.release("missing") is None
+    assert "b" not in slots and slots.ids == [None, "a", None, "c"]
+    assert slots.allocate("d") == 2 and slots.allocate("e") == 4
+    assert len(slots) == 4 and list(slots) == ["a", "c", "d", "e"] and slots.high_water == 5
+
+
+def test_from_ids_round_trips_saved_state():
+    slots = SlotAllocator()
+    for key in ["a", "b", "c", "d"]:
+        slots.allocate(key)
+    slots.release("c")
+    restored = SlotAllocator.from_ids(slots.ids, slots.free)
+    assert restored.slot_of == slots.slot_of and restored.allocate("x") == 2
+    # A duplicate id resolves to its last slot
+    assert SlotAllocator.from_ids(["a", "b", "a"]).get("a") == 2
+    assert [grown_capacity(c) for c in (0, 16, 40)] == [16, 32, 80]
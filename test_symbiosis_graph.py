@@ -0,0 +1,40 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+from scipy import sparse
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from symbiosis_graph import cluster_network_scores, split_clusters
+
+
+def _graph(n, edges):
+    rows, cols, scores = zip(*edges)
+    return sparse.csr_matrix((np.array(scores, dtype=np.float32), (rows, cols)), shape=(n, n))
+
+
+def test_components_within_cap_are_kept():
+    graph = _graph(6, [(0, 1, 0.9), (2, 1, 0.8), (4, 5, 0.75)])
+    n_clusters, labels = split_clusters(graph, 3)
+    assert n_clusters == 3 and labels.tolist() == [0, 0, 0, 1, 2, 2]
+    assert split_clusters(graph, None)[1].tolist() == labels.tolist()
+
+
+def test_oversized_component_splits_along_strongest_edges():
+    # A chain 0-1-2-3-4-5 whose weakest link is 2-3
+    graph = _graph(6, [(0, 1, 0.9), (1, 2, 0.85), (2, 3, 0.71), (3, 4, 0.8), (5, 4, 0.95)])
+    n_clusters, labels = split_clusters(graph, 3)
+    assert n_clusters == 2 and labels.tolist() == [0, 0, 0, 1, 1, 1]
+    assert split_clusters(graph, None)[0] == 1
+
+    sizes = np.bincount(split_clusters(_graph(40, [(i, i + 1, 0.7 + i / 1000) for i in range(39)]), 7)[1])
+    assert sizes.max() <= 7 and sizes.sum() == 40
+
+
+def test_network_scores_average_viable_edges_only():
+    graph = _graph(5, [(0, 1, 0.9), (1, 0, 0.7), (1, 2, 0.8), (2, 3, 0.72)])
+    labels = np.array([0, 0, 0, 1, 2])
+    scores = cluster_network_scores(graph, labels, 3)
+    # The 2-3 edge crosses clusters and a lone participant scores 0
+    np.testing.assert_allclose(scores, [0.8, 0.0, 0.0], rtol=1e-6)
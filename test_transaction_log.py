@@ -0,0 +1,84 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from transaction_log import FEATURE_COLUMNS, TransactionLog
+
+
+def _transaction(i):
+    return {"semantic_score": i / 100, "trust_score": 0.5, "sustainability_score": 0.25,
+            "forecast_score": 0.75, "success_indicator": i % 2, "buyer_id": f"b{i}"}
+
+
+def test_appends_span_chunks_and_tail_windows():
+    log = TransactionLog(chunk_size=8)
+    for i in range(30):
+        log.append(_transaction(i))
+    log.append({"semantic_score": 0.9, "success_indicator": None})
+    assert len(log) == 31
+    np.testing.assert_allclose(log.tail()[:30, 0], np.arange(30) / 100)
+    np.testing.assert_allclose(log.tail(10)[:9, 0], np.arange(21, 30) / 100)
+
+    # The incomplete last row is left out of the training snapshot
+    X, y = log.training_data(window=12)
+    assert X.shape == (11, len(FEATURE_COLUMNS)) and y.tolist() == [i % 2 for i in range(19, 30)]
+    assert log.to_frame()["buyer_id"].tolist()[:3] == ["b0", "b1", "b2"]
+
+
+def test_segments_round_trip_and_keep_appending(tmp_path):
+    log = TransactionLog(path=str(tmp_path), segment_rows=7)
+    for i in range(20):
+        log.append(_transaction(i))
+    log.close()
+    assert len(list(tmp_path.glob("*.bin"))) == 3
+
+    reopened = TransactionLog.open(str(tmp_path), segment_rows=7)
+    np.testing.assert_array_equal(reopened.tail(), log.tail())
+    for i in range(20, 25):
+        reopened.append(_transaction(i))
+    reopened.close()
+
+    again = TransactionLog.open(str(tmp_path), segment_rows=7)
+    assert len(again) == 25
+    np.testing.assert_allclose(again.tail()[:, 0], np.arange(25) / 100)
+    assert again.to_frame()["buyer_id"].tolist()[-1] == "b24"
+
+
+def test_torn_last_row_is_dropped_on_open(tmp_path):
+    log = TransactionLog(path=str(tmp_path))
+    for i in range(5):
+        log.append(_transaction(i))
+    log.close()
+    # A crash after the values were written but before the extras line
+    with open(tmp_path / "000000.bin", "ab") as f:
+        f.write(np.ones(len(log.columns)).tobytes())
+
+    reopened = TransactionLog.open(str(tmp_path))
+    assert len(reopened) == 5
+    np.testing.assert_array_equal(reopened.tail(), log.tail())
+    assert (tmp_path / "000000.bin").stat().st_size == 5 * len(log.columns) * 8
+
+
+def test_partial_value_bytes_are_cut_before_appending(tmp_path):
+    log = TransactionLog(path=str(tmp_path))
+    for i in range(5):
+        log.append(_transaction(i))
+    log.close()
+    # A crash partway through writing the values, and half an extras line
+    with open(tmp_path / "000000.bin", "ab") as f:
+        f.write(b"\x01" * 13)
+    with open(tmp_path / "000000.jsonl", "a") as f:
+        f.write('{"buyer_id": "b')
+
+    reopened = TransactionLog.open(str(tmp_path))
+    assert len(reopened) == 5
+    reopened.append(_transaction(5))
+    reopened.close()
+
+    again = TransactionLog.open(str(tmp_path))
+    assert len(again) == 6
+    np.testing.assert_array_equal(again.tail()[-1], reopened.tail()[-1])
+    assert again.to_frame()["buyer_id"].tolist() == [f"b{i}" for i in range(6)]
@@ -0,0 +1,59 @@
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from trust_store import DEFAULT_TRUST, TrustStore
+
+RECORDS = {
+    "s1": {"success_rate": 0.95, "disputes": 2, "verification": 3},
+    "b1": {"success_rate": 0.6, "disputes": 0, "verification": 1, "region": "north"},
+}
+
+
+def _composite(seller, buyer):
+    # The original dict-based formula
+    return (0.6 * seller["success_rate"] + 0.2 * (1 - min(1, seller["disputes"] / 10)) +
+            0.1 * seller["verification"] + 0.1 * buyer["success_rate"])
+
+
+def test_round_trip_matches_plain_dict():
+    store = TrustStore(RECORDS)
+    assert len(store) == 2 and set(store) == {"s1", "b1"}
+    assert {pid: dict(record) for pid, record in store.items()} == RECORDS
+    assert store["b1"] == RECORDS["b1"] and store.get("missing") is None
+    assert json.loads(json.dumps(dict(store["b1"]))) == RECORDS["b1"]
+    assert store.trust_score("s1", "b1") == pytest.approx(_composite(RECORDS["s1"], RECORDS["b1"]))
+    assert store.trust_score("nobody", "b1") == pytest.approx(_composite(DEFAULT_TRUST, RECORDS["b1"]))
+
+
+def test_in_place_edits_write_through():
+    store = TrustStore(RECORDS)
+    version, seller_version = store.version, store.entity_version("s1")
+    store["s1"]["success_rate"] = 0.5
+    assert store["s1"]["success_rate"] == 0.5
+    assert store.trust_score("s1", "b1") == pytest.approx(_composite(dict(RECORDS["s1"], success_rate=0.5), RECORDS["b1"]))
+    assert store.version > version and store.entity_version("s1") > seller_version
+
+    record = store["b1"]
+    record.update(success_rate=0.9, tier="gold")
+    del record["region"]
+    assert dict(store["b1"]) == {"success_rate": 0.9, "disputes": 0, "verification": 1, "tier": "gold"}
+
+
+def test_deleted_slots_are_reused():
+    store = TrustStore({f"p{i}": {"success_rate": i / 10} for i in range(5)})
+    slot = int(store.slots(["p2"])[0])
+    capacity = len(store.success_rate)
+    del store["p2"]
+    assert "p2" not in store and store.trust_score("p2", "p0") == store.trust_score("nobody", "p0")
+
+    version = store.version
+    store["new"] = {"success_rate": 0.3}
+    assert int(store.slots(["new"])[0]) == slot and len(store.success_rate) == capacity
+    assert store["new"]["success_rate"] == 0.3 and store.entity_version("new") > version
+    with pytest.raises(KeyError):
+        store["p2"]
@@ -0,0 +1,174 @@
+import json
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+FEATURE_COLUMNS = ['semantic_score', 'trust_score', 'sustainability_score', 'forecast_score']
+TARGET_COLUMN = 'success_indicator'
+
+
+class TransactionLog:
+    """Append-efficient columnar transaction history
+
+    Numeric columns are written into preallocated float64 chunks, so an append
+    is O(1) and never copies earlier rows. Other transaction fields are kept
+    row-wise for to_frame(). With a path, every row is also appended to
+    fixed-size binary segment files that open() replays on restart.
+    """
+    def __init__(self, columns: List[str] = None, chunk_size: int = 4096,
+                 path: Optional[str] = None, segment_rows: int = 65536):
+        self.columns = list(columns or FEATURE_COLUMNS + [TARGET_COLUMN])
+        self.chunk_size = chunk_size
+        self.path = path
+        self.segment_rows = segment_rows
+        self._col = {name: i for i, name in enumerate(self.columns)}
+        self._chunks: List[np.ndarray] = []
+        self._extras: List[Dict] = []
+        self._length = 0
+        self._lock = threading.Lock()
+        self._segment_file = None
+        if path:
+            os.makedirs(path, exist_ok=True)
+            self._write_header()
+
+    @classmethod
+    def open(cls, path: str, **kwargs) -> "TransactionLog":
+        """Load an on-disk log and keep appending to it"""
+        header = os.path.join(path, 'columns.json')
+        if os.path.exists(header):
+            with open(header) as f:
+                kwargs['columns'] = json.load(f)
+        log = cls(path=None, **kwargs)
+        for values, extras in log._read_segments(path):
+            log._append_row(values, extras)
+        log.path = path
+        return log
+
+    def __len__(self) -> int:
+        return self._length
+
+    def append(self, transaction: Dict):
+        """Record one transaction (missing numeric columns become NaN)"""
+        values = np.full(len(self.columns), np.nan)
+        extras = {}
+        for key, value in transaction.items():
+            i = self._col.get(key)
+            if i is None:
+                extras[key] = value
+            else:
+                values[i] = np.nan if value is None else float(value)
+        with self._lock:
+            self._append_row(values, extras)
+            if self.path:
+                self._write_segment(values, extras)
+
+    def training_data(self, window: Optional[int] = None,
+                      features: List[str] = None, target: str = TARGET_COLUMN) -> Tuple[np.ndarray, np.ndarray]:
+        """Snapshot (X, y) of the last `window` rows with complete values"""
+        features = features or FEATURE_COLUMNS
+        block = self.tail(window)
+        X = block[:, [self._col[c] for c in features]]
+        y = block[:, self._col[target]]
+        complete = ~(np.isnan(X).any(axis=1) | np.isnan(y))
+        return X[complete], y[complete]
+
+    def tail(self, window: Optional[int] = None) -> np.ndarray:
+        """Copy of the last `window` rows (all rows by default) as a 2-D array"""
+        with self._lock:
+            n = self._length if window is None else min(window, self._length)
+            start = self._length - n
+            first_chunk = start // self.chunk_size
+            parts = []
+            for c in range(first_chunk, len(self._chunks)):
+                lo = max(start - c * self.chunk_size, 0)
+                hi = min(self._length - c * self.chunk_size, self.chunk_size)
+                if hi > lo:
+                    parts.append(self._chunks[c][lo:hi])
+            if not parts:
+                return np.zeros((0, len(self.columns)))
+            return np.concatenate(parts)
+
+    def to_frame(self):
+        """Full history as a pandas DataFrame"""
+        import pandas as pd
+        data = self.tail()
+        frame = pd.DataFrame(data, columns=self.columns)
+        with self._lock:
+            extras = list(self._extras[:len(frame)])
+        if any(extras):
+            frame = frame.join(pd.DataFrame(extras))
+        # Drop numeric columns that no transaction ever supplied
+        return frame.dropna(axis=1, how='all')
+
+    def close(self):
+        with self._lock:
+            if self._segment_file:
+                self._segment_file.close()
+                self._segment_file = None
+
+    def _append_row(self, values: np.ndarray, extras: Dict):
+        row = self._length % self.chunk_size
+        if row == 0:
+            self._chunks.append(np.empty((self.chunk_size, len(self.columns))))
+        self._chunks[-1][row] = values
+        self._extras.append(extras)
+        self._length += 1
+
+    # On-disk segments: <n>.bin holds float64 rows, <n>.jsonl the extra fields
+
+    def _write_header(self):
+        header = os.path.join(self.path, 'columns.json')
+        if not os.path.exists(header):
+            with open(header, 'w') as f:
+                json.dump(self.columns, f)
+
+    def _write_segment(self, values: np.ndarray, extras: Dict):
+        row = self._length - 1
+        if self._segment_file is None or row % self.segment_rows == 0:
+            if self._segment_file:
+                self._segment_file.close()
+            segment = row // self.segment_rows
+            base = os.path.join(self.path, f'{segment:06d}')
+            self._segment_file = _SegmentWriter(open(base + '.bin', 'ab'), open(base + '.jsonl', 'a'))
+        self._segment_file.write(values, extras)
+
+    def _read_segments(self, path: str):
+        ncols = len(self.columns)
+        for name in sorted(f for f in os.listdir(path) if f.endswith('.bin')):
+            base = os.path.join(path, name[:-4])
+            rows = np.fromfile(base + '.bin', dtype=np.float64)
+            rows = rows[:len(rows) // ncols * ncols].reshape(-1, ncols)
+            with open(base + '.jsonl') as f:
+                lines = f.readlines()
+            extras = [json.loads(line) for line in lines if line.endswith('\n')]
+            # A crash mid-write leaves a torn last row: stray value bytes, a
+            # partial extras line or a row missing from one file. Cut both
+            # files back to the rows they agree on, or later appends would
+            # land after the garbage and misalign every row that follows
+            n = min(len(rows), len(extras))
+            rows, extras = rows[:n], extras[:n]
+            if os.path.getsize(base + '.bin') != n * ncols * 8:
+                os.truncate(base + '.bin', n * ncols * 8)
+            if len(lines) != n:
+                with open(base + '.jsonl', 'w') as f:
+                    f.writelines(lines[:n])
+            for values, extra in zip(rows, extras):
+                yield values, extra
+
+
+class _SegmentWriter:
+    def __init__(self, values_file, extras_file):
+        self.values_file = values_file
+        self.extras_file = extras_file
+
+    def write(self, values: np.ndarray, extras: Dict):
+        self.values_file.write(values.tobytes())
+        self.values_file.flush()
+        self.extras_file.write(json.dumps(extras, default=str) + '\n')
+        self.extras_file.flush()
+
+    def close(self):
+        self.values_file.close()
+        self.extras_file.close()
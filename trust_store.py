@@ -0,0 +1,177 @@
+from collections.abc import MutableMapping
+from typing import Dict, Iterable, Iterator, Optional
+
+import numpy as np
+
+from slot_allocator import SlotAllocator, grown_capacity
+
+DEFAULT_TRUST = {"success_rate": 0.8, "disputes": 0, "verification": 1}
+
+
+class TrustStore:
+    """Array-backed trust network with precomputed per-participant trust terms
+
+    Participant ids are interned to integer slots; slot 0 holds DEFAULT_TRUST
+    and is what unknown ids resolve to. The seller and buyer parts of the
+    composite trust formula are recomputed only for the slot that changes,
+    so scoring a batch of pairs is a gather plus one addition. The store
+    behaves like the plain dict of trust records it replaces: records come
+    back as TrustRecord views, so store[pid]["success_rate"] = 0.5 writes
+    through (recomputing the trust terms and bumping the versions). Slots
+    of deleted participants are reused by later inserts.
+    """
+    def __init__(self, records: Optional[Dict] = None):
+        self._slots = SlotAllocator(reserved=1)
+        self.success_rate = np.array([DEFAULT_TRUST["success_rate"]], dtype=np.float64)
+        self.disputes = np.array([DEFAULT_TRUST["disputes"]], dtype=np.float64)
+        self.verification = np.array([DEFAULT_TRUST["verification"]], dtype=np.float64)
+        self.seller_component = np.zeros(1)
+        self.buyer_component = np.zeros(1)
+        self._extra: Dict[int, Dict] = {}
+        # Bumped on every change; entity_version() is per participant
+        self.version = 0
+        self._entity_versions = np.zeros(1, dtype=np.int64)
+        self._recompute(0)
+        if records:
+            self.update(records)
+
+    # Dict interface
+
+    def __setitem__(self, participant_id, record: Dict):
+        slot = self._slots.get(participant_id)
+        if slot is None:
+            slot = self._allocate(participant_id)
+        self.success_rate[slot] = record.get("success_rate", DEFAULT_TRUST["success_rate"])
+        self.disputes[slot] = record.get("disputes", DEFAULT_TRUST["disputes"])
+        self.verification[slot] = record.get("verification", DEFAULT_TRUST["verification"])
+        extra = {k: v for k, v in record.items() if k not in DEFAULT_TRUST}
+        if extra:
+            self._extra[slot] = extra
+        else:
+            self._extra.pop(slot, None)
+        self._recompute(slot)
+        self._touch(slot)
+
+    def __getitem__(self, participant_id) -> "TrustRecord":
+        if participant_id not in self._slots:
+            raise KeyError(participant_id)
+        return TrustRecord(self, participant_id)
+
+    def __delitem__(self, participant_id):
+        if participant_id not in self._slots:
+            raise KeyError(participant_id)
+        # The slot reverts to the defaults until an insert reuses it
+        slot = self._slots.release(participant_id)
+        self.success_rate[slot] = DEFAULT_TRUST["success_rate"]
+        self.disputes[slot] = DEFAULT_TRUST["disputes"]
+        self.verification[slot] = DEFAULT_TRUST["verification"]
+        self._extra.pop(slot, None)
+        self._recompute(slot)
+        self._touch(slot)
+
+    def __contains__(self, participant_id) -> bool:
+        return participant_id in self._slots
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __iter__(self) -> Iterator:
+        return iter(self._slots)
+
+    def get(self, participant_id, default=None):
+        return TrustRecord(self, participant_id) if participant_id in self._slots else default
+
+    def items(self):
+        return ((pid, TrustRecord(self, pid)) for pid in self._slots)
+
+    def update(self, records: Dict):
+        for participant_id, record in records.items():
+            self[participant_id] = record
+
+    # Vectorized access
+
+    def slots(self, participant_ids: Iterable) -> np.ndarray:
+        """Interned slot per id (0, the default record, for unknown ids)"""
+        slot_of = self._slots.slot_of
+        return np.array([slot_of.get(pid, 0) for pid in participant_ids], dtype=np.int64)
+
+    def trust_score(self, seller_id, buyer_id) -> float:
+        """Composite trust for one pair"""
+        return float(self.seller_component[self._slots.get(seller_id, 0)] +
+                     self.buyer_component[self._slots.get(buyer_id, 0)])
+
+    def entity_version(self, participant_id) -> int:
+        """Change counter for one participant's trust record"""
+        return int(self._entity_versions[self._slots.get(participant_id, 0)])
+
+    def _record(self, slot: int) -> Dict:
+        record = {
+            "success_rate": float(self.success_rate[slot]),
+            "disputes": float(self.disputes[slot]),
+            "verification": float(self.verification[slot]),
+        }
+        record.update(self._extra.get(slot, {}))
+        return record
+
+    def _recompute(self, slot: int):
+        # Composite trust algorithm, split into its seller and buyer parts
+        self.seller_component[slot] = (
+            0.6 * self.success_rate[slot] +
+            0.2 * (1 - min(1, self.disputes[slot] / 10)) +
+            0.1 * self.verification[slot]
+        )
+        self.buyer_component[slot] = 0.1 * self.success_rate[slot]
+
+    def _touch(self, slot: int):
+        self.version += 1
+        self._entity_versions[slot] = self.version
+
+    def _allocate(self, participant_id) -> int:
+        slot = self._slots.allocate(participant_id)
+        if slot >= len(self.success_rate):
+            capacity = grown_capacity(len(self.success_rate))
+            for name in ("success_rate", "disputes", "verification",
+                         "seller_component", "buyer_component", "_entity_versions"):
+                setattr(self, name, np.resize(getattr(self, name), capacity))
+            self._entity_versions[slot:] = 0
+        return slot
+
+
+class TrustRecord(MutableMapping):
+    """Live view of one participant's record in a TrustStore
+
+    Reads see the current values and writes go through the store, so the
+    precomputed trust terms and versions stay in step. dict(record) gives a
+    detached plain copy (e.g. for JSON).
+    """
+    __slots__ = ("_store", "_participant_id")
+
+    def __init__(self, store: TrustStore, participant_id):
+        self._store = store
+        self._participant_id = participant_id
+
+    def _current(self) -> Dict:
+        return self._store._record(self._store._slots.slot_of[self._participant_id])
+
+    def __getitem__(self, key):
+        return self._current()[key]
+
+    def __setitem__(self, key, value):
+        record = self._current()
+        record[key] = value
+        self._store[self._participant_id] = record
+
+    def __delitem__(self, key):
+        # Core fields fall back to DEFAULT_TRUST, as in TrustStore.__setitem__
+        record = self._current()
+        del record[key]
+        self._store[self._participant_id] = record
+
+    def __iter__(self) -> Iterator:
+        return iter(self._current())
+
+    def __len__(self) -> int:
+        return len(self._current())
+
+    def __repr__(self) -> str:
+        return repr(self._current())